@@ -1,11 +1,28 @@
 import os
-from flask import Flask, request, jsonify, make_response
+import json
+import logging
+import queue
+import asyncio
+import threading
+from flask import Flask, request, jsonify, make_response, Response, stream_with_context
 from flask_cors import CORS  # Import CORS
 import traceback
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from backend.models.workflow import generate
+from backend.models.workflow import (
+    generate, stream_generate, start_warmup, warmup, DEFAULT_SESSION_ID, ValidationUnavailable
+)
+
+# Логирование настраивает точка входа, а не библиотечные модули; LOG_FILE дополнительно пишет лог в файл
+_log_handlers = [logging.StreamHandler()]
+if os.environ.get("LOG_FILE"):
+    _log_handlers.append(logging.FileHandler(os.environ["LOG_FILE"]))
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=_log_handlers
+)
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
@@ -31,12 +48,13 @@ async def generate_ui():
         return jsonify({"error": "Invalid or missing question in request"}), 400
 
     question = data['question']
+    session_id = data.get('session_id') or DEFAULT_SESSION_ID
 
     try:
         app.logger.info(f"Processing question: {question}")
-        result = await generate(question)
+        result = await generate(question, session_id)
         app.logger.info(f"Generated result: {result[:100]}...")  # Log first 100 chars
-        result = jsonify({"result": result})
+        result = jsonify({"result": result, "session_id": session_id})
         # response = llm.invoke([
         #     SystemMessage(content="You are a helpful assistant that improves visability of react code, keeps all nlmk components, and returns only code and nothing else. no ```"),
         #     HumanMessage(content=f"Here is the code, improve it: {result}")  # Assuming 'result' is a Response object
@@ -46,12 +64,59 @@ async def generate_ui():
         # return jsonify({"result": response.content})
         return result
 
+    except ValidationUnavailable as e:
+        app.logger.warning(f"Generation rejected, validator pool is busy: {str(e)}")
+        return jsonify({"error": str(e), "retryable": True}), 503, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         app.logger.error(f"Error in generate_ui: {str(e)}")
         app.logger.error(f"Traceback: {traceback.format_exc()}")
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
 
+@app.route('/generate/stream', methods=['GET', 'POST'])
+def generate_ui_stream():
+    """
+    Server-Sent Events вариант /generate: события узлов графа, токены кода и промежуточные
+    результаты компиляции по мере появления. GET с ?question= — для EventSource.
+    """
+    app.logger.info("Received request to /generate/stream")
+    data = request.json if request.method == 'POST' else request.args
+
+    if not data or 'question' not in data:
+        app.logger.error("Invalid or missing question in request")
+        return jsonify({"error": "Invalid or missing question in request"}), 400
+
+    question = data['question']
+    app.logger.info(f"Streaming question: {question}")
+    return Response(
+        stream_with_context(_sse_events(question, data.get('session_id'))),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse_events(question: str, session_id: str | None):
+    # Flask отдаёт поток синхронным генератором, поэтому граф выполняется в отдельном потоке со своим event loop
+    events = queue.Queue()
+
+    async def consume():
+        async for event in stream_generate(question, session_id):
+            events.put(event)
+
+    def run():
+        try:
+            asyncio.run(consume())
+        except Exception as e:
+            app.logger.error(f"Error in generate_ui_stream: {str(e)}")
+            events.put({"event": "error", "error": f"An error occurred: {str(e)}"})
+        finally:
+            events.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+    while (event := events.get()) is not None:
+        yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
 # Add this new route for debugging
 @app.route('/debug', methods=['POST'])
 def debug_request():
@@ -69,6 +134,12 @@ def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    status = warmup.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
 @app.route('/update-preview', methods=['POST', 'OPTIONS'])
 def update_preview():
     if request.method == "OPTIONS":
@@ -103,5 +174,9 @@ def _corsify_actual_response(response, status_code=200):
     response.headers.add("Access-Control-Allow-Origin", "http://localhost:3000")
     return response, status_code
 
+# С reloader (debug=True) модуль исполняется и в родительском процессе — прогрев нужен только в рабочем
+if __name__ != '__main__' or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    start_warmup()
+
 if __name__ == '__main__':
     app.run(debug=True)
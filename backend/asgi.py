@@ -0,0 +1,151 @@
+"""
+ASGI-точка входа сервиса генерации.
+
+    uvicorn backend.asgi:app --port 5000
+
+Тот же контракт, что у Flask-приложения из backend/app.py, но все запросы и узлы графа
+выполняются на одном event loop процесса: ожидающая ответа LLM генерация не занимает поток.
+"""
+import contextlib
+import json
+import logging
+import os
+import traceback
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from backend.models.workflow import (
+    generate, stream_generate, start_warmup, warmup, DEFAULT_SESSION_ID, ValidationUnavailable
+)
+
+# Логирование настраивает точка входа, а не библиотечные модули; LOG_FILE дополнительно пишет лог в файл
+_log_handlers = [logging.StreamHandler()]
+if os.environ.get("LOG_FILE"):
+    _log_handlers.append(logging.FileHandler(os.environ["LOG_FILE"]))
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=_log_handlers
+)
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_FILE_PATH = os.path.join(os.getcwd(), 'vite-preview-mode', 'my-app', 'src', 'Home', 'GeneratedComponent.tsx')
+
+
+async def _read_json(request: Request) -> dict | None:
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+async def generate_ui(request: Request):
+    logger.info("Received request to /generate")
+    data = await _read_json(request)
+    logger.info(f"Received data: {data}")
+
+    if not data or 'question' not in data:
+        logger.error("Invalid or missing question in request")
+        return JSONResponse({"error": "Invalid or missing question in request"}, status_code=400)
+
+    question = data['question']
+    session_id = data.get('session_id') or DEFAULT_SESSION_ID
+
+    try:
+        logger.info(f"Processing question: {question}")
+        result = await generate(question, session_id)
+        logger.info(f"Generated result: {result[:100]}...")  # Log first 100 chars
+        return JSONResponse({"result": result, "session_id": session_id})
+    except ValidationUnavailable as e:
+        logger.warning(f"Generation rejected, validator pool is busy: {str(e)}")
+        return JSONResponse({"error": str(e), "retryable": True}, status_code=503,
+                            headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        logger.error(f"Error in generate_ui: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse({"error": f"An error occurred: {str(e)}"}, status_code=500)
+
+
+async def generate_ui_stream(request: Request):
+    logger.info("Received request to /generate/stream")
+    data = await _read_json(request) if request.method == 'POST' else dict(request.query_params)
+
+    if not data or 'question' not in data:
+        logger.error("Invalid or missing question in request")
+        return JSONResponse({"error": "Invalid or missing question in request"}, status_code=400)
+
+    async def events():
+        async for event in stream_generate(data['question'], data.get('session_id')):
+            yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def health_check(request: Request):
+    return JSONResponse({"status": "healthy"})
+
+
+async def readiness_check(request: Request):
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+def _write_preview(code: str):
+    directory = os.path.dirname(PREVIEW_FILE_PATH)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+        logger.info(f"Created directory: {directory}")
+
+    with open(PREVIEW_FILE_PATH, 'w') as file:
+        file.write(code)
+
+
+async def update_preview(request: Request):
+    data = await _read_json(request)
+    try:
+        await run_in_threadpool(_write_preview, data['code'])
+        logger.info(f"Successfully wrote to file: {PREVIEW_FILE_PATH}")
+        return JSONResponse({"message": "Code updated successfully"})
+    except Exception as e:
+        error_message = f"Error updating file: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_message)
+        return JSONResponse({"error": error_message}, status_code=500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    # Сервер начинает принимать запросы сразу, ресурсы грузятся в фоне
+    start_warmup()
+    yield
+
+
+app = Starlette(
+    lifespan=lifespan,
+    routes=[
+        Route('/generate', generate_ui, methods=['POST']),
+        Route('/generate/stream', generate_ui_stream, methods=['GET', 'POST']),
+        Route('/health', health_check, methods=['GET']),
+        Route('/ready', readiness_check, methods=['GET']),
+        Route('/update-preview', update_preview, methods=['POST']),
+    ],
+    middleware=[
+        # Preflight-запросы (OPTIONS) обрабатывает CORSMiddleware, как _build_cors_preflight_response во Flask
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["http://localhost:3000"],
+            allow_methods=["GET", "POST", "OPTIONS"],
+            allow_headers=["Content-Type"],
+        ),
+    ],
+)
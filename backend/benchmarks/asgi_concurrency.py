@@ -0,0 +1,75 @@
+"""
+Сколько генераций одновременно держит один процесс.
+
+    python -m backend.benchmarks.asgi_concurrency --levels 1 8 32 128 --latency 5
+    python -m backend.benchmarks.asgi_concurrency --url http://localhost:5000 --levels 1 4 16
+
+Без --url запросы идут в ASGI-приложение внутри процесса, а generate подменяется ожиданием
+длительностью --latency секунд — так измеряется именно способность держать запросы открытыми,
+без стоимости LLM. С --url нагружается запущенный сервер (Flask или uvicorn) настоящими запросами.
+
+in_flight = запросы * минимальная задержка / общее время — сколько запросов реально выполнялось
+одновременно (1 — запросы обслуживались по очереди).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def _make_transport(latency: float) -> httpx.ASGITransport:
+    from backend import asgi
+
+    async def simulated_generate(question: str, session_id: str | None = None) -> str:
+        await asyncio.sleep(latency)
+        return f"// generated for: {question}"
+
+    asgi.generate = simulated_generate
+    return httpx.ASGITransport(app=asgi.app)
+
+
+async def _run_level(client: httpx.AsyncClient, concurrency: int) -> dict:
+    async def one(i: int) -> float:
+        started = time.perf_counter()
+        response = await client.post("/generate", json={"question": f"benchmark request {i}"})
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*[one(i) for i in range(concurrency)])
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "latency_avg_s": statistics.mean(latencies),
+        "in_flight": concurrency * min(latencies) / wall,
+        "throughput_rps": concurrency / wall,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--latency", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None)
+    else:
+        client = httpx.AsyncClient(transport=_make_transport(args.latency), base_url="http://bench", timeout=None)
+
+    async with client:
+        for level in args.levels:
+            r = await _run_level(client, level)
+            print(
+                f"concurrency={r['concurrency']:<5} wall={r['wall_s']:7.2f}s "
+                f"latency_avg={r['latency_avg_s']:7.2f}s in_flight={r['in_flight']:7.1f} "
+                f"throughput={r['throughput_rps']:6.2f} req/s"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
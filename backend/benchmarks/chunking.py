@@ -0,0 +1,95 @@
+"""
+Токены документации, которые write_code получает на один компонент: индекс по файлам против индекса по объявлениям.
+
+    python -m backend.benchmarks.chunking
+    python -m backend.benchmarks.chunking --embeddings openai   # настоящие эмбеддинги, нужен OPENAI_API_KEY
+
+Для каждого компонента из RAW_COMPONENTS_.json выполняется запрос write_code
+("Detailed ARG TYPES of props ... and CODE examples of using X") через MMR с параметрами def_ret.
+tokens    — сумма токенов найденных документов (то, что уходит в промпт CODER на один компонент),
+on_target — доля найденных документов, относящихся к запрошенному компоненту.
+По умолчанию эмбеддинги — локальное хэширование слов (без сети): абсолютные числа приблизительны,
+сравнение двух индексов при одном и том же эмбеддере — честное.
+"""
+import argparse
+import json
+import re
+import statistics
+import time
+import zlib
+from typing import List
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from backend.models.tokens import count_tokens, tokens_exact
+from backend.parsers.chunking import component_of, load_index_documents
+from backend.parsers.recursive import EMBEDDING_CACHE_DIR, OUTPUT_CSV_PATH, OUTPUT_JSON_PATH
+
+QUERY = "Detailed ARG TYPES of props a component {0} can have and CODE examples of using {0}"
+WORD = re.compile(r"[A-Za-zА-Яа-яЁё_]\w*")
+
+
+class HashingEmbeddings(Embeddings):
+    """Мешок слов (и частей CamelCase) с хэшированием в фиксированную размерность."""
+
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in WORD.findall(text):
+            for token in {word, *re.findall(r"[A-Z][a-z]+|[a-z]+|[А-ЯЁа-яё]+", word)}:
+                vector[zlib.crc32(token.lower().encode("utf-8")) % self.dim] += 1.0
+        vector = np.log1p(vector)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    parser.add_argument("--k", type=int, default=6)
+    args = parser.parse_args()
+
+    if args.embeddings == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        from backend.parsers.embedding_cache import CachedEmbeddings
+        embeddings = CachedEmbeddings(OpenAIEmbeddings(), EMBEDDING_CACHE_DIR)
+    else:
+        embeddings = HashingEmbeddings()
+
+    with open(OUTPUT_JSON_PATH, "r", encoding="utf-8") as f:
+        components = sorted(json.load(f)["descriptions"])
+    print(f"{len(components)} queries, token counts: {'cl100k_base' if tokens_exact() else 'len/4 estimate'}")
+
+    results = {}
+    for name, chunking in (("files", False), ("chunks", True)):
+        documents = load_index_documents(OUTPUT_CSV_PATH, chunking=chunking)
+        db = FAISS.from_documents(documents, embeddings)
+        tokens, on_target, timings = [], [], []
+        for component in components:
+            started = time.perf_counter()
+            docs = db.max_marginal_relevance_search(QUERY.format(component), k=args.k, fetch_k=50, lambda_mult=0.51)
+            timings.append(time.perf_counter() - started)
+            tokens.append(sum(count_tokens(doc.page_content) for doc in docs))
+            on_target.append(sum(component_of(doc.page_content.split("\n", 1)[0]) == component for doc in docs) / len(docs))
+        results[name] = statistics.mean(tokens)
+        print(
+            f"{name:<7} documents={len(documents):<5} index_tokens={sum(count_tokens(d.page_content) for d in documents):<8} "
+            f"tokens/query mean={statistics.mean(tokens):7.0f} p90={np.percentile(tokens, 90):7.0f} "
+            f"max={max(tokens):6d} on_target={statistics.mean(on_target):.2f} "
+            f"search={statistics.median(timings) * 1000:.1f}ms"
+        )
+    print(f"tokens per query: {1 - results['chunks'] / results['files']:.0%} fewer with chunking")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Токены документации в промптах CODER и DEBUGGER до и после упаковки контекста.
+
+    python -m backend.benchmarks.context_packing --requests 50 --coder-budget 6000 --debugger-budget 3000
+
+coder    — случайные наборы из 3–6 компонентов (как needed_components после FUNNEL), документация из DOC_BUNDLES_;
+debugger — случайные наборы из 2–4 запросов по именам интерфейсов/типов через гибридный dbg_ret и def_ret.
+before   — тексты тех же документов подряд, с повторами и без бюджета; after — упакованный текст.
+Экономия — только от удаления повторов и бюджета; прежний str() списка Document с метаданными был бы длиннее.
+"""
+import argparse
+import json
+import logging
+import random
+
+from langchain_community.vectorstores import FAISS
+
+from backend.benchmarks.chunking import HashingEmbeddings
+from backend.models.context_packing import ContextPacker, interleave
+from backend.models.tokens import tokens_exact
+from backend.parsers.chunking import load_index_documents
+from backend.parsers.doc_bundles import load_doc_bundles
+from backend.parsers.hybrid_search import HybridRetriever, LexicalIndex
+from backend.parsers.recursive import DOC_BUNDLES_PATH, OUTPUT_CSV_PATH, OUTPUT_JSON_PATH, ensure_components_data
+
+
+def _report(packer: ContextPacker):
+    stats = packer.stats()
+    print(f"{packer.name:<9} budget={packer.budget:<6} tokens/prompt before={stats['tokens_before'] / stats['calls']:7.0f} "
+          f"after={stats['tokens_after'] / stats['calls']:7.0f} saved={stats['saved']:.0%} "
+          f"duplicates={stats['duplicates']} dropped={stats['dropped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--coder-budget", type=int, default=6000)
+    parser.add_argument("--debugger-budget", type=int, default=3000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    rng = random.Random(0)
+
+    ensure_components_data()
+    with open(OUTPUT_JSON_PATH, "r", encoding="utf-8") as f:
+        titles = sorted(json.load(f)["descriptions"])
+    bundles = load_doc_bundles(DOC_BUNDLES_PATH)
+    print(f"token counts: {'cl100k_base' if tokens_exact() else 'len/4 estimate'}")
+
+    coder = ContextPacker("coder", args.coder_budget)
+    for _ in range(args.requests):
+        chosen = rng.sample(titles, rng.randint(3, 6))
+        coder.pack(interleave([bundles.get(title, []) for title in chosen]))
+    _report(coder)
+
+    documents = load_index_documents(OUTPUT_CSV_PATH)
+    db = FAISS.from_documents(documents, HashingEmbeddings())
+    lexical = LexicalIndex.from_vectorstore(db)
+    names = sorted({n for d in documents if d.metadata.get("kind") in ("interface", "type", "enum")
+                    for n in d.metadata.get("names", ())})
+    for k in (1, 6):
+        retriever = HybridRetriever(vector_retriever=db.as_retriever(search_kwargs={'k': k}), lexical=lexical, k=k)
+        debugger = ContextPacker(f"debug k={k}", args.debugger_budget)
+        for _ in range(args.requests):
+            queries = [f"{name} props and allowed values" for name in rng.sample(names, rng.randint(2, 4))]
+            debugger.pack(interleave([retriever.invoke(q) for q in queries]))
+        _report(debugger)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Задержка получения документации компонентов в write_code: готовые пакеты против поиска def_ret.
+
+    python -m backend.benchmarks.doc_bundles --embed-latency-ms 150
+
+Для каждого компонента из RAW_COMPONENTS_.json документация получается тремя способами:
+пакет из DOC_BUNDLES_.json, def_ret по FAISS (MMR) и гибридный def_ret (BM25 + FAISS).
+Эмбеддинги — локальное хэширование слов; --embed-latency-ms добавляет задержку удалённого эмбеддера на запрос.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from langchain_community.vectorstores import FAISS
+
+from backend.benchmarks.chunking import HashingEmbeddings
+from backend.benchmarks.hybrid_retrieval import CountingEmbeddings
+from backend.models.tokens import count_tokens
+from backend.parsers.chunking import load_index_documents
+from backend.parsers.doc_bundles import CODER_QUERY, load_doc_bundles
+from backend.parsers.hybrid_search import HybridRetriever, LexicalIndex
+from backend.parsers.recursive import DOC_BUNDLES_PATH, OUTPUT_CSV_PATH, OUTPUT_JSON_PATH, ensure_components_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embed-latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    ensure_components_data()
+    with open(OUTPUT_JSON_PATH, "r", encoding="utf-8") as f:
+        titles = sorted(json.load(f)["descriptions"])
+    embeddings = CountingEmbeddings(HashingEmbeddings(), args.embed_latency_ms / 1000)
+    db = FAISS.from_documents(load_index_documents(OUTPUT_CSV_PATH), embeddings)
+    def_ret = db.as_retriever(search_type="mmr", search_kwargs={'k': 6, 'lambda_mult': 0.51, 'fetch_k': 50})
+    hybrid = HybridRetriever(vector_retriever=def_ret, lexical=LexicalIndex.from_vectorstore(db), k=6)
+
+    started = time.perf_counter()
+    bundles = load_doc_bundles(DOC_BUNDLES_PATH)
+    print(f"{len(bundles)}/{len(titles)} bundles loaded in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    methods = {
+        "bundle": lambda title: bundles.get(title) or def_ret.invoke(CODER_QUERY.format(title)),
+        "def_ret": lambda title: def_ret.invoke(CODER_QUERY.format(title)),
+        "hybrid": lambda title: hybrid.invoke(CODER_QUERY.format(title)),
+    }
+    for name, method in methods.items():
+        timings, tokens, kinds, total = [], [], 0, 0
+        for title in titles:
+            started = time.perf_counter()
+            docs = method(title)
+            timings.append(time.perf_counter() - started)
+            tokens.append(sum(count_tokens(doc.page_content) for doc in docs))
+            kinds += sum(doc.metadata.get("kind") in ("interface", "type", "enum", "story") for doc in docs)
+            total += len(docs)
+        print(f"{name:<8} median={statistics.median(timings) * 1000:8.3f}ms tokens/component={statistics.mean(tokens):6.0f} "
+              f"types_or_examples={kinds / total:.2f}")
+
+
+if __name__ == "__main__":
+    main()
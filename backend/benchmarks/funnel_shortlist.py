@@ -0,0 +1,98 @@
+"""
+Размер промпта FUNNEL и полнота шорт-листа компонентов в зависимости от FUNNEL_SHORTLIST.
+
+    python -m backend.benchmarks.funnel_shortlist --top-n 5 10 15 20
+    python -m backend.benchmarks.funnel_shortlist --embeddings openai --llm 5   # + время реальных вызовов FUNNEL
+
+Запросы — описания примеров <Editor> из Stories без названия компонента; recall — доля запросов,
+для которых компонент-источник попал в шорт-лист. tokens — токены отрендеренного промпта FUNNEL.
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import time
+
+from backend.benchmarks.chunking import HashingEmbeddings
+from backend.benchmarks.hybrid_retrieval import STORY_DESCRIPTION
+from backend.models.component_shortlist import ComponentShortlist
+from backend.models.prompts import FUNNEL
+from backend.models.tokens import count_tokens
+from backend.parsers.chunking import load_index_documents
+from backend.parsers.hybrid_search import document_component
+from backend.parsers.recursive import (
+    EMBEDDING_CACHE_DIR, OUTPUT_CSV_PATH, format_component_descriptions, load_component_descriptions
+)
+
+
+def _prompt_tokens(query: str, components: str) -> int:
+    return sum(count_tokens(m.content) for m in FUNNEL.format_messages(query=query, components=components))
+
+
+def _queries(titles):
+    queries = []
+    for doc in load_index_documents(OUTPUT_CSV_PATH, chunking=True):
+        component = document_component(doc)
+        m = STORY_DESCRIPTION.search(doc.page_content) if doc.metadata["kind"] == "story" else None
+        if m and component in titles:
+            text = re.sub(rf"\b{re.escape(component)}\b", "", " ".join(m.group(1).split()), flags=re.I)
+            queries.append((text, component))
+    return queries
+
+
+async def _time_llm(queries, components_for):
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_openai import ChatOpenAI
+    chain = FUNNEL | ChatOpenAI(temperature=0.0, model="gpt-4o-mini") | StrOutputParser()
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        await chain.ainvoke({"query": query, "components": components_for(query)})
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    parser.add_argument("--top-n", type=int, nargs="+", default=[5, 10, 15, 20])
+    parser.add_argument("--llm", type=int, default=0, help="сколько запросов прогнать через реальный FUNNEL")
+    args = parser.parse_args()
+
+    if args.embeddings == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        from backend.parsers.embedding_cache import CachedEmbeddings
+        embeddings = CachedEmbeddings(OpenAIEmbeddings(), EMBEDDING_CACHE_DIR)
+    else:
+        embeddings = HashingEmbeddings()
+
+    descriptions = load_component_descriptions()
+    started = time.perf_counter()
+    shortlist = ComponentShortlist(descriptions, embeddings)
+    print(f"{len(descriptions)} components embedded in {(time.perf_counter() - started) * 1000:.0f}ms")
+    queries = _queries(set(descriptions))
+    # Полный список в том же формате, что и шорт-листы, — сравниваются только размеры списков
+    full = format_component_descriptions(descriptions)
+    full_tokens = statistics.mean(_prompt_tokens(q, full) for q, _ in queries)
+    print(f"{len(queries)} queries, full list: prompt tokens={full_tokens:.0f}")
+
+    for top_n in args.top_n:
+        tokens, hits, timings = [], 0, []
+        for query, component in queries:
+            started = time.perf_counter()
+            titles = shortlist.shortlist(query, top_n)
+            timings.append(time.perf_counter() - started)
+            hits += component in titles
+            tokens.append(_prompt_tokens(query, format_component_descriptions(shortlist.describe(titles))))
+        print(f"top_n={top_n:<3} prompt tokens={statistics.mean(tokens):6.0f} ({statistics.mean(tokens) / full_tokens:.0%}) "
+              f"recall={hits / len(queries):.2f} shortlist={statistics.median(timings) * 1000:.2f}ms")
+
+    if args.llm:
+        sample = [q for q, _ in queries[:args.llm]]
+        top_n = max(args.top_n)
+        print(f"FUNNEL median latency: full={asyncio.run(_time_llm(sample, lambda q: full)):.2f}s "
+              f"top_n={top_n}={asyncio.run(_time_llm(sample, lambda q: format_component_descriptions(shortlist.describe(shortlist.shortlist(q, top_n))))):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
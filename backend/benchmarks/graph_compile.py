@@ -0,0 +1,45 @@
+"""
+Накладные расходы на граф в расчёте на один запрос.
+
+    python -m backend.benchmarks.graph_compile --runs 200
+
+per_request_build — как было раньше: StateGraph собирается и компилируется в каждом запросе
+shared            — get_graph(): граф скомпилирован один раз и переиспользуется
+"""
+import argparse
+import statistics
+import time
+
+from backend.models.workflow import _build_graph, get_graph
+
+
+def _measure(fn, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    get_graph()
+    results = {
+        "per_request_build": _measure(_build_graph, args.runs),
+        "shared": _measure(get_graph, args.runs),
+    }
+    for name, timings in results.items():
+        print(
+            f"{name:<18} mean={statistics.mean(timings):8.3f}ms "
+            f"median={statistics.median(timings):8.3f}ms max={max(timings):8.3f}ms"
+        )
+    saved = statistics.mean(results["per_request_build"]) - statistics.mean(results["shared"])
+    print(f"overhead removed per request: {saved:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
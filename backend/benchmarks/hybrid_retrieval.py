@@ -0,0 +1,118 @@
+"""
+Полнота и задержка def_ret/dbg_ret (FAISS) против гибридного ретривера (BM25 + FAISS).
+
+    python -m backend.benchmarks.hybrid_retrieval
+    python -m backend.benchmarks.hybrid_retrieval --embed-latency-ms 150   # задержка удалённого эмбеддера на запрос
+    python -m backend.benchmarks.hybrid_retrieval --embeddings openai
+
+Наборы запросов строятся из самого индекса:
+  component   — запрос write_code по каждому компоненту, попадание — документ этого компонента (доля из k),
+  identifier  — "<IName> props and allowed values" по каждому интерфейсу/типу/enum, попадание — чанк с этим объявлением,
+  description — первые слова описания примера <Editor> из Stories, попадание — документ того же компонента.
+embed_calls — сколько раз запрос отправлялся в эмбеддер (каждый вызов — сетевой запрос к OpenAI в проде).
+"""
+import argparse
+import re
+import statistics
+import time
+from typing import List
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from backend.benchmarks.chunking import QUERY, HashingEmbeddings
+from backend.parsers.chunking import load_index_documents
+from backend.parsers.hybrid_search import HybridRetriever, LexicalIndex, document_component
+from backend.parsers.recursive import EMBEDDING_CACHE_DIR, OUTPUT_CSV_PATH
+
+STORY_DESCRIPTION = re.compile(r'description="([^"]{20,})"')
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, latency: float):
+        self.embeddings = embeddings
+        self.latency = latency
+        self.query_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        time.sleep(self.latency)
+        return self.embeddings.embed_query(text)
+
+
+def _query_sets(documents):
+    components = sorted({document_component(doc) for doc in documents} - {""})
+    component_set = [(QUERY.format(c), lambda doc, c=c: document_component(doc) == c) for c in components]
+
+    names = sorted({name for doc in documents if doc.metadata.get("kind") in ("interface", "type", "enum")
+                    for name in doc.metadata.get("names", ())})
+    identifier_set = [(f"{name} props and allowed values", lambda doc, n=name: n in doc.metadata.get("names", ()))
+                      for name in names]
+
+    description_set = []
+    for doc in documents:
+        if doc.metadata.get("kind") != "story":
+            continue
+        m = STORY_DESCRIPTION.search(doc.page_content)
+        if m:
+            text = " ".join(m.group(1).split()[:12])
+            description_set.append((text, lambda d, c=document_component(doc): document_component(d) == c))
+    return {"component": component_set, "identifier": identifier_set, "description": description_set}
+
+
+def _measure(retriever, queries, embeddings, precision: bool):
+    embeddings.query_calls = 0
+    timings, scores = [], []
+    for query, relevant in queries:
+        started = time.perf_counter()
+        docs = retriever.invoke(query)
+        timings.append(time.perf_counter() - started)
+        hits = [relevant(doc) for doc in docs]
+        scores.append(sum(hits) / len(docs) if precision else float(any(hits)))
+    return statistics.mean(scores), statistics.median(timings) * 1000, embeddings.query_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.embeddings == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        from backend.parsers.embedding_cache import CachedEmbeddings
+        base = CachedEmbeddings(OpenAIEmbeddings(), EMBEDDING_CACHE_DIR)
+    else:
+        base = HashingEmbeddings()
+    embeddings = CountingEmbeddings(base, args.embed_latency_ms / 1000)
+
+    documents = load_index_documents(OUTPUT_CSV_PATH)
+    db = FAISS.from_documents(documents, embeddings)
+    started = time.perf_counter()
+    lexical = LexicalIndex.from_vectorstore(db)
+    print(f"{len(documents)} documents, lexical index built in {(time.perf_counter() - started) * 1000:.0f}ms, "
+          f"{len(lexical.postings)} terms")
+
+    def_ret = db.as_retriever(search_type="mmr", search_kwargs={'k': 6, 'lambda_mult': 0.51, 'fetch_k': 50})
+    dbg_ret = db.as_retriever(search_kwargs={'k': 1})
+    retrievers = {
+        "def_ret": def_ret,
+        "hybrid k=6": HybridRetriever(vector_retriever=def_ret, lexical=lexical, k=6),
+        "dbg_ret": dbg_ret,
+        "hybrid k=1": HybridRetriever(vector_retriever=dbg_ret, lexical=lexical, k=1),
+    }
+    for set_name, queries in _query_sets(documents).items():
+        # Для запросов write_code важна доля документов нужного компонента, для остальных — попадание в top-k
+        precision = set_name == "component"
+        metric = "precision" if precision else "hit@k"
+        print(f"\n{set_name}: {len(queries)} queries, {metric}")
+        for name, retriever in retrievers.items():
+            score, latency, calls = _measure(retriever, queries, embeddings, precision)
+            print(f"  {name:<11} {metric}={score:.2f} median={latency:6.2f}ms embed_calls={calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Системные вызовы и время построения графа импортов ds-2.0 и замыканий всех компонентов.
+
+    python -m backend.benchmarks.import_graph --runs 5
+    python -m backend.benchmarks.import_graph --components-dir path/to/ds-2.0/src/components
+
+stat    — вызовы os.stat (isfile/isdir/getmtime и т.п.), scandir — листинги каталогов.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+
+from backend.parsers.import_graph import ImportGraph
+from backend.parsers.recursive import COMPONENTS_DIR, collect_components
+
+
+class _SyscallCounter:
+    def __init__(self):
+        self.stat = 0
+        self.scandir = 0
+
+    @contextlib.contextmanager
+    def patch(self):
+        real_stat, real_scandir = os.stat, os.scandir
+
+        def stat(*args, **kwargs):
+            self.stat += 1
+            return real_stat(*args, **kwargs)
+
+        def scandir(*args, **kwargs):
+            self.scandir += 1
+            return real_scandir(*args, **kwargs)
+
+        os.stat, os.scandir = stat, scandir
+        try:
+            yield self
+        finally:
+            os.stat, os.scandir = real_stat, real_scandir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--components-dir", default=COMPONENTS_DIR)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    base = args.components_dir
+    folders = sorted(f for f in os.listdir(base) if os.path.isdir(os.path.join(base, f)))
+
+    timings = []
+    for _ in range(args.runs):
+        counter = _SyscallCounter()
+        started = time.perf_counter()
+        with counter.patch(), contextlib.redirect_stdout(io.StringIO()):
+            collected = collect_components(base, folders, args.workers)
+        timings.append(time.perf_counter() - started)
+
+    graph = ImportGraph(base, lambda p: open(p, encoding="utf-8").read())
+    closure_files = sum(len(c[1]["files"]) for c in collected.values() if c)
+    print(
+        f"components={sum(1 for c in collected.values() if c)} source_files={len(graph.edges)} "
+        f"edges={sum(len(e) for e in graph.edges.values())} closure_files={closure_files}"
+    )
+    print(
+        f"median={statistics.median(timings) * 1000:.1f}ms stat={counter.stat} scandir={counter.scandir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Время загрузки индекса и память процесса для форматов faiss_local (pickle) и faiss_mmap.
+
+    python -m backend.benchmarks.index_load --runs 5
+
+Каждый замер — в новом процессе: загрузка индекса и один поиск с MMR, как в def_ret.
+rss_private — анонимная память процесса (не делится между воркерами),
+rss_file    — страницы файлов через mmap (общие для всех процессов, открывших тот же индекс).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MEASURE = r"""
+import json, sys, time
+import numpy as np
+
+def rss():
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                values[key] = int(value.split()[0])
+    return values
+
+from langchain_community.vectorstores import FAISS
+from backend.parsers.mmap_index import load_mmap_index
+from backend.parsers.recursive import FAISS_DB_PATH, FAISS_MMAP_PATH
+
+before = rss()
+started = time.perf_counter()
+if sys.argv[1] == "mmap":
+    db = load_mmap_index(FAISS_MMAP_PATH, None)
+else:
+    db = FAISS.load_local(FAISS_DB_PATH, None, allow_dangerous_deserialization=True)
+load_s = time.perf_counter() - started
+
+query = np.random.default_rng(0).random(db.index.d, dtype=np.float32).tolist()
+docs = db.max_marginal_relevance_search_by_vector(query, k=6, fetch_k=50, lambda_mult=0.51)
+after = rss()
+print(json.dumps({
+    "load_ms": load_s * 1000,
+    "rss_private_kb": after["RssAnon"] - before["RssAnon"],
+    "rss_file_kb": after["RssFile"] - before["RssFile"],
+    "docs": len(docs),
+}))
+"""
+
+
+def _run_once(layout: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", MEASURE, layout],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from backend.parsers.recursive import ensure_faiss_index
+    ensure_faiss_index()
+
+    for layout in ("pickle", "mmap"):
+        runs = [_run_once(layout) for _ in range(args.runs)]
+        print(
+            f"{layout:<7} load={statistics.median(r['load_ms'] for r in runs):7.2f}ms "
+            f"rss_private={statistics.median(r['rss_private_kb'] for r in runs):7.0f}KB "
+            f"rss_file={statistics.median(r['rss_file_kb'] for r in runs):7.0f}KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Время разбора дерева компонентов ds-2.0 в зависимости от числа потоков.
+
+    python -m backend.benchmarks.ingestion --workers 1 2 4 8 --runs 3
+    python -m backend.benchmarks.ingestion --components-dir path/to/ds-2.0/src/components
+
+Замеряется сбор данных всех компонентов (обход импортов и чтение файлов) без записи выходных файлов.
+files_read — сколько файлов прочитано с диска; общие для компонентов файлы читаются один раз.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+
+from backend.parsers.recursive import COMPONENTS_DIR, SourceFiles, collect_components
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--components-dir", default=COMPONENTS_DIR)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    base = args.components_dir
+    folders = sorted(f for f in os.listdir(base) if os.path.isdir(os.path.join(base, f)))
+    print(f"{len(folders)} component folders in {base}")
+
+    baseline = None
+    for workers in args.workers:
+        timings = []
+        for _ in range(args.runs):
+            sources = SourceFiles()
+            started = time.perf_counter()
+            # Разбор печатает каждый импорт — вывод не должен попадать в замер
+            with contextlib.redirect_stdout(io.StringIO()):
+                collect_components(base, folders, workers, sources)
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        baseline = baseline or median
+        print(f"workers={workers:<3} median={median * 1000:8.1f}ms speedup={baseline / median:5.2f}x files_read={sources.reads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Сравнение задержки одной проверки TSX для разных режимов TSXValidator.
+
+    python -m backend.benchmarks.validator_latency --runs 5
+
+cold        — incremental без .tsbuildinfo (первая проверка после обновления зависимостей)
+incremental — incremental с прогретым .tsbuildinfo
+oneshot     — текущий режим: новый процесс tsc на каждую проверку
+daemon      — прогретый ts.LanguageService
+"""
+import argparse
+import logging
+import shutil
+import statistics
+import time
+
+from backend.models.tsxvalidator.validator import TSXValidator, INCREMENTAL_DIR
+
+SAMPLE_CODES = [
+    """import React from 'react';
+import { Box, Button, Typography } from '@nlmk/ds-2.0';
+
+export default function Page() {
+  return (
+    <Box flexDirection="column" gap="16px">
+      <Typography variant="Heading2">Заголовок</Typography>
+      <Button onClick={() => console.log('click')}>Отправить</Button>
+    </Box>
+  );
+}
+""",
+    """import React, { useState } from 'react';
+import { Box, Input } from '@nlmk/ds-2.0';
+
+export default function Form() {
+  const [value, setValue] = useState<string>('');
+  return (
+    <Box>
+      <Input label="Имя" value={value} onChange={(e) => setValue(e.target.value)} />
+    </Box>
+  );
+}
+""",
+]
+
+
+def _measure(validator: TSXValidator, runs: int) -> list[float]:
+    timings = []
+    for i in range(runs):
+        started = time.perf_counter()
+        validator.validate_tsx(SAMPLE_CODES[i % len(SAMPLE_CODES)])
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _report(label: str, timings: list[float]):
+    print(
+        f"{label:<12} runs={len(timings):<3} "
+        f"mean={statistics.mean(timings) * 1000:8.1f}ms "
+        f"median={statistics.median(timings) * 1000:8.1f}ms "
+        f"max={max(timings) * 1000:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-dir", default="./tsx_validator_env")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-daemon", action="store_true")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    incremental = TSXValidator(args.base_dir, mode="incremental", name="bench")
+    cold = []
+    for _ in range(args.runs):
+        shutil.rmtree(incremental.base_dir / INCREMENTAL_DIR, ignore_errors=True)
+        cold += _measure(incremental, 1)
+    _report("cold", cold)
+    _report("incremental", _measure(incremental, args.runs))
+
+    _report("oneshot", _measure(TSXValidator(args.base_dir, mode="oneshot"), args.runs))
+
+    if not args.skip_daemon:
+        daemon = TSXValidator(args.base_dir, mode="daemon", name="bench")
+        # Первый вызов поднимает процесс — считаем его отдельно
+        _report("daemon-start", _measure(daemon, 1))
+        _report("daemon", _measure(daemon, args.runs))
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
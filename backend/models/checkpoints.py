@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+logger = logging.getLogger(__name__)
+
+
+def _payload_size(value: Any) -> int:
+    """Размер сериализованных данных чекпойнта (serde хранит их как (тип, bytes))."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_payload_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_payload_size(v) for v in value.values())
+    return 0
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver с ограничением памяти для долгоживущего процесса:
+    - в каждом треде (сессии) хранятся только последние max_checkpoints чекпойнтов и нужные им blobs;
+    - целые треды вытесняются по LRU, если их больше max_threads, и по TTL простоя thread_ttl секунд.
+    """
+
+    def __init__(self, max_checkpoints: int = 20, max_threads: int = 1000, thread_ttl: float = 3600.0):
+        super().__init__()
+        self.max_checkpoints = max_checkpoints
+        self.max_threads = max_threads
+        self.thread_ttl = thread_ttl
+        self.evicted_threads = 0
+        # thread_id -> время последнего обращения, в порядке LRU
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        # (thread_id, checkpoint_ns) -> {checkpoint_id: {(channel, version), ...}}
+        self._channel_versions: Dict[tuple, Dict[str, set]] = defaultdict(dict)
+        self._lock = threading.RLock()
+
+    def get_tuple(self, config):
+        with self._lock:
+            thread_id = config["configurable"]["thread_id"]
+            if thread_id in self._last_access:
+                self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            self._channel_versions[(thread_id, checkpoint_ns)][checkpoint["id"]] = set(
+                checkpoint["channel_versions"].items()
+            )
+            self._touch(thread_id)
+            self._trim_thread(thread_id, checkpoint_ns)
+            self._evict_threads()
+            return result
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        with self._lock:
+            return super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._last_access.pop(thread_id, None)
+            for key in [k for k in self._channel_versions if k[0] == thread_id]:
+                del self._channel_versions[key]
+
+    def thread_memory(self) -> Dict[str, Dict[str, int]]:
+        """Число чекпойнтов и байты сериализованных данных по каждому треду."""
+        with self._lock:
+            report = {}
+            for thread_id, namespaces in self.storage.items():
+                report[thread_id] = {
+                    "checkpoints": sum(len(checkpoints) for checkpoints in namespaces.values()),
+                    "bytes": _payload_size(namespaces),
+                }
+            for key, value in self.blobs.items():
+                if key[0] in report:
+                    report[key[0]]["bytes"] += _payload_size(value)
+            for key, value in self.writes.items():
+                if key[0] in report:
+                    report[key[0]]["bytes"] += _payload_size(value)
+            return report
+
+    def stats(self) -> Dict[str, Any]:
+        threads = self.thread_memory()
+        return {
+            "threads": len(threads),
+            "checkpoints": sum(t["checkpoints"] for t in threads.values()),
+            "bytes": sum(t["bytes"] for t in threads.values()),
+            "evicted_threads": self.evicted_threads,
+        }
+
+    def _touch(self, thread_id: str):
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _trim_thread(self, thread_id: str, checkpoint_ns: str):
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints:
+            return
+        versions = self._channel_versions[(thread_id, checkpoint_ns)]
+        # id чекпойнтов монотонно растут — оставляем самые новые
+        for checkpoint_id in sorted(checkpoints)[:-self.max_checkpoints]:
+            del checkpoints[checkpoint_id]
+            versions.pop(checkpoint_id, None)
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        # Значения каналов, на которые больше не ссылается ни один оставшийся чекпойнт
+        live = set().union(*versions.values()) if versions else set()
+        for key in [k for k in self.blobs if k[0] == thread_id and k[1] == checkpoint_ns]:
+            if (key[2], key[3]) not in live:
+                del self.blobs[key]
+
+    def _evict_threads(self):
+        now = time.monotonic()
+        while self._last_access:
+            thread_id, last_access = next(iter(self._last_access.items()))
+            if len(self._last_access) <= self.max_threads and now - last_access <= self.thread_ttl:
+                break
+            logger.info(f"Evicting checkpoint thread {thread_id}")
+            self.delete_thread(thread_id)
+            self.evicted_threads += 1
@@ -0,0 +1,48 @@
+import re
+from typing import Dict, Iterable, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from backend.parsers.declarations import parse_ds_imports
+
+
+def imported_components(code: str | None) -> List[str]:
+    """Экспортируемые имена, импортированные из '@nlmk/ds-2.0' в уже сгенерированном коде (разбор как у StaticChecker)."""
+    return list(dict.fromkeys(parse_ds_imports(code or "").values()))
+
+
+class ComponentShortlist:
+    """
+    Векторы описаний компонентов, посчитанные при прогреве. Для запроса отбираются top_n ближайших
+    по косинусу плюс компоненты, названные в запросе или уже используемые в коде, — только их описания
+    уходят в FUNNEL / FUNNEL_ITER вместо полного списка.
+    """
+
+    def __init__(self, descriptions: Dict[str, str], embeddings: Embeddings):
+        self.descriptions = descriptions
+        self.embeddings = embeddings
+        self.titles = list(descriptions)
+        vectors = np.asarray(
+            embeddings.embed_documents([f"{title}: {descriptions[title]}" for title in self.titles]), dtype=np.float32
+        )
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def _rank(self, query_vector: List[float], query: str, top_n: int, always: Iterable[str]) -> List[str]:
+        vector = np.asarray(query_vector, dtype=np.float32)
+        scores = self.vectors @ (vector / np.linalg.norm(vector))
+        ranked = [self.titles[i] for i in np.argsort(-scores)[:top_n]]
+        lowered = query.lower()
+        named = [t for t in self.titles if re.search(rf"\b{re.escape(t.lower())}\b", lowered)]
+        chosen = set(ranked) | set(named) | (set(always) & set(self.titles))
+        # Порядок исходного списка, чтобы промпт не зависел от порядка ранжирования
+        return [title for title in self.titles if title in chosen]
+
+    def shortlist(self, query: str, top_n: int, always: Iterable[str] = ()) -> List[str]:
+        return self._rank(self.embeddings.embed_query(query), query, top_n, always)
+
+    async def ashortlist(self, query: str, top_n: int, always: Iterable[str] = ()) -> List[str]:
+        return self._rank(await self.embeddings.aembed_query(query), query, top_n, always)
+
+    def describe(self, titles: Iterable[str]) -> Dict[str, str]:
+        return {title: self.descriptions[title] for title in titles}
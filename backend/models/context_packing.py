@@ -0,0 +1,104 @@
+import logging
+import threading
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.documents import Document
+
+from backend.models.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Чем меньше, тем ценнее: при нехватке бюджета первыми выпадают части с наибольшим значением
+KIND_TIERS = {
+    "interface": 0, "type": 0, "enum": 0, "story": 1,
+    "component": 2, "code": 2,
+    "styles": 3, "story_page": 3, "imports": 3, "exports": 3, "other": 3,
+}
+DEFAULT_TIER = 2
+SEPARATOR = "\n\n"
+
+
+def _text(item: Any) -> str:
+    return item.page_content if isinstance(item, Document) else str(item)
+
+
+def _tier(item: Any) -> int:
+    # Подсказки из ErrorDocsResolver (строки) — адресные, их не выбрасываем раньше документов
+    if not isinstance(item, Document):
+        return 0
+    return KIND_TIERS.get(item.metadata.get("kind"), DEFAULT_TIER)
+
+
+def _identity(item: Any) -> Any:
+    if isinstance(item, Document) and "row" in item.metadata:
+        return item.metadata.get("source"), item.metadata["row"], item.metadata.get("chunk")
+    return _text(item)
+
+
+def interleave(groups: Sequence[Sequence[Any]]) -> List[Any]:
+    """Порядок по релевантности для нескольких запросов: сначала лучшие документы каждого, затем вторые и т.д."""
+    ordered = []
+    for rank in range(max((len(g) for g in groups), default=0)):
+        ordered += [group[rank] for group in groups if rank < len(group)]
+    return ordered
+
+
+class ContextPacker:
+    """
+    Упаковка найденной документации в промпт: повторы одного документа убираются, затем части
+    отбираются в пределах бюджета токенов — сначала по ценности вида (объявления и примеры, затем код,
+    затем стили и служебное), внутри вида по релевантности. В промпт они идут в порядке релевантности.
+    """
+
+    def __init__(self, name: str, budget: int):
+        self.name = name
+        self.budget = budget
+        self.calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def pack(self, items: Sequence[Any]) -> str:
+        # До упаковки — те же тексты подряд, с повторами и без бюджета: экономия считается только от упаковки.
+        # Прежний str() списка Document (метаданные, экранированные переводы строк) был бы ещё длиннее
+        before = count_tokens(SEPARATOR.join(_text(item) for item in items))
+        unique = {}
+        for item in items:
+            unique.setdefault(_identity(item), item)
+        candidates = list(unique.values())
+        costs = [count_tokens(_text(item)) + 2 for item in candidates]
+
+        chosen = set()
+        used = 0
+        for position in sorted(range(len(candidates)), key=lambda i: (_tier(candidates[i]), i)):
+            if used + costs[position] <= self.budget:
+                chosen.add(position)
+                used += costs[position]
+        packed = SEPARATOR.join(_text(candidates[i]) for i in sorted(chosen))
+        after = count_tokens(packed)
+
+        with self._lock:
+            self.calls += 1
+            self.tokens_before += before
+            self.tokens_after += after
+            self.duplicates += len(items) - len(candidates)
+            self.dropped += len(candidates) - len(chosen)
+        logger.info(
+            f"Context [{self.name}]: {len(items)} items -> {len(chosen)} "
+            f"({len(items) - len(candidates)} duplicates, {len(candidates) - len(chosen)} over budget), "
+            f"tokens unpacked {before} -> packed {after} (budget {self.budget})"
+        )
+        return packed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "saved": 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0,
+                "duplicates": self.duplicates,
+                "dropped": self.dropped,
+            }
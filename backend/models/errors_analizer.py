@@ -1,4 +1,18 @@
 import re
+import threading
+from typing import Any, Dict
+
+from backend.parsers.prop_schema import PropSchemaIndex
+
+ERROR_LINE = re.compile(r"Номер строки c ошибкой (\d+)")
+INTERFACE_NAME = re.compile(r"\b([IT][A-Z]\w*)\b")
+MISSING_NAME = re.compile(r"Cannot find name '([\w$]+)'")
+# Ошибки синтаксиса и разметки JSX исправляются без документации
+SYNTAX_CODE = re.compile(r"^TS(1\d{3}|17\d{3})$")
+# Ошибки, которые относятся к пропсам компонента в строке с ошибкой
+PROP_ERROR_CODES = {"TS2322", "TS2339", "TS2353", "TS2559", "TS2741", "TS2739", "TS2740", "TS2769", "TS2786"}
+MISSING_EXPORT_CODES = {"TS2305", "TS2724", "TS2614"}
+REACT_NAMES = {"React", "useState", "useEffect", "useMemo", "useCallback", "useRef", "useReducer", "useContext", "Fragment"}
 
 
 def extract_component_by_error_line(interface_code: str, error_line: int) -> str:
@@ -13,10 +27,93 @@ def extract_component_by_error_line(interface_code: str, error_line: int) -> str
         line_code = code_lines[i].strip()
 
         # Используем регулярное выражение для поиска компонента
-        match = re.search(r"<([A-Za-z0-9]+)(\s|>)", line_code)
+        match = re.search(r"<([A-Za-z0-9]+)(\s|>|/|$)", line_code)
 
         if match:
             component = match.group(1)
             break  # Если компонент найден, прекращаем поиск
 
     return component
+
+
+class ErrorDocsResolver:
+    """
+    Подбор документации к ошибкам tsc по правилам, без LLM и векторного поиска:
+    interface из текста ошибки, компонент в строке с ошибкой, код ошибки.
+    Ошибки, для которых правила ничего не нашли, возвращаются как unresolved — для них
+    вызывается QUERY_GENERATOR и поиск по FAISS. Счётчики показывают, как часто это происходит.
+    """
+
+    def __init__(self, prop_index: PropSchemaIndex):
+        self.prop_index = prop_index
+        self.calls = 0
+        self.fallback_calls = 0
+        self.errors_total = 0
+        self.errors_resolved = 0
+        self._lock = threading.Lock()
+
+    def resolve(self, code: str, errors_list: list[Dict[str, Any]] | str) -> tuple[list[str], list[Any]]:
+        if isinstance(errors_list, str):
+            errors_list = [errors_list]
+        docs, unresolved = [], []
+        for error in errors_list:
+            found = self._resolve_error(code, error) if isinstance(error, dict) else None
+            if found is None:
+                unresolved.append(error)
+                continue
+            for doc in found:
+                if doc not in docs:
+                    docs.append(doc)
+
+        with self._lock:
+            self.calls += 1
+            self.errors_total += len(errors_list)
+            self.errors_resolved += len(errors_list) - len(unresolved)
+            if unresolved:
+                self.fallback_calls += 1
+        return docs, unresolved
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "fallback_calls": self.fallback_calls,
+                "fallback_rate": self.fallback_calls / self.calls if self.calls else 0.0,
+                "errors_total": self.errors_total,
+                "errors_resolved": self.errors_resolved,
+            }
+
+    def _resolve_error(self, code: str, error: Dict[str, Any]) -> list[str] | None:
+        """Список документов для ошибки; [] — документация не нужна; None — правила не сработали."""
+        error_code = error.get("code", "")
+        message = error.get("message", "")
+
+        if SYNTAX_CODE.match(error_code):
+            return []
+
+        interfaces = [n for n in INTERFACE_NAME.findall(message) if self.prop_index.by_interface(n)]
+        if interfaces:
+            return [self.prop_index.describe(n) for n in interfaces]
+
+        if error_code in MISSING_EXPORT_CODES:
+            components = ", ".join(sorted(self.prop_index.components))
+            return [f"Components exported by @nlmk/ds-2.0: {components}"]
+
+        missing = MISSING_NAME.search(message)
+        if missing:
+            name = missing.group(1)
+            if name in REACT_NAMES:
+                return [f"'{name}' must be imported from 'react'"]
+            if name in self.prop_index.exports:
+                description = self.prop_index.describe(name)
+                return [f"'{name}' must be imported from '@nlmk/ds-2.0'"] + ([description] if description else [])
+            return None
+
+        if error_code in PROP_ERROR_CODES:
+            line = ERROR_LINE.search(error.get("location", ""))
+            if line:
+                component = extract_component_by_error_line(code, int(line.group(1)))
+                description = self.prop_index.describe(component) if component.isidentifier() else None
+                if description:
+                    return [description]
+        return None
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation, GenerationChunk
+
+logger = logging.getLogger(__name__)
+
+# Из кэша восстанавливаются только ответы модели, а не произвольные сериализованные объекты
+CACHED_TYPES = [ChatGeneration, ChatGenerationChunk, Generation, GenerationChunk, AIMessage, AIMessageChunk]
+
+
+class LLMResponseCache:
+    """
+    Ответы LLM в SQLite, общем для воркеров. Ключ — sha256 от строки модели LangChain (модель и все параметры,
+    включая temperature) и полностью отрендеренного промпта. Хранится не больше max_size ответов,
+    вытесняются давно не использованные. Метрики ведутся по цепочкам (FUNNEL, CODER, DEBUGGER, ...).
+    """
+
+    def __init__(self, path: str, max_size: int = 2000):
+        self.path = path
+        self.max_size = max_size
+        self._metrics: Dict[str, Dict[str, int]] = {}
+        self._chains: Dict[str, "ChainCache"] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def for_chain(self, chain: str) -> "ChainCache":
+        with self._lock:
+            if chain not in self._chains:
+                self._chains[chain] = ChainCache(self, chain)
+            return self._chains[chain]
+
+    def count(self, chain: str, metric: str):
+        with self._lock:
+            counters = self._metrics.setdefault(chain, {"hits": 0, "misses": 0, "stored": 0})
+            counters[metric] += 1
+
+    def get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        try:
+            with self._connection() as conn:
+                row = conn.execute("SELECT generations FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            return [loads(generation, allowed_objects=CACHED_TYPES) for generation in json.loads(row[0])]
+        except Exception as e:
+            logger.error(f"Failed to read LLM cache {self.path}: {e}")
+            return None
+
+    def put(self, key: str, chain: str, generations: Sequence[Any]):
+        payload = json.dumps([dumps(generation) for generation in generations])
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                             (key, chain, time.time(), payload))
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_size,)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write LLM cache {self.path}: {e}")
+
+    def delete(self, key: str):
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write LLM cache {self.path}: {e}")
+
+    def clear(self, chain: Optional[str] = None):
+        with self._connection() as conn:
+            if chain is None:
+                conn.execute("DELETE FROM responses")
+            else:
+                conn.execute("DELETE FROM responses WHERE chain = ?", (chain,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            chains = {}
+            for chain, counters in self._metrics.items():
+                total = counters["hits"] + counters["misses"]
+                chains[chain] = {**counters, "hit_rate": counters["hits"] / total if total else 0.0}
+        try:
+            size = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        return {"size": size, "max_size": self.max_size, "chains": chains}
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3-соединение нельзя делить между потоками — у каждого своё
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, chain TEXT, last_used REAL, "
+                "generations TEXT)"
+            )
+            self._local.conn = conn
+        return conn
+
+
+class ChainCache(BaseCache):
+    """
+    Представление LLMResponseCache для одной цепочки: его передают модели через cache=.
+    Помнит ключи последних выданных и сохранённых ответов по их тексту, чтобы ответ, оказавшийся негодным
+    (фикс, который не скомпилировался), можно было удалить через forget.
+    """
+
+    RECENT_SIZE = 256
+
+    def __init__(self, store: LLMResponseCache, chain: str):
+        self.store = store
+        self.chain = chain
+        self._recent: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.store.key(prompt, llm_string)
+        generations = self.store.get(key)
+        self.store.count(self.chain, "hits" if generations is not None else "misses")
+        if generations is not None:
+            self._remember(generations, key)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        # Пустой ответ (обрыв, фильтр контента) не кэшируем, иначе он повторялся бы на каждом вызове
+        if not any(getattr(generation, "text", "") for generation in return_val):
+            return
+        key = self.store.key(prompt, llm_string)
+        self.store.put(key, self.chain, return_val)
+        self.store.count(self.chain, "stored")
+        self._remember(return_val, key)
+
+    def forget(self, text: str) -> bool:
+        """Удаляет из кэша недавний ответ цепочки с текстом text; False, если такого ответа этот процесс не выдавал."""
+        with self._lock:
+            key = self._recent.pop(self._text_hash(text), None)
+        if key is None:
+            return False
+        self.store.delete(key)
+        logger.info(f"Dropped cached {self.chain} response")
+        return True
+
+    def _remember(self, generations: Sequence[Any], key: str):
+        text = next((generation.text for generation in generations if getattr(generation, "text", "")), "")
+        text_hash = self._text_hash(text)
+        with self._lock:
+            self._recent[text_hash] = key
+            self._recent.move_to_end(text_hash)
+            while len(self._recent) > self.RECENT_SIZE:
+                self._recent.popitem(last=False)
+
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear(self.chain)
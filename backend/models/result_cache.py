@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RETURN = "return"
+SEED = "seed"
+
+
+class SemanticResultCache:
+    """
+    Кэш итогового кода генерации по смыслу запроса. Запрос эмбеддится; если среди сохранённых результатов
+    (той же версии индекса дизайн-системы) есть запрос с косинусной близостью не ниже return_threshold
+    и код прошёл проверку — код возвращается без запуска графа. Близость от seed_threshold даёт только
+    затравку для CODER вместо шаблона. Размер ограничен max_size, вытесняются давно не использованные записи.
+    Если задан persist_path, кэш загружается при старте и сохраняется после каждой записи.
+    """
+
+    def __init__(self, embeddings, return_threshold: float = 0.97, seed_threshold: float = 0.9,
+                 max_size: int = 256, persist_path: Optional[str] = None):
+        self.embeddings = embeddings
+        self.return_threshold = return_threshold
+        self.seed_threshold = seed_threshold
+        self.max_size = max_size
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.index_version = ""
+        self.hits = {RETURN: 0, SEED: 0}
+        self.misses = 0
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        if self.persist_path:
+            self._load()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def embed(self, query: str) -> np.ndarray:
+        return self._normalize(await self.embeddings.aembed_query(query))
+
+    def lookup(self, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Ближайшая запись и режим (return / seed) или None; для return подходят только проверенные результаты."""
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+            similarities = np.stack([e["vector"] for e in self._entries]) @ vector
+            best = None
+            for i in np.argsort(-similarities):
+                entry, similarity = self._entries[i], float(similarities[i])
+                if similarity < self.seed_threshold:
+                    break
+                if entry["valid"] and similarity >= self.return_threshold:
+                    best = (entry, similarity, RETURN)
+                    break
+                best = best or (entry, similarity, SEED)
+            if best is None:
+                self.misses += 1
+                return None
+            entry, similarity, mode = best
+            entry["last_used"] = time.time()
+            self.hits[mode] += 1
+            return {"mode": mode, "similarity": similarity, "query": entry["query"], "code": entry["code"]}
+
+    def put(self, query: str, vector: np.ndarray, code: str, errors: Any):
+        valid = not errors
+        with self._lock:
+            # Повтор того же запроса заменяет прежнюю запись
+            self._entries = [e for e in self._entries if e["query"] != query]
+            self._entries.append({
+                "query": query,
+                "vector": vector,
+                "code": code,
+                "valid": valid,
+                "errors": errors if isinstance(errors, (list, str)) else str(errors or ""),
+                "last_used": time.time(),
+            })
+            if len(self._entries) > self.max_size:
+                self._entries.sort(key=lambda e: e["last_used"])
+                del self._entries[:len(self._entries) - self.max_size]
+            if self.persist_path:
+                self._save()
+
+    def invalidate(self, index_version: str):
+        """Код, собранный по другой версии дизайн-системы, больше не отдаётся."""
+        with self._lock:
+            if index_version != self.index_version:
+                if self._entries:
+                    logger.info(f"Design system index changed, dropping {len(self._entries)} cached results")
+                self._entries = []
+                self.index_version = index_version
+                if self.persist_path:
+                    self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.hits.values()) + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "hit_rate": sum(self.hits.values()) / total if total else 0.0,
+            }
+
+    def _load(self):
+        if not self.persist_path.is_file():
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.index_version = data["index_version"]
+            for entry in data["entries"][-self.max_size:]:
+                self._entries.append({**entry, "vector": np.asarray(entry["vector"], dtype=np.float32)})
+            logger.info(f"Loaded {len(self._entries)} cached results from {self.persist_path}")
+        except Exception as e:
+            logger.error(f"Failed to load result cache {self.persist_path}: {e}")
+
+    def _save(self):
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "index_version": self.index_version,
+                    "entries": [{**e, "vector": e["vector"].tolist()} for e in self._entries],
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.error(f"Failed to save result cache {self.persist_path}: {e}")
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """NFKC, схлопнутые пробелы, без завершающей пунктуации. Регистр сохраняется: точные имена (IBox) его различают."""
+    return " ".join(unicodedata.normalize("NFKC", query).split()).rstrip(" .?!;:")
+
+
+class RetrievalCache:
+    """
+    LRU-кэш результатов ретриверов с TTL. Ключ — sha256 от пространства имён (def/dbg), версии индекса
+    и нормализованного запроса, поэтому после перестройки FAISS старые записи не совпадают и вычищаются
+    в invalidate. Если задан persist_path, записи дополнительно хранятся в SQLite, общем для воркеров:
+    промах в памяти проверяется по диску, прежде чем идти в индекс.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600, persist_path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.index_version = ""
+        self._entries: "OrderedDict[str, Tuple[float, List[Document]]]" = OrderedDict()
+        self._metrics: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def key(self, namespace: str, query: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{self.index_version}\0{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def _count(self, namespace: str, metric: str):
+        counters = self._metrics.setdefault(namespace, {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0})
+        counters[metric] += 1
+
+    def get(self, namespace: str, query: str) -> Optional[List[Document]]:
+        key = self.key(namespace, query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._count(namespace, "hits")
+                    return entry[1]
+                del self._entries[key]
+                self._count(namespace, "expired")
+        docs = self._disk_get(key, now) if self.persist_path else None
+        with self._lock:
+            if docs is None:
+                self._count(namespace, "misses")
+                return None
+            self._count(namespace, "disk_hits")
+            self._remember(key, docs[0], docs[1])
+            return docs[1]
+
+    def put(self, namespace: str, query: str, docs: List[Document]):
+        key = self.key(namespace, query)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, docs)
+        if self.persist_path:
+            self._disk_put(key, namespace, now, docs)
+
+    def invalidate(self, index_version: str):
+        """Новая версия индекса: память очищается, на диске удаляются записи других версий."""
+        with self._lock:
+            self.index_version = index_version
+            self._entries.clear()
+        if self.persist_path:
+            try:
+                with self._connection() as conn:
+                    conn.execute("DELETE FROM entries WHERE version != ?", (index_version,))
+            except sqlite3.Error as e:
+                logger.error(f"Failed to invalidate retrieval cache {self.persist_path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = {}
+            for namespace, counters in self._metrics.items():
+                total = counters["hits"] + counters["disk_hits"] + counters["misses"] + counters["expired"]
+                hits = counters["hits"] + counters["disk_hits"]
+                namespaces[namespace] = {**counters, "hit_rate": hits / total if total else 0.0}
+            return {"size": len(self._entries), "max_size": self.max_size, "namespaces": namespaces}
+
+    def _remember(self, key: str, stored_at: float, docs: List[Document]):
+        self._entries[key] = (stored_at, docs)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3-соединение нельзя делить между потоками — у каждого своё
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.persist_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, namespace TEXT, version TEXT, "
+                "stored_at REAL, docs TEXT)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, List[Document]]]:
+        try:
+            row = self._connection().execute(
+                "SELECT stored_at, docs FROM entries WHERE key = ? AND stored_at >= ?", (key, now - self.ttl)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read retrieval cache {self.persist_path}: {e}")
+            return None
+        if row is None:
+            return None
+        return row[0], [Document(**doc) for doc in json.loads(row[1])]
+
+    def _disk_put(self, key: str, namespace: str, stored_at: float, docs: List[Document]):
+        payload = json.dumps([{"page_content": d.page_content, "metadata": d.metadata, "id": d.id} for d in docs],
+                             ensure_ascii=False)
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                             (key, namespace, self.index_version, stored_at, payload))
+                conn.execute("DELETE FROM entries WHERE stored_at < ?", (stored_at - self.ttl,))
+                # Общий для воркеров предел размера: вытесняются самые старые записи
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_size,)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write retrieval cache {self.persist_path}: {e}")
@@ -0,0 +1,32 @@
+import threading
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    # Без tiktoken или без сети для загрузки словаря — грубая оценка
+                    print(f"tiktoken is unavailable, token counts are estimated as len/4: {e}")
+                    _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Число токенов cl100k_base; если словарь недоступен — len(text) / 4."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def tokens_exact() -> bool:
+    return _get_encoding() is not None
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ValidationCache:
+    """
+    LRU-кэш результатов TSXValidator.validate_tsx.
+    Ключ — sha256 от очищенного TSX и отпечатка окружения валидатора (tsconfig, версия ds-2.0),
+    поэтому после обновления зависимостей старые результаты просто перестают совпадать.
+    Если задан persist_path, кэш загружается при старте и сохраняется после каждой записи.
+    """
+
+    def __init__(self, max_size: int = 512, persist_path: Optional[str] = None):
+        self.max_size = max_size
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.persist_path:
+            self._load()
+
+    @staticmethod
+    def key(tsx_code: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{fingerprint}\0{tsx_code}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        # Исключения внутри валидатора (нет tsc и т.п.) приходят строками — их не кэшируем
+        if not all(isinstance(error, dict) for error in result.get("errors", [])):
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            if self.persist_path:
+                self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _load(self):
+        if not self.persist_path.is_file():
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            for key, result in list(entries.items())[-self.max_size:]:
+                self._entries[key] = result
+            logger.info(f"Loaded {len(self._entries)} cached validation results from {self.persist_path}")
+        except Exception as e:
+            logger.error(f"Failed to load validation cache {self.persist_path}: {e}")
+
+    def _save(self):
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.error(f"Failed to save validation cache {self.persist_path}: {e}")
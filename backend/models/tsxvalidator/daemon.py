@@ -0,0 +1,162 @@
+import json
+import logging
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "ls_worker.js"
+
+
+class DaemonError(RuntimeError):
+    pass
+
+
+class LanguageServiceDaemon:
+    """
+    Управляет долгоживущим node-процессом ls_worker.js, который держит прогретый ts.LanguageService.
+    Сбой проверки (падение процесса, таймаут, ошибка воркера) бросает DaemonError: TSXValidator проверяет этот код
+    одноразовым tsc, а следующая проверка снова идёт в демон, при необходимости перезапуская процесс.
+    Если сбоев подряд больше max_restarts, exhausted() становится True и TSXValidator отказывается от демона.
+    """
+
+    def __init__(
+            self,
+            base_dir: Path,
+            compiler_args: List[str],
+            node_path: Optional[str] = None,
+            startup_timeout: float = 120.0,
+            request_timeout: float = 30.0,
+            max_restarts: int = 3,
+    ):
+        self.base_dir = Path(base_dir)
+        self.compiler_args = compiler_args
+        self.node_path = node_path or shutil.which("node")
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        self.max_restarts = max_restarts
+        # Сбои подряд; сбрасывается после успешной проверки
+        self.restarts = 0
+
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def is_available(self) -> bool:
+        return bool(self.node_path) and WORKER_SCRIPT.is_file()
+
+    def exhausted(self) -> bool:
+        return self.restarts > self.max_restarts
+
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        if not self.is_available():
+            raise DaemonError("node or ls_worker.js not found")
+
+        cmd = [self.node_path, str(WORKER_SCRIPT), *self.compiler_args]
+        logger.info(f"Starting TS language service daemon: {' '.join(cmd)}")
+        started = time.perf_counter()
+        self._responses = queue.Queue()
+        self._process = subprocess.Popen(
+            cmd,
+            cwd=str(self.base_dir),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_stdout, args=(self._process, self._responses), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self._process,), daemon=True).start()
+
+        ready = self._wait_response(self.startup_timeout)
+        if not ready or not ready.get("ready"):
+            self.stop()
+            raise DaemonError(f"Language service daemon failed to start: {ready}")
+        logger.info(f"TS language service daemon ready in {time.perf_counter() - started:.2f}s")
+
+    def stop(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=5)
+        except Exception:
+            process.kill()
+
+    def check(self, tsx_code: str) -> str:
+        """Возвращает вывод в формате tsc для переданного исходника."""
+        with self._lock:
+            if not self.is_available():
+                self.restarts = self.max_restarts + 1
+                raise DaemonError("node or ls_worker.js not found")
+            try:
+                output = self._request(tsx_code)
+            except DaemonError as e:
+                # Тот же код не повторяем: вход, роняющий воркер, уронил бы его снова. Процесс перезапустится
+                # на следующей проверке, если он упал
+                self.restarts += 1
+                logger.warning(
+                    f"TS language service daemon failed ({self.restarts}/{self.max_restarts + 1} in a row): {e}"
+                )
+                raise
+            # Лимит — на сбои подряд: редкие несвязанные сбои за время жизни процесса его не исчерпывают
+            self.restarts = 0
+            return output
+
+    def _request(self, tsx_code: str) -> str:
+        if not self.is_running():
+            self.start()
+
+        self._next_id += 1
+        request_id = self._next_id
+        try:
+            self._process.stdin.write(json.dumps({"id": request_id, "code": tsx_code}) + "\n")
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.stop()
+            raise DaemonError(f"Daemon pipe is closed: {e}")
+
+        deadline = time.monotonic() + self.request_timeout
+        while True:
+            response = self._wait_response(max(deadline - time.monotonic(), 0))
+            if response is None:
+                self.stop()
+                raise DaemonError("Daemon crashed or timed out")
+            if response.get("id") != request_id:
+                # Ответ на запрос, по которому уже сработал таймаут
+                continue
+            if "error" in response:
+                raise DaemonError(response["error"])
+            return response.get("output", "")
+
+    def _wait_response(self, timeout: float) -> Optional[dict]:
+        try:
+            return self._responses.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, responses: queue.Queue):
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                logger.debug(f"Daemon stdout: {line.rstrip()}")
+        # EOF — процесс завершился
+        responses.put(None)
+
+    @staticmethod
+    def _read_stderr(process: subprocess.Popen):
+        for line in process.stderr:
+            logger.debug(f"Daemon stderr: {line.rstrip()}")
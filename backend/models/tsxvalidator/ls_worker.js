@@ -0,0 +1,98 @@
+// Долгоживущий процесс проверки TSX поверх ts.LanguageService.
+//
+// Запускается из tsx_validator_env (cwd), держит в памяти программу с lib.d.ts,
+// типами React и @nlmk/ds-2.0 и проверяет только присланный исходник.
+// Протокол: одна JSON-строка на запрос в stdin ({"id", "code"}),
+// одна JSON-строка на ответ в stdout ({"id", "output"} или {"id", "error"}).
+// "output" форматируется так же, как вывод tsc, чтобы Python-часть
+// разбирала его тем же TSXValidator._parse_errors.
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+
+function loadTypescript() {
+  try {
+    return require(path.join(process.cwd(), 'node_modules', 'typescript'));
+  } catch (e) {
+    return require('typescript');
+  }
+}
+
+const ts = loadTypescript();
+const cwd = process.cwd();
+// Те же флаги, что и у одноразового запуска tsc — результаты должны совпадать
+const options = ts.parseCommandLine(process.argv.slice(2)).options;
+const checkFile = path.join(cwd, 'src', '__ls_check__.tsx');
+
+let version = 0;
+let source = '';
+
+const host = {
+  getScriptFileNames: () => [checkFile],
+  getScriptVersion: (fileName) => (fileName === checkFile ? String(version) : '0'),
+  getScriptSnapshot: (fileName) => {
+    if (fileName === checkFile) {
+      return ts.ScriptSnapshot.fromString(source);
+    }
+    if (!fs.existsSync(fileName)) {
+      return undefined;
+    }
+    return ts.ScriptSnapshot.fromString(fs.readFileSync(fileName, 'utf8'));
+  },
+  getCurrentDirectory: () => cwd,
+  getCompilationSettings: () => options,
+  getDefaultLibFileName: (opts) => ts.getDefaultLibFilePath(opts),
+  fileExists: ts.sys.fileExists,
+  readFile: ts.sys.readFile,
+  readDirectory: ts.sys.readDirectory,
+  directoryExists: ts.sys.directoryExists,
+  getDirectories: ts.sys.getDirectories,
+};
+
+const service = ts.createLanguageService(host, ts.createDocumentRegistry());
+
+function formatDiagnostic(diagnostic) {
+  const message = ts.flattenDiagnosticMessageText(diagnostic.messageText, '\n  ');
+  const category = ts.DiagnosticCategory[diagnostic.category].toLowerCase();
+  if (!diagnostic.file) {
+    return `${category} TS${diagnostic.code}: ${message}`;
+  }
+  const { line, character } = diagnostic.file.getLineAndCharacterOfPosition(diagnostic.start || 0);
+  const fileName = path.relative(cwd, diagnostic.file.fileName).split(path.sep).join('/');
+  return `${fileName}(${line + 1},${character + 1}): ${category} TS${diagnostic.code}: ${message}`;
+}
+
+function check(code) {
+  source = code;
+  version += 1;
+  const diagnostics = [
+    ...service.getSyntacticDiagnostics(checkFile),
+    ...service.getSemanticDiagnostics(checkFile),
+  ];
+  return diagnostics.map(formatDiagnostic).join('\n');
+}
+
+function reply(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+// Прогрев: загружаем декларации React и дизайн-системы до первого запроса
+check("import React from 'react';\nimport * as ds from '@nlmk/ds-2.0';\n");
+reply({ ready: true });
+
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (e) {
+    reply({ id: null, error: `Invalid request: ${e.message}` });
+    return;
+  }
+  try {
+    reply({ id: request.id, output: check(request.code) });
+  } catch (e) {
+    reply({ id: request.id, error: String(e && e.stack ? e.stack : e) });
+  }
+});
+rl.on('close', () => process.exit(0));
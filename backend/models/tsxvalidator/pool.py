@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from backend.models.tsxvalidator.validator import TSXValidator
+
+logger = logging.getLogger(__name__)
+
+
+class ValidatorPoolSaturated(RuntimeError):
+    pass
+
+
+class WorkerMetrics:
+    def __init__(self):
+        self.checks = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.check_time_total = 0.0
+        self.check_time_max = 0.0
+
+    def record(self, queue_wait: float, check_time: float):
+        self.checks += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.check_time_total += check_time
+        self.check_time_max = max(self.check_time_max, check_time)
+
+    def as_dict(self) -> Dict[str, Any]:
+        checks = self.checks or 1
+        return {
+            "checks": self.checks,
+            "queue_wait_avg_ms": self.queue_wait_total / checks * 1000,
+            "queue_wait_max_ms": self.queue_wait_max * 1000,
+            "check_time_avg_ms": self.check_time_total / checks * 1000,
+            "check_time_max_ms": self.check_time_max * 1000,
+        }
+
+
+class ValidatorPool:
+    """
+    Пул из size экземпляров TSXValidator, каждый со своим tsc/демоном.
+    Проверки выполняются в потоках, поэтому не блокируют event loop LangGraph.
+    Очередь ограничена max_queue ожидающими проверками сверх занятых воркеров:
+    при переполнении validate/avalidate бросают ValidatorPoolSaturated.
+    """
+
+    def __init__(
+            self,
+            size: Optional[int] = None,
+            max_queue: Optional[int] = None,
+            timeout: float = 60.0,
+            base_dir: str = "./tsx_validator_env",
+            mode: Optional[str] = None,
+    ):
+        self.size = size or os.cpu_count() or 1
+        self.max_queue = max_queue if max_queue is not None else self.size * 4
+        self.timeout = timeout
+
+        self.validators = [TSXValidator(base_dir, mode=mode, name=f"worker{i}") for i in range(self.size)]
+        self._idle: "queue.Queue[TSXValidator]" = queue.Queue()
+        for v in self.validators:
+            self._idle.put(v)
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="tsx-validator")
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.metrics = {v.name: WorkerMetrics() for v in self.validators}
+
+    def environment_fingerprint(self) -> str:
+        return self.validators[0].environment_fingerprint()
+
+    def validate(self, tsx_code: str) -> Dict[str, Any]:
+        future = self._submit(tsx_code)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            self._on_timeout(future)
+            raise
+
+    async def avalidate(self, tsx_code: str) -> Dict[str, Any]:
+        future = self._submit(tsx_code)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._on_timeout(future)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "workers": {name: m.as_dict() for name, m in self.metrics.items()},
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for v in self.validators:
+            v.close()
+
+    def _submit(self, tsx_code: str):
+        with self._lock:
+            if self._pending >= self.size + self.max_queue:
+                self.rejected += 1
+                raise ValidatorPoolSaturated(
+                    f"Validator pool is saturated: {self._pending} checks pending, limit {self.size + self.max_queue}"
+                )
+            self._pending += 1
+        try:
+            future = self._executor.submit(self._run, tsx_code, time.perf_counter())
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _run(self, tsx_code: str, submitted_at: float) -> Dict[str, Any]:
+        validator = self._idle.get()
+        started = time.perf_counter()
+        try:
+            return validator.validate_tsx(tsx_code)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.metrics[validator.name].record(started - submitted_at, finished - started)
+            self._idle.put(validator)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _on_timeout(self, future):
+        # Если проверка ещё в очереди — снимаем её, уже запущенный tsc доработает в своём потоке
+        future.cancel()
+        with self._lock:
+            self.timeouts += 1
+        logger.warning(f"TSX validation timed out after {self.timeout}s")
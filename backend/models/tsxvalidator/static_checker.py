@@ -0,0 +1,385 @@
+import difflib
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from backend.parsers.declarations import DS_PACKAGE, parse_ds_imports
+
+logger = logging.getLogger(__name__)
+
+LOCATION = "Номер строки c ошибкой {line} и индекс символа {column}"
+PAIRS = {"(": ")", "[": "]", "{": "}"}
+# После этих символов и слов '<' открывает JSX, а не сравнение или generic
+JSX_PREV_CHARS = set("(,=:?{}[;&|!>")
+JSX_PREV_WORDS = {"return", "yield", "default", "case", "else", "await"}
+# После этих символов и слов '/' начинает литерал регулярного выражения, а не деление.
+# После '}' это зависит от того, закрыт блок или объект, — такой случай решает tsc
+REGEX_PREV_CHARS = set("(,=:?[{;&|!~^<>")
+REGEX_PREV_WORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do",
+                    "else", "yield", "await"}
+ALWAYS_ALLOWED_PROPS = {"key", "ref"}
+
+IDENT = re.compile(r"[A-Za-z_$][\w$]*")
+TAG_NAME = re.compile(r"[A-Za-z_$][\w$.:-]*")
+ATTR_NAME = re.compile(r"[A-Za-z_$][\w$:-]*")
+CLOSE_TAG = re.compile(r"</\s*([\w$.:-]*)\s*>")
+DS_IMPORT_STATEMENT = re.compile(r"import\s*(?:type\s*)?\{(?P<names>[^}]*)\}\s*from\s*['\"]" + re.escape(DS_PACKAGE) + r"['\"]")
+
+
+class _ScanAbort(Exception):
+    """Синтаксис, который сканер не может уверенно разобрать — дальше решает tsc."""
+
+
+class _JSXScanner:
+    """
+    Однопроходный разбор TSX: баланс скобок, строк и JSX-тегов плюс список использованных тегов
+    с атрибутами. Не пытается быть парсером TypeScript: на неоднозначном синтаксисе прекращает
+    проверку структуры, не сообщая ошибок.
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self.n = len(code)
+        self.errors: List[Dict[str, str]] = []
+        self.tags: List[Dict[str, Any]] = []
+        self.truncated = False
+
+    def run(self):
+        try:
+            self.scan_js(0, None)
+        except _ScanAbort:
+            pass
+
+    def error(self, pos: int, code: str, message: str):
+        self.errors.append(make_error(self.code, pos, code, message))
+
+    def eof(self, code: str, message: str):
+        # Об обрыве сообщаем один раз — по самой внутренней незакрытой конструкции
+        if not self.truncated:
+            self.truncated = True
+            self.error(self.n, code, f"{message} The code ends unexpectedly, it looks truncated.")
+
+    def scan_js(self, pos: int, stop: Optional[str]) -> int:
+        code, n = self.code, self.n
+        stack = []
+        prev, prev_word = "", ""
+        while pos < n:
+            ch = code[pos]
+            if ch.isspace():
+                pos += 1
+            elif code.startswith("//", pos):
+                end = code.find("\n", pos)
+                pos = n if end == -1 else end
+            elif code.startswith("/*", pos):
+                end = code.find("*/", pos + 2)
+                if end == -1:
+                    self.eof("TS1010", "'*/' expected.")
+                    return n
+                pos = end + 2
+            elif ch in "'\"":
+                pos = self.skip_string(pos)
+                prev, prev_word = ch, ""
+            elif ch == "`":
+                pos = self.skip_template(pos)
+                prev, prev_word = ch, ""
+            elif ch in PAIRS:
+                stack.append((ch, pos))
+                prev, prev_word = ch, ""
+                pos += 1
+            elif ch in ")]}":
+                if not stack:
+                    if ch == stop:
+                        return pos
+                    self.error(pos, "TS1128", "Declaration or statement expected.")
+                    raise _ScanAbort()
+                opened, _ = stack.pop()
+                if PAIRS[opened] != ch:
+                    self.error(pos, "TS1005", f"'{PAIRS[opened]}' expected.")
+                    raise _ScanAbort()
+                prev, prev_word = ch, ""
+                pos += 1
+            elif ch == "<" and self.is_jsx_start(pos, prev, prev_word):
+                pos = self.scan_element(pos)
+                prev, prev_word = ")", ""
+            elif ch == "/" and self.is_regex_start(prev, prev_word):
+                pos = self.skip_regex(pos)
+                prev, prev_word = ")", ""
+            else:
+                m = IDENT.match(code, pos)
+                if m:
+                    prev, prev_word = "a", m.group()
+                    pos = m.end()
+                else:
+                    prev, prev_word = ch, ""
+                    pos += 1
+
+        if stack:
+            self.eof("TS1005", f"'{PAIRS[stack[-1][0]]}' expected.")
+        elif stop:
+            self.eof("TS1005", f"'{stop}' expected.")
+        return n
+
+    def is_jsx_start(self, pos: int, prev: str, prev_word: str) -> bool:
+        if pos + 1 >= self.n or not (self.code[pos + 1].isalpha() or self.code[pos + 1] == ">"):
+            return False
+        if prev == "a":
+            return prev_word in JSX_PREV_WORDS
+        return prev == "" or prev in JSX_PREV_CHARS
+
+    @staticmethod
+    def is_regex_start(prev: str, prev_word: str) -> bool:
+        if prev == "}":
+            raise _ScanAbort()
+        if prev == "a":
+            return prev_word in REGEX_PREV_WORDS
+        return prev == "" or prev in REGEX_PREV_CHARS
+
+    def skip_regex(self, pos: int) -> int:
+        code = self.code
+        i, in_class = pos + 1, False
+        while i < self.n:
+            if code[i] == "\\":
+                i += 2
+            elif code[i] == "\n":
+                raise _ScanAbort()
+            elif in_class:
+                in_class = code[i] != "]"
+                i += 1
+            elif code[i] == "[":
+                in_class = True
+                i += 1
+            elif code[i] == "/":
+                m = IDENT.match(code, i + 1)
+                return m.end() if m else i + 1
+            else:
+                i += 1
+        raise _ScanAbort()
+
+    def skip_string(self, pos: int) -> int:
+        code, quote = self.code, self.code[pos]
+        i = pos + 1
+        while i < self.n:
+            if code[i] == "\\":
+                i += 2
+            elif code[i] == quote:
+                return i + 1
+            elif code[i] == "\n":
+                self.error(pos, "TS1002", "Unterminated string literal.")
+                raise _ScanAbort()
+            else:
+                i += 1
+        self.eof("TS1002", "Unterminated string literal.")
+        return self.n
+
+    def skip_template(self, pos: int) -> int:
+        code = self.code
+        i = pos + 1
+        while i < self.n:
+            if code[i] == "\\":
+                i += 2
+            elif code[i] == "`":
+                return i + 1
+            elif code.startswith("${", i):
+                end = self.scan_js(i + 2, "}")
+                if end >= self.n:
+                    return self.n
+                i = end + 1
+            else:
+                i += 1
+        self.eof("TS1160", "Unterminated template literal.")
+        return self.n
+
+    def skip_ws(self, pos: int) -> int:
+        while pos < self.n and self.code[pos].isspace():
+            pos += 1
+        return pos
+
+    def scan_element(self, start: int) -> int:
+        code = self.code
+        pos = start + 1
+        if code[pos] == ">":
+            return self.scan_children(pos + 1, "")
+
+        m = TAG_NAME.match(code, pos)
+        if not m:
+            raise _ScanAbort()
+        tag = {"name": m.group(), "pos": start, "attrs": [], "spread": False, "children": False}
+        self.tags.append(tag)
+        pos = m.end()
+
+        while True:
+            pos = self.skip_ws(pos)
+            if pos >= self.n:
+                self.eof("TS1005", "'>' expected.")
+                return self.n
+            ch = code[pos]
+            if code.startswith("/>", pos):
+                return pos + 2
+            if ch == ">":
+                return self.scan_children(pos + 1, tag["name"], tag)
+            if ch == "{":
+                end = self.scan_js(pos + 1, "}")
+                if end >= self.n:
+                    return self.n
+                if code[pos + 1:end].lstrip().startswith("..."):
+                    tag["spread"] = True
+                pos = end + 1
+                continue
+
+            m = ATTR_NAME.match(code, pos)
+            if not m:
+                raise _ScanAbort()
+            tag["attrs"].append(m.group())
+            pos = self.skip_ws(m.end())
+            if pos >= self.n or code[pos] != "=":
+                continue
+            pos = self.skip_ws(pos + 1)
+            if pos >= self.n:
+                self.eof("TS1005", "'>' expected.")
+                return self.n
+            ch = code[pos]
+            if ch in "'\"":
+                end = code.find(ch, pos + 1)
+                if end == -1:
+                    self.eof("TS1002", "Unterminated string literal.")
+                    return self.n
+                pos = end + 1
+            elif ch == "{":
+                end = self.scan_js(pos + 1, "}")
+                if end >= self.n:
+                    return self.n
+                pos = end + 1
+            elif ch == "<":
+                pos = self.scan_element(pos)
+            else:
+                raise _ScanAbort()
+
+    def scan_children(self, pos: int, name: str, tag: Optional[dict] = None) -> int:
+        code = self.code
+        while pos < self.n:
+            ch = code[pos]
+            if ch == "<" and code.startswith("</", pos):
+                m = CLOSE_TAG.match(code, pos)
+                if not m:
+                    if CLOSE_TAG.match(code + ">", pos) or code[pos:].strip() == "</":
+                        self.eof("TS1005", "'>' expected.")
+                        return self.n
+                    raise _ScanAbort()
+                if m.group(1) != name:
+                    self.error(pos, "TS17002", f"Expected corresponding JSX closing tag for '{name or '<>'}'.")
+                    raise _ScanAbort()
+                return m.end()
+            if tag is not None and not ch.isspace():
+                tag["children"] = True
+            if ch == "<":
+                pos = self.scan_element(pos)
+            elif ch == "{":
+                end = self.scan_js(pos + 1, "}")
+                if end >= self.n:
+                    return self.n
+                pos = end + 1
+            else:
+                pos += 1
+
+        if name:
+            self.eof("TS17008", f"JSX element '{name}' has no corresponding closing tag.")
+        else:
+            self.eof("TS17014", "JSX fragment has no corresponding closing tag.")
+        return self.n
+
+
+def make_error(code: str, pos: int, error_code: str, message: str) -> Dict[str, str]:
+    """Ошибка в том же виде, что возвращает TSXValidator._parse_errors."""
+    pos = min(pos, len(code))
+    line = code.count("\n", 0, pos) + 1
+    column = pos - (code.rfind("\n", 0, pos) + 1) + 1
+    return {
+        "location": LOCATION.format(line=line, column=column),
+        "code": error_code,
+        "message": message,
+    }
+
+
+class StaticChecker:
+    """
+    Быстрая проверка сгенерированного TSX до запуска tsc: обрыв кода и баланс скобок/JSX,
+    импорты несуществующих экспортов @nlmk/ds-2.0, неизвестные и пропущенные обязательные пропсы.
+    Схема строится backend.parsers.declarations.build_design_system_schema.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.exports = set(schema.get("exports", []))
+        self.export_patterns = [re.compile(p) for p in schema.get("export_patterns", [])]
+        self.components = schema.get("components", {})
+
+    def check(self, tsx_code: str) -> List[Dict[str, str]]:
+        errors = self._check_imports(tsx_code)
+
+        scanner = _JSXScanner(tsx_code)
+        scanner.run()
+        errors += scanner.errors
+        if not scanner.truncated:
+            errors += self._check_props(tsx_code, scanner.tags)
+
+        if errors:
+            logger.info(f"Static check found {len(errors)} errors")
+        return errors
+
+    def _is_exported(self, name: str) -> bool:
+        return name in self.exports or any(p.match(name) for p in self.export_patterns)
+
+    def _check_imports(self, code: str) -> List[Dict[str, str]]:
+        errors = []
+        if not self.exports:
+            return errors
+        for statement in DS_IMPORT_STATEMENT.finditer(code):
+            names_start = statement.start("names")
+            for m in re.finditer(r"(?:type\s+)?([A-Za-z_$][\w$]*)(?:\s+as\s+[A-Za-z_$][\w$]*)?", statement["names"]):
+                name = m.group(1)
+                if self._is_exported(name):
+                    continue
+                pos = names_start + m.start(1)
+                suggestion = difflib.get_close_matches(name, self.exports, n=1)
+                if suggestion:
+                    errors.append(make_error(
+                        code, pos, "TS2724",
+                        f"'\"{DS_PACKAGE}\"' has no exported member named '{name}'. Did you mean '{suggestion[0]}'?"
+                    ))
+                else:
+                    errors.append(make_error(
+                        code, pos, "TS2305", f"Module '\"{DS_PACKAGE}\"' has no exported member '{name}'."
+                    ))
+        return errors
+
+    def _check_props(self, code: str, tags: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        errors = []
+        imports = parse_ds_imports(code)
+        for tag in tags:
+            component = self.components.get(imports.get(tag["name"], ""))
+            if not component:
+                continue
+            interface = component["interface"]
+            props = component["props"]
+
+            if component["closed"]:
+                for attr in tag["attrs"]:
+                    if attr in props or attr in ALWAYS_ALLOWED_PROPS or "-" in attr:
+                        continue
+                    errors.append(make_error(
+                        code, tag["pos"], "TS2322",
+                        f"Property '{attr}' does not exist on type 'IntrinsicAttributes & {interface}'."
+                    ))
+
+            if tag["spread"]:
+                continue
+            for prop, meta in props.items():
+                if not meta["required"] or prop in tag["attrs"]:
+                    continue
+                if prop == "children" and tag["children"]:
+                    continue
+                errors.append(make_error(
+                    code, tag["pos"], "TS2741",
+                    f"Property '{prop}' is missing in type '{{ {', '.join(tag['attrs'])} }}' "
+                    f"but required in type '{interface}'."
+                ))
+        return errors
@@ -6,30 +6,63 @@ import json
 import uuid
 import shutil
 import sys
+import atexit
+import hashlib
+import threading
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("tsx_validator.log"),
-        logging.StreamHandler()
-    ]
-)
+from backend.models.tsxvalidator.daemon import LanguageServiceDaemon, DaemonError
+
 logger = logging.getLogger(__name__)
 
+# Флаги проверки одного файла; используются и одноразовым tsc, и демоном
+TSC_CHECK_FLAGS = [
+    "--noEmit",
+    "--jsx", "react-jsx",
+    "--esModuleInterop",
+    "--allowSyntheticDefaultImports",
+    "--skipLibCheck",
+]
+
+# Те же флаги в виде compilerOptions для tsconfig инкрементальной сборки
+TSC_CHECK_OPTIONS = {
+    "noEmit": True,
+    "jsx": "react-jsx",
+    "esModuleInterop": True,
+    "allowSyntheticDefaultImports": True,
+    "skipLibCheck": True,
+}
+
+# "daemon" — прогретый ts.LanguageService с откатом на tsc,
+# "incremental" — tsc --incremental с сохранённым .tsbuildinfo,
+# "oneshot" — новый процесс tsc на каждую проверку
+VALIDATOR_MODES = ("daemon", "incremental", "oneshot")
+
+# Кэш инкрементальной сборки внутри tsx_validator_env
+INCREMENTAL_DIR = ".tsbuild"
+
 
 class TSXValidator:
-    def __init__(self, base_dir: str = "./tsx_validator_env"):
+    def __init__(self, base_dir: str = "./tsx_validator_env", mode: Optional[str] = None, name: str = "main"):
         self.base_dir = Path(base_dir).resolve()
+        self.name = name
         self.npm_path = shutil.which("npm") or "npm"
         self.use_shell = sys.platform.startswith("win")
+        self.mode = mode or os.environ.get("TSX_VALIDATOR_MODE", "daemon")
+        if self.mode not in VALIDATOR_MODES:
+            raise ValueError(f"Unknown validator mode: {self.mode}, expected one of {VALIDATOR_MODES}")
         self.tsc_path: Optional[str] = self._check_typescript()
         if not self.base_dir.is_dir():
             self.setup_environment()
 
+        self.daemon: Optional[LanguageServiceDaemon] = None
+        if self.mode == "daemon":
+            self.daemon = LanguageServiceDaemon(self.base_dir, TSC_CHECK_FLAGS)
+            atexit.register(self.close)
+
+        self._incremental_lock = threading.Lock()
+
     def setup_environment(self):
         logger.info(f"Настройка окружения в {self.base_dir}")
         self.base_dir.mkdir(parents=True, exist_ok=True)
@@ -141,6 +174,25 @@ class TSXValidator:
 
     def validate_tsx(self, tsx_code: str) -> Dict[str, Any]:
         logger.info("Starting TSX code validation")
+        if self.daemon is not None:
+            try:
+                return self._result_from_output(self.daemon.check(tsx_code))
+            except DaemonError as e:
+                if self.daemon.exhausted():
+                    logger.warning(f"Language service daemon keeps failing, switching to one-shot tsc: {e}")
+                    self.close()
+                else:
+                    logger.warning(f"Language service daemon failed, checking this code with one-shot tsc: {e}")
+        if self.mode == "incremental":
+            return self._validate_incremental(tsx_code)
+        return self._validate_oneshot(tsx_code)
+
+    def close(self):
+        daemon, self.daemon = self.daemon, None
+        if daemon is not None:
+            daemon.stop()
+
+    def _validate_oneshot(self, tsx_code: str) -> Dict[str, Any]:
         unique_id = uuid.uuid4().hex
         temp_file = self.base_dir / "src" / f"temp_{unique_id}.tsx"
 
@@ -156,15 +208,7 @@ class TSXValidator:
             if not self.tsc_path:
                 raise RuntimeError("TypeScript compiler not found")
 
-            cmd = [
-                self.tsc_path,
-                "--noEmit",
-                "--jsx", "react-jsx",
-                "--esModuleInterop",
-                "--allowSyntheticDefaultImports",
-                "--skipLibCheck",
-                str(abs_temp_file)
-            ]
+            cmd = [self.tsc_path, *TSC_CHECK_FLAGS, str(abs_temp_file)]
             logger.debug(f"Executing command: {' '.join(cmd)}")
 
             result = self._run_command(cmd)
@@ -173,19 +217,101 @@ class TSXValidator:
             logger.debug(f"Command errors: {result.stderr}")
             logger.debug(f"Return code: {result.returncode}")
 
-            parsed_errors = self._parse_errors(result.stderr or result.stdout)
-            if not parsed_errors:
-                logger.info("TSX code validation successful")
-                return {"valid": True, "errors": []}
-            else:
-                logger.warning("Errors found during TSX code validation")
-                return {"valid": False, "errors": parsed_errors}
+            return self._result_from_output(result.stderr or result.stdout)
         except Exception as e:
             logger.exception("Unexpected error during validation")
             return {"valid": False, "errors": [str(e)]}
         finally:
             self._clean_up(temp_file)
 
+    def _validate_incremental(self, tsx_code: str) -> Dict[str, Any]:
+        # Один файл проверки на экземпляр: .tsbuildinfo видит тот же путь и перепроверяет только его
+        with self._incremental_lock:
+            check_file = self.base_dir / "src" / f"incremental_{self.name}.tsx"
+            try:
+                if not self.tsc_path:
+                    raise RuntimeError("TypeScript compiler not found")
+
+                tsconfig_path = self._prepare_incremental_build(check_file)
+                with open(check_file, "w", encoding='utf-8') as f:
+                    f.write(tsx_code)
+
+                cmd = [self.tsc_path, "-p", str(tsconfig_path)]
+                logger.debug(f"Executing command: {' '.join(cmd)}")
+                result = self._run_command(cmd)
+                logger.debug(f"Return code: {result.returncode}")
+
+                return self._result_from_output(result.stderr or result.stdout)
+            except Exception as e:
+                logger.exception("Unexpected error during incremental validation")
+                return {"valid": False, "errors": [str(e)]}
+
+    def _prepare_incremental_build(self, check_file: Path) -> Path:
+        """
+        Готовит tsconfig для `tsc -p` с включённым incremental.
+        Кэш лежит в .tsbuild/<ключ>, где ключ зависит от package-lock.json и флагов проверки:
+        после обновления зависимостей старый .tsbuildinfo удаляется и сборка начинается с нуля.
+        """
+        cache_key = self.incremental_cache_key()
+        incremental_root = self.base_dir / INCREMENTAL_DIR
+        build_dir = incremental_root / cache_key
+        if incremental_root.is_dir():
+            for stale in incremental_root.iterdir():
+                if stale.is_dir() and stale.name != cache_key:
+                    logger.info(f"Removing stale incremental build cache: {stale}")
+                    shutil.rmtree(stale, ignore_errors=True)
+        build_dir.mkdir(parents=True, exist_ok=True)
+
+        tsconfig_path = build_dir / f"tsconfig.{self.name}.json"
+        if not tsconfig_path.exists():
+            tsconfig = {
+                "compilerOptions": {
+                    **TSC_CHECK_OPTIONS,
+                    "incremental": True,
+                    "tsBuildInfoFile": f"./{self.name}.tsbuildinfo",
+                },
+                "files": [os.path.relpath(check_file, build_dir).replace(os.sep, "/")],
+            }
+            with open(tsconfig_path, "w") as f:
+                json.dump(tsconfig, f, indent=2)
+        return tsconfig_path
+
+    def incremental_cache_key(self) -> str:
+        digest = hashlib.sha256(json.dumps(TSC_CHECK_OPTIONS, sort_keys=True).encode())
+        lock_path = self.base_dir / "package-lock.json"
+        if lock_path.exists():
+            digest.update(lock_path.read_bytes())
+        return digest.hexdigest()[:16]
+
+    def environment_fingerprint(self) -> str:
+        """Отпечаток окружения проверки: флаги tsc, tsconfig.json и установленная версия @nlmk/ds-2.0."""
+        digest = hashlib.sha256(json.dumps(TSC_CHECK_FLAGS).encode())
+        tsconfig_path = self.base_dir / "tsconfig.json"
+        if tsconfig_path.exists():
+            digest.update(tsconfig_path.read_bytes())
+
+        ds_version = None
+        ds_package = self.base_dir / "node_modules" / "@nlmk" / "ds-2.0" / "package.json"
+        try:
+            with open(ds_package, "r", encoding="utf-8") as f:
+                ds_version = json.load(f).get("version")
+        except (OSError, ValueError):
+            package_json = self.base_dir / "package.json"
+            if package_json.exists():
+                with open(package_json, "r", encoding="utf-8") as f:
+                    ds_version = json.load(f).get("dependencies", {}).get("@nlmk/ds-2.0")
+        digest.update(f"@nlmk/ds-2.0@{ds_version}".encode())
+        return digest.hexdigest()
+
+    def _result_from_output(self, output: str) -> Dict[str, Any]:
+        parsed_errors = self._parse_errors(output)
+        if not parsed_errors:
+            logger.info("TSX code validation successful")
+            return {"valid": True, "errors": []}
+        else:
+            logger.warning("Errors found during TSX code validation")
+            return {"valid": False, "errors": parsed_errors}
+
     def _log_file_contents(self, file_path: Path):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ResourceUnavailable(RuntimeError):
+    pass
+
+
+class Resource:
+    def __init__(self, name: str, loader: Callable[[], None], requires: Iterable[str] = (), optional: bool = False):
+        self.name = name
+        self.loader = loader
+        self.requires = tuple(requires)
+        # Без необязательного ресурса запросы работают в упрощённом режиме, его сбой не снимает готовность
+        self.optional = optional
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        return self._done.wait(timeout)
+
+    def finish(self, state: str, error: Optional[str] = None):
+        self.state = state
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+    def as_dict(self) -> Dict[str, Any]:
+        seconds = None
+        if self.started_at is not None:
+            seconds = (self.finished_at or time.monotonic()) - self.started_at
+        return {"state": self.state, "error": self.error, "seconds": seconds, "optional": self.optional}
+
+
+class Warmup:
+    """
+    Фоновая загрузка тяжёлых ресурсов (индексы, валидатор, описания компонентов).
+    Каждый ресурс грузится в своём потоке после своих зависимостей; запрос ждёт только
+    те ресурсы, которые ему нужны. Загрузка стартует явно через start() при запуске сервера
+    или лениво — при первом ожидании.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.resources: Dict[str, Resource] = {}
+        self._started = False
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], None], requires: Iterable[str] = (), optional: bool = False):
+        self.resources[name] = Resource(name, loader, requires, optional)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for resource in self.resources.values():
+            threading.Thread(target=self._load, args=(resource,), name=f"warmup-{resource.name}", daemon=True).start()
+
+    def _load(self, resource: Resource):
+        for name in resource.requires:
+            dependency = self.resources[name]
+            dependency.wait(None)
+            if dependency.state != READY:
+                resource.finish(FAILED, f"dependency '{name}' failed")
+                logger.error(f"Warm-up of {resource.name} skipped: dependency {name} failed")
+                return
+
+        resource.state = LOADING
+        resource.started_at = time.monotonic()
+        try:
+            resource.loader()
+        except Exception as e:
+            resource.finish(FAILED, str(e))
+            logger.error(f"Warm-up of {resource.name} failed: {e}")
+            return
+        resource.finish(READY)
+        logger.info(f"Warm-up of {resource.name} finished in {resource.as_dict()['seconds']:.2f}s")
+
+    def wait(self, *names: str):
+        self.start()
+        for name in names:
+            resource = self.resources[name]
+            if not resource.wait(self.timeout):
+                raise ResourceUnavailable(f"Resource '{name}' is still loading")
+            if resource.state != READY:
+                raise ResourceUnavailable(f"Resource '{name}' failed to load: {resource.error}")
+
+    async def await_ready(self, *names: str):
+        # Быстрый путь без перехода в поток, когда всё уже загружено
+        if self._started and all(self.resources[n].state == READY for n in names):
+            return
+        await asyncio.to_thread(self.wait, *names)
+
+    def is_ready(self) -> bool:
+        """Все обязательные ресурсы загружены, необязательные загружены или упали (а не грузятся)."""
+        return all(r.state == READY or (r.optional and r.state == FAILED) for r in self.resources.values())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "started": self._started,
+            "resources": {name: r.as_dict() for name, r in self.resources.items()},
+        }
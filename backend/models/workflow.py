@@ -1,38 +1,135 @@
 import asyncio
+import hashlib
 import logging
 import os
 import re
-from typing import Dict, Any, Union, List
+import threading
+import time
+from typing import Dict, Any, Union, List, AsyncIterator
 
 from langchain_community.vectorstores import FAISS
 from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser, CommaSeparatedListOutputParser
 from langchain_core.runnables import chain
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.constants import END
 from langgraph.graph import StateGraph
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from backend.models.checkpoints import BoundedMemorySaver
+from backend.models.component_shortlist import ComponentShortlist, imported_components
+from backend.models.context_packing import ContextPacker, interleave
+from backend.models.errors_analizer import ErrorDocsResolver
+from backend.models.llm_cache import LLMResponseCache
 from backend.models.prompts import code_sample, FUNNEL, CODER, DEBUGGER, FUNNEL_ITER, CODER_ITER, QUERY_GENERATOR
-from backend.models.tsxvalidator.validator import TSXValidator
-from backend.parsers.recursive import get_comps_descs, parse_recursivly_store_faiss
+from backend.models.result_cache import RETURN as RESULT_RETURN, SemanticResultCache
+from backend.models.retrieval_cache import RetrievalCache
+from backend.models.tokens import count_tokens
+from backend.models.tsxvalidator.cache import ValidationCache
+from backend.models.tsxvalidator.pool import ValidatorPool, ValidatorPoolSaturated
+from backend.models.tsxvalidator.static_checker import StaticChecker
+from backend.models.warmup import ResourceUnavailable, Warmup
+from backend.parsers.doc_bundles import CODER_QUERY, load_doc_bundles
+from backend.parsers.embedding_cache import CachedEmbeddings
+from backend.parsers.hybrid_search import HybridRetriever, LexicalIndex
+from backend.parsers.mmap_index import load_mmap_index
+from backend.parsers.prop_schema import PropSchemaIndex
+from backend.parsers.recursive import (
+    get_comps_descs, get_design_system_schema, ensure_components_data, ensure_faiss_index, faiss_index_version,
+    load_component_descriptions, format_component_descriptions, FAISS_DB_PATH, FAISS_MMAP_PATH, DOC_BUNDLES_PATH,
+    EMBEDDING_CACHE_DIR
+)
 
 load_dotenv()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-FAISS_DB_PATH = os.path.join(BASE_DIR, "../parsers", "data", "faiss_extended")
 openai_api_key = os.environ.get('OPENAI_API_KEY')
+llm = None
+embeddings = None
 try:
     if not openai_api_key:
         raise ValueError("OPENAI_API_KEY not found in environment variables")
     llm = ChatOpenAI(temperature=0.0, api_key=openai_api_key, model="gpt-4o-mini")
     embeddings = OpenAIEmbeddings(api_key=openai_api_key)
-    parse_recursivly_store_faiss()
+except Exception as e:
+    logging.error(f"{e}")
 
-    validator = TSXValidator()
-    db = FAISS.load_local(
-        FAISS_DB_PATH, embeddings, allow_dangerous_deserialization=True
+# Кэш ответов LLM: при temperature=0 одинаковый промпт даёт тот же ответ.
+# Цепочки узлов из LLM_CACHE_SKIP_NODES всегда идут к провайдеру. Зацикливание debug на закэшированном
+# неудачном фиксе предотвращают revise_code и compile_code, а не отключение кэша.
+llm_cache = None
+if llm is not None and os.environ.get("LLM_CACHE", "1") == "1":
+    if llm.temperature:
+        logging.warning(f"LLM cache disabled: temperature is {llm.temperature}, responses are not deterministic")
+    else:
+        llm_cache = LLMResponseCache(
+            os.environ.get("LLM_CACHE_PATH", os.path.join(BASE_DIR, "cache", "llm_responses.sqlite")),
+            max_size=int(os.environ.get("LLM_CACHE_SIZE", 2000))
+        )
+LLM_CACHE_SKIP_NODES = {n.strip() for n in os.environ.get("LLM_CACHE_SKIP_NODES", "").split(",") if n.strip()}
+_chain_llms = {}
+
+
+def chain_llm(chain_name: str, node: str, bypass: bool = False):
+    """
+    Модель для цепочки chain_name узла node — с кэшем ответов этой цепочки, если он включён для узла.
+    bypass=True — модель без кэша для одного вызова.
+    """
+    if llm_cache is None or bypass or node in LLM_CACHE_SKIP_NODES:
+        return llm
+    if chain_name not in _chain_llms:
+        _chain_llms[chain_name] = llm.model_copy(update={"cache": llm_cache.for_chain(chain_name)})
+    return _chain_llms[chain_name]
+
+
+memory = BoundedMemorySaver(
+    max_checkpoints=int(os.environ.get("CHECKPOINTS_PER_SESSION", 20)),
+    max_threads=int(os.environ.get("MAX_SESSIONS", 1000)),
+    thread_ttl=float(os.environ.get("SESSION_TTL", 3600))
+)
+result_cache = None
+if embeddings is not None and os.environ.get("RESULT_CACHE", "1") == "1":
+    result_cache = SemanticResultCache(
+        embeddings,
+        return_threshold=float(os.environ.get("RESULT_CACHE_THRESHOLD", 0.97)),
+        seed_threshold=float(os.environ.get("RESULT_CACHE_SEED_THRESHOLD", 0.9)),
+        max_size=int(os.environ.get("RESULT_CACHE_SIZE", 256)),
+        persist_path=os.environ.get("RESULT_CACHE_PATH")
     )
+retrieval_cache = RetrievalCache(
+    max_size=int(os.environ.get("RETRIEVAL_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("RETRIEVAL_CACHE_TTL", 3600)),
+    persist_path=os.environ.get("RETRIEVAL_CACHE_PATH")
+)
+
+# Заполняются при прогреве (см. warmup ниже)
+db = def_ret = dbg_ret = None
+validator_pool = validator_fingerprint = validation_cache = None
+ds_schema = prop_index = error_docs_resolver = static_checker = None
+components_descs = None
+doc_bundles = {}
+component_shortlist = None
+
+# Бюджеты токенов документации в промптах CODER, CODER_ITER и DEBUGGER
+coder_context = ContextPacker("coder", int(os.environ.get("CODER_CONTEXT_TOKENS", 6000)))
+coder_iter_context = ContextPacker("coder_iter", int(os.environ.get("CODER_ITER_CONTEXT_TOKENS", 6000)))
+debugger_context = ContextPacker("debugger", int(os.environ.get("DEBUGGER_CONTEXT_TOKENS", 3000)))
+
+
+def _load_components():
+    ensure_components_data()
+
+
+def _load_index():
+    global db, def_ret, dbg_ret
+    if embeddings is None:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    ensure_faiss_index()
+    if os.environ.get("FAISS_INDEX_FORMAT", "mmap") == "mmap":
+        db = load_mmap_index(FAISS_MMAP_PATH, embeddings)
+    else:
+        db = FAISS.load_local(
+            FAISS_DB_PATH, embeddings, allow_dangerous_deserialization=True
+        )
     def_ret = db.as_retriever(
         search_type="mmr",
         search_kwargs={
@@ -46,12 +143,76 @@ try:
             'k': 1
         }
     )
+    if os.environ.get("HYBRID_RETRIEVAL", "1") == "1":
+        # Точные имена компонентов и объявлений ищутся по BM25 без эмбеддинга запроса, остальное — слиянием с FAISS
+        lexical = LexicalIndex.from_vectorstore(db)
+        def_ret = HybridRetriever(vector_retriever=def_ret, lexical=lexical, k=6)
+        dbg_ret = HybridRetriever(vector_retriever=dbg_ret, lexical=lexical, k=1)
+    # Результаты, найденные по прежнему индексу или другим ретривером, больше не отдаются
+    retrieval_cache.invalidate(
+        f"{faiss_index_version()} hybrid={os.environ.get('HYBRID_RETRIEVAL', '1')}"
+    )
+    if result_cache is not None:
+        result_cache.invalidate(faiss_index_version())
 
-    memory = MemorySaver()
+
+def _load_schema():
+    global ds_schema, prop_index, error_docs_resolver, static_checker
+    ds_schema = get_design_system_schema()
+    prop_index = PropSchemaIndex(ds_schema)
+    error_docs_resolver = ErrorDocsResolver(prop_index)
+    if os.environ.get("TSX_STATIC_CHECK", "1") == "1":
+        static_checker = StaticChecker(ds_schema)
+
+
+def _load_validator():
+    global validator_pool, validator_fingerprint, validation_cache
+    validator_pool = ValidatorPool(
+        size=int(os.environ.get("VALIDATOR_POOL_SIZE", os.cpu_count() or 1)),
+        max_queue=int(os.environ.get("VALIDATOR_QUEUE_SIZE", 16)),
+        timeout=float(os.environ.get("VALIDATOR_TIMEOUT", 60))
+    )
+    validator_fingerprint = validator_pool.environment_fingerprint()
+    validation_cache = ValidationCache(
+        max_size=int(os.environ.get("VALIDATION_CACHE_SIZE", 512)),
+        persist_path=os.environ.get("VALIDATION_CACHE_PATH")
+    )
+
+
+def _load_bundles():
+    global doc_bundles
+    if os.environ.get("DOC_BUNDLES", "1") == "1":
+        doc_bundles = load_doc_bundles(DOC_BUNDLES_PATH)
+
+
+def _load_descriptions():
+    global components_descs
     components_descs = get_comps_descs()
-    docs_cache = {}
-except Exception as e:
-    logging.error(f"{e}")
+
+
+def _load_shortlist():
+    global component_shortlist
+    if embeddings is None:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    component_shortlist = ComponentShortlist(
+        load_component_descriptions(), CachedEmbeddings(embeddings, EMBEDDING_CACHE_DIR)
+    )
+
+
+warmup_timeout = os.environ.get("WARMUP_TIMEOUT")
+warmup = Warmup(timeout=float(warmup_timeout) if warmup_timeout else None)
+warmup.register("components", _load_components)
+warmup.register("index", _load_index, requires=["components"])
+warmup.register("schema", _load_schema, requires=["components"])
+warmup.register("descriptions", _load_descriptions, requires=["components"])
+warmup.register("bundles", _load_bundles, requires=["components"], optional=True)
+warmup.register("shortlist", _load_shortlist, requires=["components"], optional=True)
+warmup.register("validator", _load_validator)
+
+
+def start_warmup():
+    """Запускает фоновую загрузку ресурсов; вызывается при старте сервера."""
+    warmup.start()
 
 
 class Component(BaseModel):
@@ -85,34 +246,69 @@ class InterfaceGeneratingState(BaseModel):
         default=None,
         description="Список компонентов которые требуют модификации в имеющейся реализации"
     )
+    debug_attempts: list[str] = Field(
+        default_factory=list,
+        description="Отпечатки пар (код, ошибки), уже отправленных в debug за текущий запуск"
+    )
+
+
+async def funnel_components(query: str, code: str | None = None) -> str:
+    """
+    Описания компонентов для FUNNEL / FUNNEL_ITER: при FUNNEL_SHORTLIST > 0 — только ближайшие к запросу
+    по эмбеддингам (плюс названные в запросе и уже импортированные в коде), иначе полный список.
+    """
+    top_n = int(os.environ.get("FUNNEL_SHORTLIST", 20))
+    if not top_n:
+        return components_descs
+    started = time.perf_counter()
+    try:
+        await warmup.await_ready("shortlist")
+        titles = await component_shortlist.ashortlist(query, top_n, always=imported_components(code))
+    except Exception as e:
+        logging.warning(f"Component shortlist unavailable, sending all descriptions: {e}")
+        return components_descs
+    shortlisted = format_component_descriptions(component_shortlist.describe(titles))
+    # Полный список для сравнения — в том же формате, что и шорт-лист, чтобы разница токенов не включала формат
+    full = format_component_descriptions(component_shortlist.descriptions)
+    logging.info(
+        f"FUNNEL components: {len(component_shortlist.titles)} -> {len(titles)}, "
+        f"tokens {count_tokens(full)} -> {count_tokens(shortlisted)}, "
+        f"shortlist {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    return shortlisted
 
 
 async def funnel(state: InterfaceGeneratingState):
     if llm is None:
         state.errors = "LLM not initialized properly"
         return state
+    await warmup.await_ready("descriptions")
     if state.new_query:
-        iter_funnel_chain = FUNNEL_ITER | llm | PydanticOutputParser(pydantic_object=FunnelIterOutput)
-        res = iter_funnel_chain.invoke(
+        iter_funnel_chain = FUNNEL_ITER | chain_llm("funnel_iter", "funnel") | PydanticOutputParser(pydantic_object=FunnelIterOutput)
+        started = time.perf_counter()
+        res = await iter_funnel_chain.ainvoke(
             input={
                 "previous_query": state.query,
                 "new_query": state.new_query,
                 "existing_code": state.code,
-                "components": components_descs
+                "components": await funnel_components(f"{state.query}\n{state.new_query}", state.code)
             }
         )
+        logging.info(f"FUNNEL_ITER took {time.perf_counter() - started:.2f}s")
 
         print(f"\n\nITER_FUNNEL out: {res}")
         state.instructions = res.instructions
         state.components_to_modify = res.components_to_modify
     else:
-        funnel_chain = FUNNEL | llm | PydanticOutputParser(pydantic_object=FunnelOutput)
-        res = funnel_chain.invoke(
+        funnel_chain = FUNNEL | chain_llm("funnel", "funnel") | PydanticOutputParser(pydantic_object=FunnelOutput)
+        started = time.perf_counter()
+        res = await funnel_chain.ainvoke(
             input={
                 "query": state.query,
-                "components": components_descs
+                "components": await funnel_components(state.query)
             }
         )
+        logging.info(f"FUNNEL took {time.perf_counter() - started:.2f}s")
 
         print(f"\n\nNeeded comps {res}")
         state.components = res
@@ -120,15 +316,24 @@ async def funnel(state: InterfaceGeneratingState):
     return state
 
 
-async def search_docs(queries: list[str], is_dbg: bool = False):
+def context_stats() -> dict:
+    return {packer.name: packer.stats() for packer in (coder_context, coder_iter_context, debugger_context)}
+
+
+async def search_docs(queries: list[str], is_dbg: bool = False) -> list[list]:
+    """Найденные документы по каждому запросу, в порядке запросов."""
+    await warmup.await_ready("index")
     retriever = def_ret
+    namespace = "def"
     if is_dbg:
         retriever = dbg_ret
+        namespace = "dbg"
     qrs = []
-    docs = []
+    found = {}
     for q in queries:
-        if q in docs_cache:
-            docs.append(docs_cache[q])
+        cached = retrieval_cache.get(namespace, q)
+        if cached is not None:
+            found[q] = cached
         else:
             qrs.append(q)
     if qrs:
@@ -136,10 +341,25 @@ async def search_docs(queries: list[str], is_dbg: bool = False):
         results = await asyncio.gather(*tasks)
 
         for i, result in enumerate(results):
-            docs += result
-            docs_cache[qrs[i]] = result
+            found[qrs[i]] = result
+            retrieval_cache.put(namespace, qrs[i], result)
+    print(f"Retrieval cache: {retrieval_cache.stats()}")
+
+    return [found[q] for q in queries]
 
-    return docs
+
+async def component_docs(titles: list[str]) -> list[list]:
+    """Документация компонентов для CODER: готовые пакеты по названию, поиск по индексу — только для незнакомых."""
+    try:
+        await warmup.await_ready("bundles")
+    except ResourceUnavailable as e:
+        logging.warning(f"Doc bundles unavailable, searching the index: {e}")
+    unknown = [title for title in titles if not doc_bundles.get(title)]
+    searched = {}
+    if unknown:
+        print(f"No doc bundles for {unknown}, searching the index")
+        searched = dict(zip(unknown, await search_docs([CODER_QUERY.format(title) for title in unknown])))
+    return [doc_bundles.get(title) or searched[title] for title in titles]
 
 
 async def write_code(state: InterfaceGeneratingState):
@@ -150,7 +370,7 @@ async def write_code(state: InterfaceGeneratingState):
                 "code_sample": lambda x: x["code_sample"]
             }
             | CODER
-            | llm
+            | chain_llm("coder", "coder")
             | StrOutputParser()
     )
     interface_coder_iter_chain = (
@@ -162,28 +382,26 @@ async def write_code(state: InterfaceGeneratingState):
                 "existing_code": lambda x: x["existing_code"]
             }
             | CODER_ITER
-            | llm
+            | chain_llm("coder_iter", "coder")
             | StrOutputParser()
     )
 
     if state.new_query:
-        interface_code = interface_coder_iter_chain.invoke({
+        interface_code = await interface_coder_iter_chain.ainvoke({
             "query": state.query,
             "new_query": state.new_query,
             "existing_code": state.code,
             "instructions": state.instructions,
-            "interface_components": await search_docs(
-                [f"Detailed ARG TYPES of props a component {x.title} can have and CODE examples of using {x.title}"
-                 for x in state.components_to_modify]
+            "interface_components": coder_iter_context.pack(
+                interleave(await component_docs([x.title for x in state.components_to_modify]))
             )
         })
     else:
-        interface_code = interface_coder_chain.invoke({
+        interface_code = await interface_coder_chain.ainvoke({
             "query": state.query,
             "code_sample": state.code,
-            "interface_components": await search_docs(
-                [f"Detailed ARG TYPES of props a component {x.title} can have and CODE examples of using {x.title}"
-                 for x in state.components.needed_components]
+            "interface_components": coder_context.pack(
+                interleave(await component_docs([x.title for x in state.components.needed_components]))
             )
         })
 
@@ -193,31 +411,49 @@ async def write_code(state: InterfaceGeneratingState):
     return state
 
 
-async def debug_docs_v2(code: str, errors_list: list[Dict[str, Any]]) -> list[str]:
+async def debug_docs_v2(code: str, errors_list: list[Dict[str, Any]]) -> list:
+    # Сначала правила по кодам ошибок и схеме пропсов; LLM-генератор запросов — только для оставшихся ошибок
+    await warmup.await_ready("schema")
+    prop_docs, unresolved = error_docs_resolver.resolve(code, errors_list)
+    print(f"RESOLVED DOCS: {len(prop_docs)}, ERRORS LEFT FOR SEARCH: {len(unresolved)}, "
+          f"resolver: {error_docs_resolver.stats()}")
+    if not unresolved:
+        return prop_docs
+
     query_prompt = (
             {
                 "code": lambda x: x["code"],
                 "errors_list": lambda x: x["errors_list"]
             }
             | QUERY_GENERATOR
-            | llm
+            | chain_llm("query_generator", "debug")
             | CommaSeparatedListOutputParser()
     )
 
-    queries = query_prompt.invoke({
+    queries = await query_prompt.ainvoke({
         "code": code,
-        "errors_list": errors_list
+        "errors_list": unresolved
     })
 
     print(f"QUERIES TO FIX BUGS: {queries}")
-    res = "No special information needed to fix these errors"
+    res = prop_docs
     if queries:
-        res = await search_docs(queries, True)
+        res = prop_docs + interleave(await search_docs(queries, True))
 
     return res
 
 
+def debug_attempt(code: str | None, errors: Any) -> str:
+    return hashlib.sha256(f"{code}\0{errors}".encode("utf-8")).hexdigest()
+
+
 async def revise_code(state: InterfaceGeneratingState):
+    # Те же код и ошибки второй раз за запуск: закэшированный ответ уже не помог, фикс запрашивается у модели
+    attempt = debug_attempt(state.code, state.errors)
+    repeated = attempt in state.debug_attempts
+    if repeated:
+        logging.info("Same code and errors came back to debug, calling the debugger without cache")
+    state.debug_attempts.append(attempt)
     interface_debugger_chain = (
             {
                 "useful_info": lambda x: x["useful_info"],  # Передаём найденные доки по ошибкам
@@ -225,16 +461,17 @@ async def revise_code(state: InterfaceGeneratingState):
                 "errors_list": lambda x: x["errors_list"]
             }
             | DEBUGGER
-            | llm
+            | chain_llm("debugger", "debug", bypass=repeated)
             | StrOutputParser()
     )
     docs = await debug_docs_v2(state.code, state.errors)
+    useful_info = debugger_context.pack(docs) if docs else "No special information needed to fix these errors"
 
-    fixed_code = interface_debugger_chain.invoke(
+    fixed_code = await interface_debugger_chain.ainvoke(
         {
             "interface_code": state.code,
             "errors_list": state.errors,
-            "useful_info": docs
+            "useful_info": useful_info
         }
     )
 
@@ -245,13 +482,52 @@ async def revise_code(state: InterfaceGeneratingState):
     return state
 
 
+class ValidationUnavailable(RuntimeError):
+    """Пул валидаторов перегружен (очередь полна или проверка не дождалась воркера) — запрос стоит повторить позже."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+VALIDATOR_RETRY_AFTER = int(os.environ.get("VALIDATOR_RETRY_AFTER", 5))
+
+
+def forget_failed_fix(state: InterfaceGeneratingState, fixed_code: str):
+    """Фикс debug, который не скомпилировался, удаляется из кэша LLM, чтобы его не выдали снова."""
+    if state.errors and state.debug_attempts and llm_cache is not None:
+        llm_cache.for_chain("debugger").forget(fixed_code)
+
+
 async def compile_code(state: InterfaceGeneratingState):
     tsx_code = state.code
     clean_code = re.sub(r"```(jsx|tsx)\s*|\s*```", "", tsx_code)
     state.code = clean_code
-    validation_result = validator.validate_tsx(clean_code.strip())
+    await warmup.await_ready("schema", "validator")
+
+    # Очевидно сломанный код (обрыв, несуществующие импорты и пропсы) сразу уходит в debug без tsc
+    static_errors = static_checker.check(clean_code.strip()) if static_checker else []
+    if static_errors:
+        print(f"Static check errors: {static_errors}")
+        state.errors = static_errors
+        forget_failed_fix(state, tsx_code)
+        return state
+
+    cache_key = validation_cache.key(clean_code.strip(), validator_fingerprint)
+    validation_result = validation_cache.get(cache_key)
+    if validation_result is None:
+        try:
+            validation_result = await validator_pool.avalidate(clean_code.strip())
+        except ValidatorPoolSaturated as e:
+            raise ValidationUnavailable(str(e), VALIDATOR_RETRY_AFTER)
+        except asyncio.TimeoutError:
+            raise ValidationUnavailable(f"TSX validation timed out after {validator_pool.timeout}s",
+                                        VALIDATOR_RETRY_AFTER)
+        validation_cache.put(cache_key, validation_result)
 
     print(f"Validation res: {validation_result}")
+    print(f"Validation cache: {validation_cache.stats()}")
+    print(f"Validator pool: {validator_pool.stats()}")
 
     if validation_result["valid"]:
         state.errors = ""
@@ -259,6 +535,7 @@ async def compile_code(state: InterfaceGeneratingState):
             state.query = state.query + state.new_query
     else:
         state.errors = validation_result["errors"]
+        forget_failed_fix(state, tsx_code)
 
     return state
 
@@ -271,46 +548,138 @@ async def compile_interface(state: InterfaceGeneratingState):
         return "debug"
 
 
-async def generate(query: str) -> str:
-    logging.info(f"Starting generation for query: {query}")
+# Узлы графа, о начале и завершении которых сообщает stream_generate
+STREAMED_NODES = ("funnel", "coder", "compiler", "debug")
+# Узлы, токены LLM которых передаются клиенту по мере генерации
+TOKEN_NODES = ("coder", "debug")
+
 
+def _build_graph():
+    builder = StateGraph(InterfaceGeneratingState)
+    builder.add_node("funnel", funnel)
+    builder.add_node("coder", write_code)
+    builder.add_node("compiler", compile_code)
+    builder.add_node("debug", revise_code)
+
+    builder.set_entry_point("funnel")
+    builder.add_edge("funnel", "coder")
+    builder.add_edge("coder", "compiler")
+    builder.add_conditional_edges(
+        'compiler',
+        compile_interface
+    )
+    builder.add_edge("debug", "compiler")
+    return builder.compile(checkpointer=memory)
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_graph():
+    """
+    Скомпилированный граф, общий для всех запросов. Он не хранит состояние запроса:
+    сессия и лимиты передаются через config, состояние — через checkpointer.
+    """
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = _build_graph()
+    return _graph
+
+
+# Клиенты без session_id (как было до сессий) продолжают одну общую историю
+DEFAULT_SESSION_ID = os.environ.get("DEFAULT_SESSION_ID", "default")
+
+
+def _prepare_run(query: str, session_id: str) -> tuple[InterfaceGeneratingState, dict, bool]:
+    """Состояние для запуска графа, config и признак новой сессии (без истории в чекпойнтах)."""
+    # Set up configuration with retry mechanism
+    config = {
+        "configurable": {"thread_id": session_id},
+        "recursion_limit": 50,  # Increase the number of retries further
+    }
+    cur_state = None
+    if memory.get_tuple(config):
+        cur_dict: dict = memory.get_tuple(config)[1]["channel_values"]
+        cur_state = InterfaceGeneratingState(**cur_dict)
+
+        # add new button for iterative process
+        # cur_state.new_query = query
+        cur_state.query = query
+        cur_state.debug_attempts = []
+    fresh = cur_state is None
+    if not cur_state:
+        cur_state = InterfaceGeneratingState(query=query)
+    return cur_state, config, fresh
+
+
+async def _lookup_result(query: str, fresh: bool) -> tuple[Any, dict | None]:
+    """
+    Эмбеддинг запроса и ближайший результат из result_cache. Кэш используется только для новых сессий:
+    продолжение истории зависит от её кода, а не только от текста запроса.
+    """
+    if result_cache is None or not fresh:
+        return None, None
     try:
-        # Set up configuration with retry mechanism
-        config = {
-            "configurable": {"thread_id": "42"},
-            "recursion_limit": 50,  # Increase the number of retries further
-        }
-        cur_state = None
-        if memory.get_tuple(config):
-            cur_dict: dict = memory.get_tuple(config)[1]["channel_values"]
-            cur_state = InterfaceGeneratingState(**cur_dict)
-
-            # add new button for iterative process
-            # cur_state.new_query = query
-            cur_state.query = query
-        if not cur_state:
-            cur_state = InterfaceGeneratingState(query=query)
-
-        builder = StateGraph(InterfaceGeneratingState)
-        builder.add_node("funnel", funnel)
-        builder.add_node("coder", write_code)
-        builder.add_node("compiler", compile_code)
-        builder.add_node("debug", revise_code)
-
-        builder.set_entry_point("funnel")
-        builder.add_edge("funnel", "coder")
-        builder.add_edge("coder", "compiler")
-        builder.add_conditional_edges(
-            'compiler',
-            compile_interface
-        )
-        builder.add_edge("debug", "compiler")
-        graph = builder.compile(checkpointer=memory)
+        await warmup.await_ready("index")
+        vector = await result_cache.embed(query)
+    except Exception as e:
+        logging.warning(f"Result cache lookup skipped: {e}")
+        return None, None
+    hit = result_cache.lookup(vector)
+    if hit:
+        logging.info(f"Result cache {hit['mode']} hit, similarity {hit['similarity']:.3f} to: {hit['query']}")
+    logging.info(f"Result cache: {result_cache.stats()}")
+    return vector, hit
+
+
+async def _apply_cached_result(graph, config: dict, cur_state: InterfaceGeneratingState, hit: dict | None) -> bool:
+    """True, если код из кэша возвращается как есть; при затравке код кладётся в состояние вместо шаблона CODER."""
+    if hit is None:
+        return False
+    if hit["mode"] == RESULT_RETURN:
+        # Сессия продолжается с этого кода, как если бы граф его сгенерировал
+        await graph.aupdate_state(config, {"query": cur_state.query, "code": hit["code"], "errors": ""},
+                                  as_node="compiler")
+        return True
+    cur_state.code = hit["code"]
+    return False
+
+
+def _state_value(state: Any, key: str) -> Any:
+    if isinstance(state, dict):
+        return state.get(key)
+    return getattr(state, key, None)
+
+
+async def generate(query: str, session_id: str | None = None) -> str:
+    """
+    Генерирует код по запросу; запросы с одним session_id продолжают одну историю в чекпойнтах,
+    запросы без него — общую историю DEFAULT_SESSION_ID. При перегрузке пула валидаторов
+    бросает ValidationUnavailable, чтобы сервер ответил 503 с Retry-After.
+    """
+    session_id = session_id or DEFAULT_SESSION_ID
+    logging.info(f"Starting generation for query: {query}, session: {session_id}")
+
+    try:
+        cur_state, config, fresh = _prepare_run(query, session_id)
+        graph = get_graph()
+        vector, hit = await _lookup_result(query, fresh)
+        if await _apply_cached_result(graph, config, cur_state, hit):
+            return hit["code"]
 
         try:
             logging.info(f"\n\nEXECUTING WITH STATE: {cur_state}")
             state = await graph.ainvoke(cur_state, config)
             logging.info("Generation process completed successfully.")
+            if vector is not None and isinstance(state, dict) and state.get("code"):
+                result_cache.put(query, vector, state["code"], state.get("errors"))
+            logging.info(f"Checkpoint memory: {memory.stats()}")
+            logging.info(f"Context packing: {context_stats()}")
+            if llm_cache is not None:
+                logging.info(f"LLM cache: {llm_cache.stats()}")
             if isinstance(state, dict):
                 logging.info(f"Final state errors: {state.get('errors', 'No errors')}")
                 logging.info(f"Final state code length: {len(state.get('code', ''))}")
@@ -318,17 +687,79 @@ async def generate(query: str) -> str:
             else:
                 logging.error(f"Unexpected state type: {type(state)}")
                 return "An error occurred: Unexpected state type"
+        except ValidationUnavailable:
+            raise
         except EnvironmentError as e:
             logging.error(f"Environment setup error: {str(e)}")
             return f"An error occurred during environment setup: {str(e)}"
         except Exception as e:
             logging.error(f"Error in generate function: {str(e)}")
             return f"An error occurred during generation: {str(e)}"
+    except ValidationUnavailable:
+        raise
     except Exception as e:
         logging.error(f"Error in generate function: {str(e)}")
         return f"An error occurred during generation: {str(e)}"
 
 
+async def stream_generate(query: str, session_id: str | None = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    То же, что generate, но отдаёт события по ходу выполнения графа:
+    session — id сессии для следующих запросов, cache — найден похожий запрос (return — дальше сразу result,
+    seed — его код стал затравкой для coder), node_start / node_end для каждого узла,
+    token — фрагменты кода от coder и debug, compile — промежуточный результат проверки,
+    result — итоговый код, error — сбой генерации (retryable и retry_after — при перегрузке пула валидаторов).
+    """
+    session_id = session_id or DEFAULT_SESSION_ID
+    logging.info(f"Starting streaming generation for query: {query}, session: {session_id}")
+    yield {"event": "session", "session_id": session_id}
+
+    try:
+        cur_state, config, fresh = _prepare_run(query, session_id)
+        graph = get_graph()
+        vector, hit = await _lookup_result(query, fresh)
+        if hit is not None:
+            yield {"event": "cache", "mode": hit["mode"], "similarity": hit["similarity"], "query": hit["query"]}
+        if await _apply_cached_result(graph, config, cur_state, hit):
+            yield {"event": "result", "result": hit["code"]}
+            return
+
+        async for event in graph.astream_events(cur_state, config, version="v2"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chat_model_stream" and node in TOKEN_NODES:
+                text = event["data"]["chunk"].content
+                if text:
+                    yield {"event": "token", "node": node, "text": text}
+            elif event["name"] in STREAMED_NODES and node == event["name"]:
+                if kind == "on_chain_start":
+                    yield {"event": "node_start", "node": node}
+                elif kind == "on_chain_end":
+                    output = event["data"].get("output")
+                    if node == "compiler" and output is not None:
+                        errors = _state_value(output, "errors")
+                        yield {
+                            "event": "compile",
+                            "valid": not errors,
+                            "errors": errors if isinstance(errors, list) else ([errors] if errors else []),
+                            "code": _state_value(output, "code"),
+                        }
+                    yield {"event": "node_end", "node": node}
+
+        snapshot = await graph.aget_state(config)
+        logging.info("Streaming generation completed successfully.")
+        if vector is not None and snapshot.values.get("code"):
+            result_cache.put(query, vector, snapshot.values["code"], snapshot.values.get("errors"))
+        yield {"event": "result", "result": str(snapshot.values.get("code", "No code generated"))}
+    except ValidationUnavailable as e:
+        logging.warning(f"Streaming generation rejected: {e}")
+        yield {"event": "error", "error": str(e), "retryable": True, "retry_after": e.retry_after}
+    except Exception as e:
+        logging.error(f"Error in stream_generate function: {str(e)}")
+        yield {"event": "error", "error": f"An error occurred during generation: {str(e)}"}
+
+
 def _add_error_handling(func):
     def wrapper(state: InterfaceGeneratingState):
         try:
@@ -0,0 +1,243 @@
+import csv
+import os
+import re
+from typing import Iterator, List, Tuple
+
+from langchain_core.documents import Document
+
+from backend.parsers.import_graph import SKIPPED
+
+INDEX_CHUNKING = os.environ.get("INDEX_CHUNKING", "1") == "1"
+CHUNK_MAX_CHARS = int(os.environ.get("CHUNK_MAX_CHARS", 1500))
+CHUNK_OVERLAP = int(os.environ.get("CHUNK_OVERLAP", 150))
+
+# Скобки и переводы строк вне строк и комментариев; /> — конец JSX-элемента
+STRUCTURE = re.compile(r"""[{}()\[\]\n]|/>|//|/\*|[`'"]""")
+DECLARATION = re.compile(
+    r"(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?"
+    r"(?P<keyword>import|interface|type|const\s+enum|enum|const|let|var|async\s+function|function|class|namespace)\b"
+    r"\s*(?P<name>[\w$]+)?"
+)
+EXPORT_LIST = re.compile(r"export\s*(?:\*|\{|default\b)")
+COMMENT_LINE = re.compile(r"/\*|//|@\w")
+STORY_EXAMPLE = re.compile(r"<Editor\b")
+
+
+def _scan(code: str, pos: int = 0) -> Iterator[Tuple[str, int, int]]:
+    """(токен, позиция, глубина скобок) для структурных токенов вне строк и комментариев."""
+    depth = 0
+    while True:
+        m = STRUCTURE.search(code, pos)
+        if m is None:
+            return
+        token = m.group()
+        if token in "{([":
+            depth += 1
+        elif token in "})]":
+            depth = max(0, depth - 1)
+        elif token not in ("\n", "/>"):
+            skipped = SKIPPED.match(code, m.start())
+            # Одиночная кавычка в тексте JSX или деление не открывают строку
+            pos = skipped.end() if skipped else m.start() + 1
+            continue
+        yield token, m.start(), depth
+        pos = m.end()
+
+
+def _top_level_lines(code: str) -> List[int]:
+    return [0] + [p + 1 for token, p, depth in _scan(code) if token == "\n" and depth == 0]
+
+
+def _classify(head: str, is_tsx: bool) -> Tuple[str, List[str]]:
+    if EXPORT_LIST.match(head) and not DECLARATION.match(head):
+        return "exports", []
+    m = DECLARATION.match(head)
+    if not m:
+        return "other", []
+    keyword, name = m["keyword"], m["name"]
+    names = [name] if name else []
+    if keyword == "import":
+        return "imports", []
+    if keyword in ("interface", "type"):
+        return keyword, names
+    if keyword.endswith("enum"):
+        return "enum", names
+    if is_tsx and name and name[0].isupper() and keyword in ("const", "function", "async function", "class"):
+        return "component", names
+    return "code", names
+
+
+def _declaration_segments(code: str, is_tsx: bool) -> List[Tuple[str, List[str], str]]:
+    """Файл .ts/.tsx, разрезанный по объявлениям верхнего уровня; комментарии над объявлением идут вместе с ним."""
+    lines = _top_level_lines(code)
+    bounds = []
+    pending_comment = None
+    for start in lines:
+        head = code[start:start + 200].lstrip(" \t")
+        if COMMENT_LINE.match(head):
+            if pending_comment is None:
+                pending_comment = start
+            continue
+        if DECLARATION.match(head) or EXPORT_LIST.match(head):
+            bounds.append(pending_comment if pending_comment is not None else start)
+        if head.strip():
+            pending_comment = None
+    if not bounds or bounds[0] != 0:
+        bounds.insert(0, 0)
+
+    segments = []
+    for start, end in zip(bounds, bounds[1:] + [len(code)]):
+        text = code[start:end]
+        if not text.strip():
+            continue
+        head = "\n".join(line.lstrip(" \t") for line in text.splitlines()
+                         if line.strip() and not COMMENT_LINE.match(line.lstrip()) and not line.lstrip().startswith("*"))
+        kind, names = _classify(head, is_tsx)
+        segments.append((kind, names, text))
+    return segments
+
+
+def _story_segments(code: str) -> List[Tuple[str, List[str], str]]:
+    """Stories.tsx: каждый пример <Editor description code /> — отдельная часть, остальная страница — story_page."""
+    segments = []
+    pos = 0
+    for m in STORY_EXAMPLE.finditer(code):
+        if m.start() < pos:
+            continue
+        end = len(code)
+        for token, p, depth in _scan(code, m.end()):
+            if token == "/>" and depth == 0:
+                end = p + 2
+                break
+        if code[pos:m.start()].strip():
+            segments.append(("story_page", [], code[pos:m.start()]))
+        segments.append(("story", [], code[m.start():end]))
+        pos = end
+    if code[pos:].strip():
+        segments.append(("story_page", [], code[pos:]))
+    return segments
+
+
+def _style_segments(code: str) -> List[Tuple[str, List[str], str]]:
+    """SCSS: по правилам и миксинам верхнего уровня."""
+    bounds = [0]
+    pending_comment = None
+    for start in _top_level_lines(code)[1:]:
+        head = code[start:start + 200].lstrip(" \t")
+        if not head.strip() or head.startswith("}") or head.startswith("\n"):
+            continue
+        if COMMENT_LINE.match(head) and not head.startswith("@"):
+            if pending_comment is None:
+                pending_comment = start
+            continue
+        bounds.append(pending_comment if pending_comment is not None else start)
+        pending_comment = None
+    return [("styles", [], code[s:e]) for s, e in zip(bounds, bounds[1:] + [len(code)]) if code[s:e].strip()]
+
+
+def _split_oversized(text: str, max_chars: int, overlap: int) -> List[str]:
+    """Окна по строкам не длиннее max_chars; следующее окно повторяет последние строки предыдущего (до overlap символов)."""
+    if len(text) <= max_chars:
+        return [text]
+    lines = []
+    for line in text.splitlines(keepends=True):
+        # Строка длиннее окна режется по символам
+        lines += [line[i:i + max_chars] for i in range(0, len(line), max_chars)] or [line]
+    windows = []
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        if current and size + len(line) > max_chars:
+            windows.append("".join(current))
+            carried = []
+            carried_size = 0
+            for previous in reversed(current):
+                if carried_size + len(previous) > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_size += len(previous)
+            current, size = carried, carried_size
+        current.append(line)
+        size += len(line)
+    if "".join(current).strip():
+        windows.append("".join(current))
+    return windows
+
+
+def chunk_file(filename: str, code: str, max_chars: int = CHUNK_MAX_CHARS,
+               overlap: int = CHUNK_OVERLAP) -> List[Tuple[str, List[str], str, str]]:
+    """
+    [(kind, имена объявлений, текст, "часть/частей" или "")] для одного файла. Соседние объявления одного вида склеиваются,
+    пока помещаются в max_chars; импорты и экспорты приклеиваются к соседнему объявлению,
+    объявление длиннее max_chars режется на части с перекрытием overlap.
+    kind: imports, exports, interface, type, enum, component, code, story, story_page, styles, other.
+    """
+    if filename.endswith(".scss"):
+        segments = _style_segments(code)
+    elif filename.endswith("Stories.tsx") and STORY_EXAMPLE.search(code):
+        segments = _story_segments(code)
+    else:
+        segments = _declaration_segments(code, filename.endswith(".tsx"))
+
+    merged: List[Tuple[str, List[str], str]] = []
+    for kind, names, text in segments:
+        if merged:
+            prev_kind, prev_names, prev_text = merged[-1]
+            glue = (kind == prev_kind and kind != "story") or prev_kind in ("imports", "other") or kind == "exports"
+            # Короткий хвост вроде export default X; остаётся с объявлением, даже если окно уже заполнено
+            fits = len(prev_text) + len(text) <= max_chars or (kind == "exports" and len(text) <= overlap)
+            if glue and fits:
+                merged_kind = prev_kind if kind == "exports" else kind
+                merged[-1] = (merged_kind, prev_names + names, prev_text + text)
+                continue
+        merged.append((kind, names, text))
+
+    chunks = []
+    for kind, names, text in merged:
+        parts = _split_oversized(text, max_chars, overlap)
+        for i, part in enumerate(parts):
+            chunks.append((kind, names, part.strip("\n"), f"{i + 1}/{len(parts)}" if len(parts) > 1 else ""))
+    return chunks
+
+
+def component_of(purpose: str) -> str:
+    """"Codes for component Button _stories Stories.tsx" -> "Button"; файлы в корне components — ""."""
+    parts = purpose.split("component ", 1)[-1].split(" ")
+    return parts[0] if len(parts) > 1 else ""
+
+
+def _filename_of(purpose: str) -> str:
+    return purpose.rsplit(" ", 1)[-1]
+
+
+def chunking_signature() -> str:
+    """Параметры разбиения — входят в отметку индекса, чтобы смена настроек перестраивала его."""
+    return f"chunks:{CHUNK_MAX_CHARS}:{CHUNK_OVERLAP}" if INDEX_CHUNKING else "files"
+
+
+def load_index_documents(csv_path: str, chunking: bool | None = None) -> List[Document]:
+    """
+    Документы для FAISS из RAW_COMPONENTS_.csv. Без разбиения — по документу на файл в формате CSVLoader,
+    с разбиением — по документу на объявление (или склейку мелких объявлений) с метаданными
+    component, kind, names, chunk.
+    """
+    chunking = INDEX_CHUNKING if chunking is None else chunking
+    documents = []
+    with open(csv_path, "r", newline="", encoding="utf-8") as csvfile:
+        for row_number, row in enumerate(csv.DictReader(csvfile)):
+            purpose, content = row["Document Purpose"].strip(), row["Content"].strip()
+            metadata = {"source": csv_path, "row": row_number}
+            if not chunking:
+                documents.append(Document(page_content=f"Document Purpose: {purpose}\nContent: {content}",
+                                          metadata=metadata))
+                continue
+            for index, (kind, names, text, part) in enumerate(chunk_file(_filename_of(purpose), content)):
+                label = kind if not names else f"{kind} {', '.join(names[:8])}"
+                if part:
+                    label += f", part {part}"
+                documents.append(Document(
+                    page_content=f"Document Purpose: {purpose} ({label})\nContent: {text}",
+                    metadata={**metadata, "component": component_of(purpose), "kind": kind,
+                              "names": names, "chunk": index}
+                ))
+    return documents
@@ -0,0 +1,335 @@
+import csv
+import os
+import re
+
+# Базовые типы React, которые добавляют к пропсам только children
+CHILDREN_WRAPPERS = {"PropsWithChildren"}
+
+DS_PACKAGE = "@nlmk/ds-2.0"
+# components/index.ts дизайн-системы реэкспортирует иконки и хуки через `export *`,
+# поэтому их имена проверяются по шаблону, а не по списку
+DS_EXPORT_PATTERNS = [r"^Icon[A-Z]\w*$", r"^use[A-Z]\w*$"]
+
+MEMBER_START = re.compile(r"^\s*(?:readonly\s+)?(?:['\"][\w-]+['\"]|[A-Za-z_$][\w$]*)\??\s*[:(<]")
+MEMBER = re.compile(r"^(?:readonly\s+)?(?P<name>['\"][\w-]+['\"]|[A-Za-z_$][\w$]*)(?P<optional>\?)?\s*(?P<rest>[:(<].*)$", re.S)
+INTERFACE = re.compile(r"\binterface\s+(?P<name>[A-Za-z_$][\w$]*)")
+ENUM = re.compile(r"\benum\s+(?P<name>[A-Za-z_$][\w$]*)\s*\{(?P<body>[^}]*)\}")
+EXTENDS = re.compile(r"^\s*(?:<.*?>)?\s*extends\s+(?P<extends>.+)$", re.S)
+EXPORT_DECL = re.compile(r"export\s+(?:declare\s+)?(?:const|let|function|class|enum|interface|type|abstract\s+class)\s+([A-Za-z_$][\w$]*)")
+EXPORT_LIST = re.compile(r"export\s*(?:type\s*)?\{([^}]*)\}")
+DS_IMPORT = re.compile(r"import\s*(?:type\s*)?\{([^}]*)\}\s*from\s*['\"]" + re.escape(DS_PACKAGE) + r"['\"]")
+PROPS_PATTERNS = [
+    re.compile(r"\b(?:React\.)?(?:FC|FunctionComponent)\s*<\s*(?:PropsWithChildren\s*<\s*)?([A-Za-z_$][\w$]*)"),
+    re.compile(r"\bforwardRef\s*<[^,>]+,\s*([A-Za-z_$][\w$]*)"),
+    re.compile(r"\}\s*:\s*([A-Za-z_$][\w$]*)\s*\)\s*(?::\s*[^=]+)?=>"),
+    re.compile(r"\(\s*props\s*:\s*([A-Za-z_$][\w$]*)\s*\)"),
+]
+
+
+def strip_comments(text: str) -> str:
+    """Удаляет // и /* */ комментарии, не трогая строки."""
+    out = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch in "'\"`":
+            j = i + 1
+            while j < n and text[j] != ch:
+                j += 2 if text[j] == "\\" else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+        elif text.startswith("//", i):
+            j = text.find("\n", i)
+            i = n if j == -1 else j
+        elif text.startswith("/*", i):
+            j = text.find("*/", i + 2)
+            i = n if j == -1 else j + 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _matching_brace(text: str, start: int) -> int:
+    """Индекс закрывающей скобки для text[start] == '{' или -1."""
+    depth = 0
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if ch in "'\"`":
+            j = i + 1
+            while j < n and text[j] != ch:
+                j += 2 if text[j] == "\\" else 1
+            i = j
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+
+def _interface_body_start(text: str, pos: int) -> int:
+    """Позиция '{' тела interface: первая фигурная скобка вне generic-параметров (`extends A<{ x: T }>`)."""
+    depth = 0
+    i = pos
+    while i < len(text):
+        ch = text[i]
+        if ch == "<":
+            depth += 1
+        elif ch == ">" and text[i - 1] != "=":
+            depth -= 1
+        elif ch == "{":
+            if depth == 0:
+                return i
+            # Объектный тип внутри generic пропускаем целиком
+            i = _matching_brace(text, i)
+            if i == -1:
+                return -1
+        elif ch == ";" and depth == 0:
+            return -1
+        i += 1
+    return -1
+
+
+def _split_top_level(text: str, separators: str) -> list[str]:
+    parts, buf = [], []
+    depth = 0
+    for ch in text:
+        if ch in "({[<":
+            depth += 1
+        elif ch in ")}]>" and depth > 0:
+            depth -= 1
+        if ch in separators and depth == 0:
+            parts.append("".join(buf))
+            buf = []
+        else:
+            buf.append(ch)
+    parts.append("".join(buf))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _split_members(body: str) -> list[str]:
+    """Делит тело interface на члены: по ; и , верхнего уровня и по переносу строки перед новым членом."""
+    members, buf = [], []
+    depth = 0
+    lines = body.split("\n")
+    for line_no, line in enumerate(lines):
+        for i, ch in enumerate(line):
+            if ch in "({[<":
+                depth += 1
+            elif ch in ")}]>" and depth > 0 and not (ch == ">" and i > 0 and line[i - 1] == "="):
+                depth -= 1
+            if ch in ";," and depth == 0:
+                members.append("".join(buf))
+                buf = []
+            else:
+                buf.append(ch)
+        next_line = lines[line_no + 1] if line_no + 1 < len(lines) else ""
+        if depth == 0 and MEMBER_START.match(next_line):
+            members.append("".join(buf))
+            buf = []
+        else:
+            buf.append("\n")
+    members.append("".join(buf))
+    return [" ".join(m.split()) for m in members if m.strip()]
+
+
+def parse_interfaces(text: str) -> dict:
+    """
+    Возвращает {имя interface: {"extends": [...], "props": {prop: {"type", "required"}}, "index_signature": bool}}.
+    """
+    text = strip_comments(text)
+    interfaces = {}
+    for match in INTERFACE.finditer(text):
+        body_start = _interface_body_start(text, match.end())
+        if body_start == -1:
+            continue
+        body_end = _matching_brace(text, body_start)
+        if body_end == -1:
+            continue
+        header = EXTENDS.match(text[match.end():body_start])
+        props = {}
+        index_signature = False
+        for member in _split_members(text[body_start + 1:body_end]):
+            if member.startswith("["):
+                index_signature = True
+                continue
+            m = MEMBER.match(member)
+            if not m:
+                continue
+            rest = m["rest"]
+            # Метод: onClick?(e: Event): void
+            type_text = rest[1:].strip() if rest.startswith(":") else f"{rest}".strip()
+            props[m["name"].strip("'\"")] = {
+                "type": type_text,
+                "required": not m["optional"],
+            }
+        interfaces[match["name"]] = {
+            "extends": _split_top_level(header["extends"], ",") if header else [],
+            "props": props,
+            "index_signature": index_signature,
+        }
+    return interfaces
+
+
+def parse_enums(text: str) -> dict[str, list[str]]:
+    """{имя enum: список значений}; для строковых enum берутся сами строки."""
+    enums = {}
+    for match in ENUM.finditer(strip_comments(text)):
+        values = []
+        for member in _split_top_level(match["body"], ","):
+            key, _, value = member.partition("=")
+            values.append((value or key).strip().strip("'\""))
+        enums[match["name"]] = values
+    return enums
+
+
+def parse_exports(text: str) -> set[str]:
+    text = strip_comments(text)
+    exports = set(EXPORT_DECL.findall(text))
+    for names in EXPORT_LIST.findall(text):
+        for name in _split_top_level(names, ","):
+            exports.add(name.split(" as ")[-1].strip())
+    return exports
+
+
+def parse_ds_imports(text: str) -> dict[str, str]:
+    """Импорты из @nlmk/ds-2.0 в виде {локальное имя: экспортируемое имя}."""
+    imports = {}
+    for names in DS_IMPORT.findall(strip_comments(text)):
+        for name in _split_top_level(names, ","):
+            name = name.removeprefix("type ").strip()
+            exported, _, local = name.partition(" as ")
+            imports[(local or exported).strip()] = exported.strip()
+    return imports
+
+
+def find_props_interface(title: str, index_code: str, interfaces: dict) -> str | None:
+    """Имя interface пропсов компонента по его index.tsx, с запасным вариантом по соглашению об именах."""
+    code = strip_comments(index_code)
+    for pattern in PROPS_PATTERNS:
+        for name in pattern.findall(code):
+            if name in interfaces:
+                return name
+    for name in (f"I{title}Props", f"I{title}", f"T{title}Props"):
+        if name in interfaces:
+            return name
+    return None
+
+
+def resolve_props(interface_name: str, interfaces: dict, _seen: set | None = None) -> tuple[dict, bool]:
+    """
+    Собирает пропсы interface вместе с унаследованными.
+    Второе значение — признак закрытого набора: False, если есть index signature
+    или наследование от типа, которого нет среди разобранных (например HTMLAttributes).
+    """
+    seen = _seen if _seen is not None else set()
+    if interface_name in seen or interface_name not in interfaces:
+        return {}, False
+    seen.add(interface_name)
+
+    interface = interfaces[interface_name]
+    props = {}
+    closed = not interface["index_signature"]
+    for base in interface["extends"]:
+        base_name, _, generic = base.partition("<")
+        base_name = base_name.strip()
+        generic = generic.rstrip(">").strip()
+        if base_name in CHILDREN_WRAPPERS:
+            props.setdefault("children", {"type": "ReactNode", "required": False})
+            if generic.startswith("{"):
+                # PropsWithChildren<{ ... }> — пропсы описаны прямо в generic
+                props.update(parse_interfaces(f"interface Inline {generic}")["Inline"]["props"])
+                continue
+            if generic:
+                base_name = generic
+            else:
+                continue
+        if base_name == "Omit" and generic:
+            target, _, omitted = generic.partition(",")
+            base_props, base_closed = resolve_props(target.strip(), interfaces, seen)
+            for key in re.findall(r"['\"]([^'\"]+)['\"]", omitted):
+                base_props.pop(key, None)
+        else:
+            base_props, base_closed = resolve_props(base_name, interfaces, seen)
+        props.update(base_props)
+        closed = closed and base_closed
+    props.update(interface["props"])
+    return props, closed
+
+
+def build_design_system_schema(components_files: dict[str, dict[str, str]]) -> dict:
+    """
+    Строит схему дизайн-системы по исходникам, собранным recursive.py:
+    {"exports": [...], "export_patterns": [...], "interfaces": {interface: {"extends", "props", "closed"}},
+     "enums": {enum: [значения]},
+     "components": {компонент: {"interface", "props", "closed"}}}.
+    components_files — {название компонента: {путь файла относительно папки компонента: содержимое}}.
+    """
+    interfaces = {}
+    enums = {}
+    exports = set()
+    entry_points = {}
+    for title, files in components_files.items():
+        if "." in title:
+            # components/index.ts — список экспортов пакета
+            for content in files.values():
+                exports.update(parse_exports(content))
+            continue
+        exports.add(title)
+        for path, content in files.items():
+            parts = path.replace("\\", "/").split("/")
+            if path.endswith((".ts", ".tsx")):
+                interfaces.update(parse_interfaces(content))
+                enums.update(parse_enums(content))
+                exports.update(parse_exports(content))
+                exports.update(parse_ds_imports(content).values())
+            if parts[-1] == "index.tsx":
+                if len(parts) == 1:
+                    entry_points[title] = content
+                elif len(parts) == 3 and parts[0] == "subcomponents":
+                    entry_points.setdefault(parts[1], content)
+                    exports.add(parts[1])
+
+    components = {}
+    for name, index_code in entry_points.items():
+        interface_name = find_props_interface(name, index_code, interfaces)
+        if not interface_name:
+            continue
+        props, closed = resolve_props(interface_name, interfaces)
+        components[name] = {"interface": interface_name, "props": props, "closed": closed}
+
+    # В индекс кладём пропсы вместе с унаследованными — поиск по имени interface не требует разбора
+    resolved_interfaces = {}
+    for name, interface in interfaces.items():
+        props, closed = resolve_props(name, interfaces)
+        resolved_interfaces[name] = {"extends": interface["extends"], "props": props, "closed": closed}
+
+    return {
+        "exports": sorted(exports),
+        "export_patterns": DS_EXPORT_PATTERNS,
+        "interfaces": resolved_interfaces,
+        "enums": enums,
+        "components": components,
+    }
+
+
+def load_components_files_from_csv(csv_path: str) -> dict[str, dict[str, str]]:
+    """
+    Группирует строки RAW_COMPONENTS_.csv по компонентам.
+    'Document Purpose' имеет вид "Types for component Accordion subcomponents AccordionItem types.ts".
+    """
+    components_files = {}
+    with open(csv_path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            purpose = row["Document Purpose"]
+            if " component " not in purpose:
+                continue
+            path_parts = purpose.split(" component ", 1)[1].split(" ")
+            title, rel_path = path_parts[0], "/".join(path_parts[1:])
+            components_files.setdefault(title, {})[rel_path] = row["Content"]
+    return components_files
+
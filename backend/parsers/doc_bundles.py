@@ -0,0 +1,80 @@
+import json
+import os
+from typing import Dict, List
+
+from langchain_core.documents import Document
+
+from backend.parsers.chunking import chunking_signature, load_index_documents
+from backend.parsers.hybrid_search import LexicalIndex, document_component
+from backend.parsers.manifest import file_sha256
+
+# Запрос, которым write_code ищет документацию компонента; по нему ранжируются части пакета
+CODER_QUERY = "Detailed ARG TYPES of props a component {0} can have and CODE examples of using {0}"
+DECLARATION_KINDS = ("interface", "type", "enum")
+EXAMPLE_KINDS = ("story",)
+DOC_BUNDLE_SIZE = int(os.environ.get("DOC_BUNDLE_SIZE", 8))
+
+
+def build_doc_bundles(csv_path: str, titles: List[str], max_docs: int = DOC_BUNDLE_SIZE) -> Dict[str, List[Document]]:
+    """
+    {компонент: документы} — объявления (interface, type, enum) и примеры <Editor> из Stories компонента,
+    каждая группа упорядочена по BM25 относительно запроса write_code. Половина мест отдаётся объявлениям,
+    половина примерам; если одной группы не хватает, остаток добирается из другой.
+    """
+    documents = load_index_documents(csv_path, chunking=True)
+    lexical = LexicalIndex(documents)
+    by_component: Dict[str, List[int]] = {}
+    for i, doc in enumerate(documents):
+        by_component.setdefault(document_component(doc), []).append(i)
+
+    bundles = {}
+    for title in titles:
+        candidates = by_component.get(title, [])
+        query = CODER_QUERY.format(title)
+        declarations = [doc for doc, _ in lexical.search(query, len(candidates), [
+            i for i in candidates if documents[i].metadata["kind"] in DECLARATION_KINDS])]
+        examples = [doc for doc, _ in lexical.search(query, len(candidates), [
+            i for i in candidates if documents[i].metadata["kind"] in EXAMPLE_KINDS])]
+        take_declarations = max(max_docs // 2, max_docs - len(examples))
+        bundle = declarations[:take_declarations]
+        bundle += examples[:max_docs - len(bundle)]
+        if bundle:
+            bundles[title] = bundle
+    return bundles
+
+
+def _signature(csv_path: str, max_docs: int) -> str:
+    return f"{file_sha256(csv_path)} {chunking_signature()} size:{max_docs}"
+
+
+def ensure_doc_bundles(csv_path: str, json_path: str, bundles_path: str, max_docs: int = DOC_BUNDLE_SIZE):
+    """Пересобирает пакеты, если RAW_COMPONENTS_.csv или параметры разбиения изменились с прошлой сборки."""
+    signature = _signature(csv_path, max_docs)
+    if os.path.isfile(bundles_path):
+        try:
+            with open(bundles_path, "r", encoding="utf-8") as f:
+                if json.load(f).get("signature") == signature:
+                    return
+        except (OSError, ValueError) as e:
+            print(f"Doc bundles at {bundles_path} are unreadable, rebuilding: {e}")
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        titles = sorted(json.load(f)["descriptions"])
+    bundles = build_doc_bundles(csv_path, titles, max_docs)
+    tmp_path = bundles_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "signature": signature,
+            "bundles": {
+                title: [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]
+                for title, docs in bundles.items()
+            }
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, bundles_path)
+    print(f"Doc bundles for {len(bundles)}/{len(titles)} components saved to {bundles_path}")
+
+
+def load_doc_bundles(bundles_path: str) -> Dict[str, List[Document]]:
+    with open(bundles_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {title: [Document(**doc) for doc in docs] for title, docs in data["bundles"].items()}
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Кэш на диске — два файла в каталоге:
+#   keys.json   — список ключей sha256(модель + текст) в порядке строк vectors.npy
+#   vectors.npy — float32[n, dim]
+KEYS_FILE = "keys.json"
+VECTORS_FILE = "vectors.npy"
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Обёртка над Embeddings: векторы документов кэшируются на диске по хэшу текста и имени модели,
+    в embedder уходят только новые или изменённые тексты. Запросы (embed_query) не кэшируются.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_dir: str, model_name: str | None = None):
+        self.embeddings = embeddings
+        self.cache_dir = cache_dir
+        self.model_name = model_name or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.reused = 0
+        self.computed = 0
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._vectors and key not in missing:
+                    missing[key] = text
+            if missing:
+                vectors = self.embeddings.embed_documents(list(missing.values()))
+                for key, vector in zip(missing, vectors):
+                    self._vectors[key] = np.asarray(vector, dtype=np.float32)
+                self._save()
+            self.computed += len(missing)
+            self.reused += len(texts) - len(missing)
+            return [self._vectors[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def stats(self) -> Dict[str, int]:
+        return {"reused": self.reused, "computed": self.computed, "cached": len(self._vectors)}
+
+    def _load(self):
+        keys_path = os.path.join(self.cache_dir, KEYS_FILE)
+        if not os.path.isfile(keys_path):
+            return
+        try:
+            with open(keys_path, "r", encoding="utf-8") as f:
+                keys = json.load(f)
+            vectors = np.load(os.path.join(self.cache_dir, VECTORS_FILE))
+        except (OSError, ValueError) as e:
+            print(f"Embedding cache at {self.cache_dir} is unreadable, starting empty: {e}")
+            return
+        # Новые ключи дописываются в конец, так что после сбоя между записью файлов векторов может быть больше
+        if len(keys) > len(vectors):
+            print(f"Embedding cache at {self.cache_dir} is inconsistent, starting empty")
+            return
+        self._vectors = dict(zip(keys, vectors))
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        keys = list(self._vectors)
+        # Сначала векторы, затем ключи — оба через временный файл и os.replace
+        tmp_vectors = os.path.join(self.cache_dir, VECTORS_FILE + ".tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, np.stack([self._vectors[k] for k in keys]))
+        os.replace(tmp_vectors, os.path.join(self.cache_dir, VECTORS_FILE))
+        tmp_keys = os.path.join(self.cache_dir, KEYS_FILE + ".tmp")
+        with open(tmp_keys, "w", encoding="utf-8") as f:
+            json.dump(keys, f)
+        os.replace(tmp_keys, os.path.join(self.cache_dir, KEYS_FILE))
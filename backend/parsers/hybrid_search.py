@@ -0,0 +1,137 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from backend.parsers.chunking import component_of
+
+WORD = re.compile(r"[A-Za-zА-Яа-яЁё_$][\w$]*")
+CAMEL_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[А-ЯЁ]?[а-яё]+|\d+")
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова в нижнем регистре; идентификаторы дают и себя целиком, и части CamelCase: IButtonProps -> ibuttonprops, i, button, props."""
+    tokens = []
+    for word in WORD.findall(text):
+        lowered = word.lower()
+        tokens.append(lowered)
+        parts = CAMEL_PART.findall(word)
+        if len(parts) > 1:
+            tokens += [part.lower() for part in parts]
+    return tokens
+
+
+def document_component(doc: Document) -> str:
+    if "component" in doc.metadata:
+        return doc.metadata["component"]
+    return component_of(doc.page_content.split("\n", 1)[0])
+
+
+class LexicalIndex:
+    """
+    Инвертированный индекс BM25 по тем же документам, что лежат в FAISS,
+    плюс точный индекс имён: компонент документа и объявленные в нём интерфейсы, типы, enum (metadata names).
+    """
+
+    def __init__(self, documents: Iterable[Document], k1: float = 1.5, b: float = 0.75):
+        self.documents: List[Document] = list(documents)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        self.by_name: Dict[str, List[int]] = {}
+        for i, doc in enumerate(self.documents):
+            counts = Counter(tokenize(doc.page_content))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((i, tf))
+            for name in {document_component(doc), *doc.metadata.get("names", ())}:
+                if name:
+                    self.by_name.setdefault(name, []).append(i)
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        n = len(self.documents)
+        self.idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in self.postings.items()}
+
+    @classmethod
+    def from_vectorstore(cls, db) -> "LexicalIndex":
+        """Документы FAISS-хранилища в порядке индекса (подходит и для MmapDocstore)."""
+        return cls(db.docstore.search(db.index_to_docstore_id[i]) for i in range(len(db.index_to_docstore_id)))
+
+    def scores(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, k: int, candidates: Iterable[int] | None = None) -> List[Tuple[Document, float]]:
+        scores = self.scores(query)
+        pool = set(candidates) if candidates is not None else scores.keys()
+        ranked = sorted(pool, key=lambda i: (-scores.get(i, 0.0), i))[:k]
+        return [(self.documents[i], scores.get(i, 0.0)) for i in ranked]
+
+    def exact_matches(self, query: str) -> List[int]:
+        """Документы, чей компонент или объявление в точности (с учётом регистра) названы в запросе."""
+        found = []
+        for name in dict.fromkeys(IDENTIFIER.findall(query)):
+            found += self.by_name.get(name, ())
+        return list(dict.fromkeys(found))
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Запрос с точным именем компонента или объявления обслуживается лексическим путём без эмбеддинга запроса
+    и MMR: сначала документы с этим именем по BM25, остаток до k — BM25 по всему индексу.
+    Остальные запросы — слияние BM25 и векторного ретривера по reciprocal rank fusion.
+    """
+
+    vector_retriever: BaseRetriever
+    lexical: LexicalIndex
+    k: int = 6
+    fetch_k: int = 50
+    rrf_k: int = 60
+
+    def _lexical(self, query: str) -> List[Document] | None:
+        exact = self.lexical.exact_matches(query)
+        if not exact:
+            return None
+        docs = [doc for doc, _ in self.lexical.search(query, self.k, exact)]
+        if len(docs) < self.k:
+            taken = {id(doc) for doc in docs}
+            docs += [doc for doc, score in self.lexical.search(query, self.k + len(docs))
+                     if score > 0 and id(doc) not in taken][:self.k - len(docs)]
+        return docs
+
+    def _fuse(self, query: str, vector_docs: List[Document]) -> List[Document]:
+        ranks: Dict[str, float] = {}
+        docs: Dict[str, Document] = {}
+        lexical_docs = [doc for doc, score in self.lexical.search(query, self.fetch_k) if score > 0]
+        for ranking in (lexical_docs, vector_docs):
+            for rank, doc in enumerate(ranking):
+                docs.setdefault(doc.page_content, doc)
+                ranks[doc.page_content] = ranks.get(doc.page_content, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+        return [docs[key] for key in sorted(ranks, key=lambda key: -ranks[key])[:self.k]]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        docs = self._lexical(query)
+        if docs is not None:
+            return docs
+        return self._fuse(query, self.vector_retriever.invoke(query, config={"callbacks": run_manager.get_child()}))
+
+    async def _aget_relevant_documents(
+            self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        docs = self._lexical(query)
+        if docs is not None:
+            return docs
+        vector_docs = await self.vector_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        return self._fuse(query, vector_docs)
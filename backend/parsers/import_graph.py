@@ -0,0 +1,177 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+SOURCE_EXTENSIONS = (".ts", ".tsx")
+RESOLVE_EXTENSIONS = ["", ".scss", ".ts", ".tsx", ".d.ts"]
+INDEX_FILES = ["index.tsx", "index.ts"]
+ALIAS_PREFIX = "@components/"
+
+# Оба выражения начинаются с литерала, поэтому re ищет их быстрым поиском подстроки.
+# Покрывают многострочные списки, import type, import * as, import X, { y }, import '...' и реэкспорт.
+IMPORT_STATEMENT = re.compile(r"""import(?:\s+(?:type\s+)?[\w$*{}\s,]*?\bfrom)?\s*(['"])([^'"\n]+)\1""")
+EXPORT_STATEMENT = re.compile(r"""export\s+(?:type\s+)?[\w$*{}\s,]*?\bfrom\s*(['"])([^'"\n]+)\1""")
+# Комментарии и строки: import внутри них (примеры кода в Stories) не даёт рёбер
+SKIPPED = re.compile(r"""//[^\n]*|/\*.*?\*/|`(?:\\.|[^`\\])*`|'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*\"""", re.S)
+SKIPPED_START = re.compile(r"""[/`'"]""")
+
+
+def scan_imports(code: str) -> List[Tuple[str, str]]:
+    """[(спецификатор, "import" | "export")] для всех статических импортов и реэкспортов файла."""
+    candidates = sorted(
+        [(m.start(), m.end(), m.group(2), "import") for m in IMPORT_STATEMENT.finditer(code)]
+        + [(m.start(), m.end(), m.group(2), "export") for m in EXPORT_STATEMENT.finditer(code)]
+    )
+    found = []
+    pos = 0  # код до pos уже разобран: известно, что мы не внутри комментария или строки
+    for start, end, spec, kind in candidates:
+        if start and (code[start - 1].isalnum() or code[start - 1] in "_$."):
+            continue
+        # Комментарии и строки просматриваются только до очередного кандидата, а не по всему файлу
+        while pos < start:
+            opener = SKIPPED_START.search(code, pos, start)
+            if opener is None:
+                pos = start
+                break
+            skipped = SKIPPED.match(code, opener.start())
+            pos = skipped.end() if skipped else opener.start() + 1
+        if pos > start:
+            continue
+        found.append((spec, kind))
+        pos = end
+    return found
+
+
+class DirectoryIndex:
+    """
+    Один обход дерева (os.scandir) вместо isfile/isdir на каждую попытку разрешить импорт.
+    Пути вне дерева проверяются через os.path и запоминаются.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        self.files: Set[str] = set()
+        self.dirs: Set[str] = {self.root}
+        self.scandir_calls = 0
+        self.stat_calls = 0
+        self._outside: Dict[str, Tuple[bool, bool]] = {}
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            self.scandir_calls += 1
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        self.dirs.add(entry.path)
+                        stack.append(entry.path)
+                    else:
+                        self.files.add(entry.path)
+
+    def _inside(self, path: str) -> bool:
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def _probe(self, path: str) -> Tuple[bool, bool]:
+        if path not in self._outside:
+            self.stat_calls += 2
+            self._outside[path] = (os.path.isfile(path), os.path.isdir(path))
+        return self._outside[path]
+
+    def is_file(self, path: str) -> bool:
+        return path in self.files if self._inside(path) else self._probe(path)[0]
+
+    def is_dir(self, path: str) -> bool:
+        return path in self.dirs if self._inside(path) else self._probe(path)[1]
+
+
+class ImportGraph:
+    """
+    Граф импортов всего дерева компонентов: каждый .ts/.tsx файл сканируется один раз,
+    разрешение импортов мемоизировано по (папка, спецификатор) и по итоговому пути.
+    edges — {файл: [(файл назначения, "import" | "export", через алиас @components)]}.
+    """
+
+    def __init__(self, components_root: str, read: Callable[[str], str], workers: int = 1):
+        self.components_root = os.path.normpath(components_root)
+        self.index = DirectoryIndex(os.path.dirname(self.components_root))
+        self.edges: Dict[str, List[Tuple[str, str, bool]]] = {}
+        self._by_spec: Dict[Tuple[str, str], Optional[str]] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+
+        sources = sorted(p for p in self.index.files
+                         if p.endswith(SOURCE_EXTENSIONS) and p.startswith(self.components_root + os.sep))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import-scan") as executor:
+                scanned = list(executor.map(lambda p: scan_imports(read(p)), sources))
+        else:
+            scanned = [scan_imports(read(p)) for p in sources]
+        for path, imports in zip(sources, scanned):
+            edges = []
+            for spec, kind in imports:
+                target = self.resolve(spec, path)
+                if target:
+                    edges.append((target, kind, spec.startswith(ALIAS_PREFIX)))
+            self.edges[path] = edges
+
+    def resolve(self, spec: str, importer: str) -> Optional[str]:
+        key = (os.path.dirname(importer), spec)
+        if key not in self._by_spec:
+            self._by_spec[key] = self._resolve_spec(spec, key[0])
+        return self._by_spec[key]
+
+    def _resolve_spec(self, spec: str, base_dir: str) -> Optional[str]:
+        if spec.startswith(ALIAS_PREFIX):
+            full_path = os.path.join(self.components_root, *spec[len(ALIAS_PREFIX):].split("/"))
+        elif spec.startswith("."):
+            full_path = os.path.normpath(os.path.join(base_dir, *spec.split("/")))
+        else:
+            # Пакеты из node_modules в документацию не попадают
+            return None
+        # Разные спецификаторы из разных папок часто ведут к одному пути — мемоизация по нему
+        if full_path not in self._resolved:
+            self._resolved[full_path] = self._resolve(full_path)
+        return self._resolved[full_path]
+
+    def _resolve(self, full_path: str) -> Optional[str]:
+        if self.index.is_dir(full_path):
+            for name in INDEX_FILES:
+                if self.index.is_file(os.path.join(full_path, name)):
+                    return os.path.join(full_path, name)
+            return None
+        for ext in RESOLVE_EXTENSIONS:
+            if self.index.is_file(full_path + ext):
+                return full_path + ext
+        return None
+
+    def component_of(self, path: str) -> Optional[str]:
+        """Папка верхнего уровня под components_root, к которой относится файл."""
+        prefix = self.components_root + os.sep
+        if not path.startswith(prefix):
+            return None
+        rel = path[len(prefix):]
+        return rel.split(os.sep, 1)[0] if os.sep in rel else None
+
+    def closure(self, entry_points: List[str]) -> Set[str]:
+        """
+        Файлы, достижимые из entry_points. Алиасные импорты @components/... и реэкспорты идут только
+        внутри папки самого компонента — иначе barrel-файлы вроде components/index.ts тянули бы
+        в документацию компонента всю библиотеку.
+        """
+        if not entry_points:
+            return set()
+        component = self.component_of(entry_points[0])
+        result = set()
+        stack = [p for p in entry_points if self.index.is_file(p)]
+        while stack:
+            path = stack.pop()
+            if path in result:
+                continue
+            result.add(path)
+            inside = self.component_of(path) == component
+            for target, kind, via_alias in self.edges.get(path, ()):
+                if target in result:
+                    continue
+                if (kind == "export" and not inside) or (via_alias and self.component_of(target) != component):
+                    continue
+                stack.append(target)
+        return result
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Set
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class IngestManifest:
+    """
+    Состояние последнего разбора дерева компонентов ds-2.0:
+    files      — {путь относительно root: {"mtime_ns", "size", "sha256", "used_by": [папки компонентов]}}
+    components — {папка компонента: {"title", "description", "files": [пути замыкания импортов]}}
+    По нему повторный запуск находит компоненты, чьё замыкание зависимостей изменилось.
+    """
+
+    def __init__(self, path: str, root: str):
+        self.path = path
+        self.root = os.path.normpath(root)
+        self.files: Dict[str, dict] = {}
+        self.components: Dict[str, dict] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, root: str) -> "IngestManifest":
+        manifest = cls(path, root)
+        if not os.path.isfile(path):
+            return manifest
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ingest manifest at {path} is unreadable, full rebuild: {e}")
+            return manifest
+        if data.get("version") != MANIFEST_VERSION or data.get("root") != manifest.root:
+            print(f"Ingest manifest at {path} was built for another tree or version, full rebuild")
+            return manifest
+        manifest.files = data["files"]
+        manifest.components = data["components"]
+        return manifest
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "root": self.root,
+                "files": self.files,
+                "components": self.components,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def rel(self, path: str) -> str:
+        return os.path.relpath(os.path.normpath(path), self.root).replace(os.sep, "/")
+
+    def abs(self, rel_path: str) -> str:
+        return os.path.join(self.root, *rel_path.split("/"))
+
+    def file_changed(self, rel_path: str) -> bool:
+        """Сначала mtime и размер; хэш считается, только если они разошлись."""
+        entry = self.files[rel_path]
+        try:
+            st = os.stat(self.abs(rel_path))
+        except OSError:
+            return True
+        if st.st_mtime_ns == entry["mtime_ns"] and st.st_size == entry["size"]:
+            return False
+        if st.st_size == entry["size"] and file_sha256(self.abs(rel_path)) == entry["sha256"]:
+            # Файл тронули без изменений — запоминаем новый mtime, чтобы не хэшировать снова
+            entry["mtime_ns"] = st.st_mtime_ns
+            self.dirty = True
+            return False
+        return True
+
+    def changed_components(self) -> Set[str]:
+        changed = set()
+        for rel_path, entry in self.files.items():
+            if self.file_changed(rel_path):
+                changed.update(entry["used_by"])
+        return changed
+
+    def record_component(self, folder: str, title: str, description: str, paths: Iterable[str]):
+        self.drop_component(folder)
+        rel_paths = [self.rel(p) for p in paths]
+        for rel_path in rel_paths:
+            entry = self.files.setdefault(rel_path, {"mtime_ns": None, "size": None, "sha256": None, "used_by": []})
+            # Общий файл мог измениться, пока его ещё используют другие компоненты — обновляем состояние
+            st = os.stat(self.abs(rel_path))
+            if st.st_mtime_ns != entry["mtime_ns"] or st.st_size != entry["size"]:
+                entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size, sha256=file_sha256(self.abs(rel_path)))
+            entry["used_by"].append(folder)
+        self.components[folder] = {"title": title, "description": description, "files": rel_paths}
+        self.dirty = True
+
+    def record_skipped(self, folder: str, paths: Iterable[str]):
+        """Папка со Stories.tsx, но без описания компонента: следим за файлом, чтобы заметить, когда оно появится."""
+        self.record_component(folder, "", "", paths)
+        self.components[folder]["skipped"] = True
+
+    def drop_component(self, folder: str):
+        entry = self.components.pop(folder, None)
+        if entry is None:
+            return
+        for rel_path in entry["files"]:
+            file_entry = self.files.get(rel_path)
+            if file_entry is None:
+                continue
+            file_entry["used_by"] = [f for f in file_entry["used_by"] if f != folder]
+            if not file_entry["used_by"]:
+                del self.files[rel_path]
+        self.dirty = True
+
+    def component_files(self, folder: str) -> List[str]:
+        return [self.abs(p) for p in self.components[folder]["files"]]
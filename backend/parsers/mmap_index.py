@@ -0,0 +1,176 @@
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+# Формат каталога:
+#   index.faiss   — индекс FAISS, читается через mmap (IO_FLAG_MMAP_IFC), векторы не копируются в память процесса
+#   texts.bin     — тексты документов подряд в одном UTF-8 блобе
+#   offsets.npy   — uint64[n + 1], границы текстов в texts.bin; тоже через mmap
+#   docstore.json — id и metadata документов в порядке индекса
+# Страницы файлов общие для всех процессов, которые открыли тот же индекс; pickle не используется.
+# Файлы лежат в подкаталоге поколения gen-*, на текущее поколение указывает файл CURRENT. Новое поколение
+# пишется во временный каталог и включается заменой CURRENT через os.replace, поэтому читатели видят либо
+# старый, либо новый индекс целиком. Каталог без CURRENT читается как раньше, из самого path.
+INDEX_FILE = "index.faiss"
+TEXTS_FILE = "texts.bin"
+OFFSETS_FILE = "offsets.npy"
+DOCSTORE_FILE = "docstore.json"
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+GENERATION_PREFIX = "gen-"
+
+
+class MmapDocstore(Docstore):
+    """Docstore только для чтения: текст документа декодируется из mmap-блоба при обращении."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, DOCSTORE_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids = meta["ids"]
+        self.metadata = meta["metadata"]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r")
+
+        self._file = open(os.path.join(path, TEXTS_FILE), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap не умеет отображать пустой файл
+        self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def text(self, position: int) -> str:
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def search(self, search: str) -> str | Document:
+        position = self._positions.get(search)
+        if position is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=self.text(position), metadata=self.metadata[position])
+
+    def add(self, texts):
+        raise NotImplementedError("MmapDocstore is read-only, rebuild the index instead")
+
+    def delete(self, ids):
+        raise NotImplementedError("MmapDocstore is read-only, rebuild the index instead")
+
+
+def current_generation(path: str) -> str:
+    """Каталог с файлами текущего индекса."""
+    try:
+        with open(os.path.join(path, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        return path
+
+
+@contextmanager
+def regeneration_lock(path: str):
+    """Межпроцессная блокировка перегенерации: воркеры, прогревающиеся одновременно, пишут индекс по очереди."""
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, LOCK_FILE), "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK сдаётся примерно через 10 секунд, а конвертация может идти дольше
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def save_mmap_index(db: FAISS, path: str):
+    """Пишет новое поколение индекса и атомарно переключает на него CURRENT. Вызывать под regeneration_lock."""
+    os.makedirs(path, exist_ok=True)
+    generation = f"{GENERATION_PREFIX}{time.time_ns()}"
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=path)
+    try:
+        _write_layout(db, tmp_dir)
+        os.replace(tmp_dir, os.path.join(path, generation))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    fd, tmp_current = tempfile.mkstemp(prefix=".current-", dir=path)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(generation)
+    os.replace(tmp_current, os.path.join(path, CURRENT_FILE))
+    _remove_old_generations(path)
+
+
+def _remove_old_generations(path: str, keep: int = 2):
+    # Предыдущее поколение остаётся: процесс, который только что прочитал CURRENT, ещё может открывать его файлы
+    generations = sorted(name for name in os.listdir(path) if name.startswith(GENERATION_PREFIX))
+    for name in generations[:-keep]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def _write_layout(db: FAISS, path: str):
+    ids = [db.index_to_docstore_id[i] for i in range(db.index.ntotal)]
+    documents = [db.docstore.search(doc_id) for doc_id in ids]
+
+    offsets = np.zeros(len(documents) + 1, dtype=np.uint64)
+    with open(os.path.join(path, TEXTS_FILE), "wb") as f:
+        for i, doc in enumerate(documents):
+            data = doc.page_content.encode("utf-8")
+            f.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+    np.save(os.path.join(path, OFFSETS_FILE), offsets)
+
+    with open(os.path.join(path, DOCSTORE_FILE), "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "metadata": [doc.metadata for doc in documents]}, f, ensure_ascii=False)
+    faiss.write_index(db.index, os.path.join(path, INDEX_FILE))
+
+
+def convert_faiss_index(src_path: str, dst_path: str):
+    """
+    Переводит каталог FAISS.save_local (index.faiss + index.pkl) в mmap-формат. Если другой процесс
+    успел сделать это, пока ждали блокировку, индекс не перезаписывается.
+    """
+    with regeneration_lock(dst_path):
+        if is_mmap_index_fresh(src_path, dst_path):
+            return
+        db = FAISS.load_local(src_path, None, allow_dangerous_deserialization=True)
+        save_mmap_index(db, dst_path)
+    print(f"Converted FAISS index {src_path} to memory-mapped format at {dst_path}")
+
+
+def is_mmap_index_fresh(src_path: str, dst_path: str) -> bool:
+    dst_index = os.path.join(current_generation(dst_path), INDEX_FILE)
+    if not os.path.isfile(dst_index):
+        return False
+    src_mtime = max(os.path.getmtime(os.path.join(src_path, name)) for name in os.listdir(src_path))
+    return os.path.getmtime(dst_index) >= src_mtime
+
+
+def load_mmap_index(path: str, embeddings) -> FAISS:
+    path = current_generation(path)
+    index = faiss.read_index(os.path.join(path, INDEX_FILE), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+    docstore = MmapDocstore(path)
+    if index.ntotal != len(docstore):
+        raise ValueError(f"Index at {path} has {index.ntotal} vectors but {len(docstore)} documents")
+    return FAISS(embeddings, index, docstore, dict(enumerate(docstore.ids)))
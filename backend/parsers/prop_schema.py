@@ -0,0 +1,85 @@
+import json
+import os
+import re
+
+from backend.parsers.declarations import build_design_system_schema, load_components_files_from_csv
+
+
+def format_component_files(components_data: dict) -> dict[str, dict[str, str]]:
+    """
+    Переводит результат collect_component_data ({компонент: {"files": {путь: код}}}) в
+    {папка компонента: {путь внутри папки: код}} — так же, как файлы раскладываются в RAW_COMPONENTS_.csv.
+    """
+    components_files = {}
+    for component_data in components_data.values():
+        for filename, content in component_data["files"].items():
+            path_parts = os.path.normpath(filename).split(os.sep)
+            if "components" not in path_parts:
+                continue
+            idx = path_parts.index("components")
+            owner, rel_path = path_parts[idx + 1], "/".join(path_parts[idx + 2:])
+            components_files.setdefault(owner, {})[rel_path] = content
+    return components_files
+
+
+def save_prop_schema(schema: dict, output_path: str):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Successfully saved prop schema to {output_path}")
+
+
+def build_prop_schema_from_csv(csv_path: str, output_path: str) -> dict:
+    schema = build_design_system_schema(load_components_files_from_csv(csv_path))
+    save_prop_schema(schema, output_path)
+    return schema
+
+
+def load_prop_schema(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class PropSchemaIndex:
+    """
+    Точный поиск пропсов ds-2.0 по имени компонента или interface (например IBox из текста TS2322)
+    вместо нечёткого поиска по FAISS.
+    """
+
+    def __init__(self, schema: dict):
+        self.components = schema.get("components", {})
+        self.interfaces = schema.get("interfaces", {})
+        self.exports = set(schema.get("exports", []))
+        self.enums = schema.get("enums", {})
+        # interface -> компонент, для подписи в описании
+        self._owners = {c["interface"]: name for name, c in self.components.items()}
+
+    def by_component(self, name: str) -> dict | None:
+        return self.components.get(name)
+
+    def by_interface(self, name: str) -> dict | None:
+        return self.interfaces.get(name)
+
+    def describe(self, name: str) -> str | None:
+        """Компактное описание пропсов в виде TypeScript interface для промпта."""
+        component = self.components.get(name)
+        interface_name = component["interface"] if component else name
+        interface = self.interfaces.get(interface_name)
+        if interface is None:
+            return None
+
+        owner = self._owners.get(interface_name)
+        header = f"interface {interface_name}"
+        if interface["extends"]:
+            header += f" extends {', '.join(interface['extends'])}"
+        if owner:
+            header = f"// props of <{owner}> from @nlmk/ds-2.0\n{header}"
+        lines = [f"  {prop}{'' if meta['required'] else '?'}: {meta['type']};" for prop, meta in interface["props"].items()]
+        # Значения enum, на которые ссылаются типы пропсов — чаще всего именно их LLM и путает
+        used_enums = []
+        for meta in interface["props"].values():
+            for name in re.findall(r"[A-Za-z_$][\w$]*", meta["type"]):
+                if name in self.enums and name not in used_enums:
+                    used_enums.append(name)
+        enum_lines = [f"enum {name}: {' | '.join(repr(v) for v in self.enums[name])}" for name in used_enums]
+        return "\n".join([header + " {", *lines, "}", *enum_lines])
@@ -2,90 +2,77 @@ import csv
 import json
 import os
 import re
-import asyncio
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import chardet
-from langchain_community.document_loaders import CSVLoader
 from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
 
+from backend.parsers.chunking import chunking_signature, load_index_documents
+from backend.parsers.declarations import build_design_system_schema
+from backend.parsers.doc_bundles import ensure_doc_bundles
+from backend.parsers.embedding_cache import CachedEmbeddings
+from backend.parsers.import_graph import ImportGraph
+from backend.parsers.manifest import IngestManifest, file_sha256
+from backend.parsers.mmap_index import convert_faiss_index, is_mmap_index_fresh
+from backend.parsers.prop_schema import (
+    format_component_files, save_prop_schema, build_prop_schema_from_csv, load_prop_schema
+)
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 COMPONENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'backend', 'ds-2.0', 'src', 'components')
 OUTPUT_JSON_PATH = os.path.join(BASE_DIR, "data", "RAW_COMPONENTS_.json")
 OUTPUT_CSV_PATH = os.path.join(BASE_DIR, "data", "RAW_COMPONENTS_.csv")
-FAISS_DB_PATH = os.path.join(BASE_DIR, "data", "faiss_extended")
-
-
-# Функция для поиска реального пути файла по его импорту
-async def resolve_import_path(import_path: str, current_file_path: str) -> str | None:
-    possible_extensions = ['', '.scss', '.ts', '.tsx', '.d.ts']
-
-    if import_path.startswith("@"):
-        print(import_path)
-        import_path = import_path.replace('@components', os.path.join('..', '..', 'ds-2.0', 'src', 'components'))
-        # Use os.path.basename to get the component name
-        component = os.path.basename(os.path.dirname(current_file_path))
-        if not import_path.startswith("@") and component in import_path:
-            if os.path.isdir(import_path):
-                tsx_file_path = os.path.join(import_path, 'index.tsx')
-                if os.path.isfile(tsx_file_path):
-                    return os.path.normpath(tsx_file_path)
-                ts_file_path = os.path.join(import_path, 'index.ts')
-                if os.path.isfile(ts_file_path):
-                    return os.path.normpath(ts_file_path)
-            else:
-                for ext in possible_extensions:
-                    if os.path.isfile(import_path + ext):
-                        return import_path + ext
-    else:
-        # Определяем базовый путь как директорию текущего файла
-        print(f"\nimp_path = {import_path}, current_file_path = {current_file_path}")
-        base_path = os.path.dirname(current_file_path)
-        full_path = os.path.normpath(os.path.join(base_path, import_path))
-
-        print(f"full_path = {full_path}, base_path = {base_path}")
-        if os.path.isdir(full_path):
-            tsx_file_path = os.path.join(full_path, 'index.tsx')
-            if os.path.isfile(tsx_file_path):
-                return os.path.normpath(tsx_file_path)
-            ts_file_path = os.path.join(full_path, 'index.ts')
-            if os.path.isfile(ts_file_path):
-                return os.path.normpath(ts_file_path)
-        else:
-            for ext in possible_extensions:
-                if os.path.isfile(full_path + ext):
-                    print(f"Found file: {full_path + ext}")
-                    return full_path + ext
-
-
-# Главная рекурсивная функция поиска файлов
-async def deep_search(file_path: str, result: set):
-    if not os.path.isfile(file_path):
-        return
-    else:
-        result.add(file_path)
-        with open(file_path, 'r', encoding='utf-8') as file:
-            file_content = file.read()
-
-        pattern = r'import\s+(?:{[^}]+}|\w+)\s+from\s+[\'"]([^\'"]+)[\'"]'
-        imports = re.findall(pattern, file_content)
-
-        tasks = []
-        for imp in imports:
-            resolved_path = await resolve_import_path(imp.replace("/", "\\"), file_path)
-            if resolved_path and resolved_path not in result:
-                tasks.append(deep_search(resolved_path, result))
-
-        await asyncio.gather(*tasks)
+# faiss_extended в git — исходная точка (индекс целых файлов). Прогрев дополняет и перестраивает его копию
+# faiss_local вне git, поэтому отслеживаемые файлы не меняются
+FAISS_SEED_PATH = os.path.join(BASE_DIR, "data", "faiss_extended")
+FAISS_DB_PATH = os.path.join(BASE_DIR, "data", "faiss_local")
+FAISS_MMAP_PATH = os.path.join(BASE_DIR, "data", "faiss_mmap")
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "data", "embedding_cache"))
+PROP_SCHEMA_PATH = os.path.join(BASE_DIR, "data", "PROP_SCHEMA_.json")
+MANIFEST_PATH = os.path.join(BASE_DIR, "data", "INGEST_MANIFEST_.json")
+DOC_BUNDLES_PATH = os.path.join(BASE_DIR, "data", "DOC_BUNDLES_.json")
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", min(8, os.cpu_count() or 1)))
+
+
+class SourceFiles:
+    """Общий для всех потоков разбора кэш исходников: каждый файл читается с диска один раз."""
+
+    def __init__(self):
+        self.reads = 0
+        self._contents = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def read(self, path: str) -> str:
+        with self._lock:
+            if path in self._contents:
+                return self._contents[path]
+            path_lock = self._locks.setdefault(path, threading.Lock())
+        with path_lock:
+            if path not in self._contents:
+                with open(path, 'r', encoding='utf-8') as file:
+                    self._contents[path] = file.read()
+                self.reads += 1
+        return self._contents[path]
 
 
 # Функция для сбора данных по компоненту
-async def collect_component_data(folder_path: str) -> tuple | None:
+def collect_component_data(
+        folder_path: str,
+        sources: SourceFiles | None = None,
+        graph: ImportGraph | None = None
+) -> tuple | None:
+    sources = sources or SourceFiles()
+    graph = graph or ImportGraph(os.path.dirname(folder_path), sources.read)
     stories_path = os.path.join(folder_path, '_stories', 'Stories.tsx')
-    if not os.path.isfile(stories_path):
+    if not graph.index.is_file(stories_path):
         return None
     else:
-        with open(stories_path, 'r', encoding='utf-8') as stories_file:
-            stories_content = stories_file.read()
+        stories_content = sources.read(stories_path)
 
         pattern = r'<Header\s+.*?description=(?P<description>{.*?}|"[^"]*").*?(isStable|isBeta).*?>'
         match = re.search(pattern, stories_content, re.DOTALL)
@@ -97,26 +84,43 @@ async def collect_component_data(folder_path: str) -> tuple | None:
             title = os.path.basename(folder_path)
             print(f"\n\nPROCESSING {title} COMPONENT")
 
-            result_files = set()
-
-            # Начинаем рекурсивный поиск с файла Stories.tsx
-            await deep_search(stories_path, result_files)
-
-            # Ищем index.tsx в корне компонента
-            index_path = os.path.join(folder_path, 'index.tsx')
-            if os.path.isfile(index_path):
-                await deep_search(index_path, result_files)
+            # Замыкание импортов от Stories.tsx и index.tsx в корне компонента
+            result_files = graph.closure([stories_path, os.path.join(folder_path, 'index.tsx')])
 
             print(f"RESULT FILES FOR {title}: {result_files}\n")
 
             return (
                 title, {
                     "description": description,
-                    "files": {path: open(path, 'r', encoding='utf-8').read() for path in result_files}
+                    "files": {path: sources.read(path) for path in result_files}
                 }
             )
 
 
+def collect_components(
+        components_base_path: str,
+        folders: list[str],
+        workers: int | None = None,
+        sources: SourceFiles | None = None
+) -> dict:
+    """
+    Параллельный разбор компонентов: {папка: результат collect_component_data}.
+    Файлы, общие для нескольких компонентов, читаются один раз — кэш SourceFiles общий для всех потоков.
+    """
+    workers = workers or INGEST_WORKERS
+    sources = sources or SourceFiles()
+    # Один граф импортов на всё дерево: общие файлы сканируются и разрешаются один раз
+    graph = ImportGraph(components_base_path, sources.read, workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as executor:
+        results = executor.map(
+            lambda folder: collect_component_data(os.path.join(components_base_path, folder), sources, graph), folders
+        )
+        collected = dict(zip(folders, results))
+    print(f"Collected {len(folders)} components with {workers} workers, {sources.reads} files read, "
+          f"{graph.index.scandir_calls} directories listed, {graph.index.stat_calls} stat calls")
+    return collected
+
+
 def save_to_json(components_data: dict, output_path: str):
     descriptions = {component: details["description"] for component, details in components_data.items() if
                     "description" in details}
@@ -157,13 +161,8 @@ def save_to_csv(components_data: dict, output_path: str):
 
         for title, component_data in components_data.items():
             for filename, content in component_data['files'].items():
-                if filename.endswith('.tsx'):
-                    doc_type = f"Codes for {format_component_path(filename)}"
-                elif filename.endswith('.ts') or filename.endswith('.d.ts'):
-                    doc_type = f"Types for {format_component_path(filename)}"
-                elif filename.endswith('.scss'):
-                    doc_type = f"Styles for {format_component_path(filename)}"
-                else:
+                doc_type = _document_purpose(filename)
+                if doc_type is None:
                     continue
 
                 writer.writerow({
@@ -172,37 +171,199 @@ def save_to_csv(components_data: dict, output_path: str):
                 })
 
 
-async def process_all_components(components_base_path: str):
+def load_csv_contents(csv_path: str) -> dict[str, str]:
+    """Document Purpose -> Content из уже собранного RAW_COMPONENTS_.csv."""
+    if not os.path.isfile(csv_path):
+        return {}
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        return {row['Document Purpose']: row['Content'] for row in csv.DictReader(csvfile)}
+
+
+def _document_purpose(filename: str) -> str | None:
+    if filename.endswith('.tsx'):
+        return f"Codes for {format_component_path(filename)}"
+    if filename.endswith('.ts') or filename.endswith('.d.ts'):
+        return f"Types for {format_component_path(filename)}"
+    if filename.endswith('.scss'):
+        return f"Styles for {format_component_path(filename)}"
+    return None
+
+
+def process_all_components(components_base_path: str, force: bool = False, workers: int | None = None) -> bool:
+    """
+    Инкрементальный разбор дерева компонентов: заново обходятся только компоненты, у которых изменился
+    хотя бы один файл замыкания импортов (по манифесту INGEST_MANIFEST_.json), строки остальных берутся
+    из текущего RAW_COMPONENTS_.csv. Возвращает True, если выходные файлы были переписаны.
+    """
+    manifest = IngestManifest(MANIFEST_PATH, components_base_path)
+    outputs = [OUTPUT_JSON_PATH, OUTPUT_CSV_PATH, PROP_SCHEMA_PATH]
+    if not force and all(os.path.isfile(path) for path in outputs):
+        manifest = IngestManifest.load(MANIFEST_PATH, components_base_path)
+
+    folders = sorted(f for f in os.listdir(components_base_path) if os.path.isdir(os.path.join(components_base_path, f)))
+    dirty = manifest.changed_components()
+    for folder in folders:
+        if folder not in manifest.components and os.path.isfile(os.path.join(components_base_path, folder, '_stories', 'Stories.tsx')):
+            dirty.add(folder)
+    removed = set(manifest.components) - set(folders)
+
+    if not dirty and not removed:
+        if manifest.dirty:
+            manifest.save()
+        print(f"Components in {components_base_path} are up to date")
+        return False
+    print(f"Reprocessing components: {sorted(dirty)}, removed: {sorted(removed)}")
+
+    for folder in removed:
+        manifest.drop_component(folder)
+    fresh = {}
+    collected = collect_components(components_base_path, sorted(dirty), workers)
+    for folder, component_data in collected.items():
+        folder_path = os.path.join(components_base_path, folder)
+        if component_data:
+            fresh[folder] = component_data
+            manifest.record_component(folder, component_data[0], component_data[1]["description"],
+                                      component_data[1]["files"])
+        elif os.path.isfile(os.path.join(folder_path, '_stories', 'Stories.tsx')):
+            manifest.record_skipped(folder, [os.path.join(folder_path, '_stories', 'Stories.tsx')])
+        else:
+            manifest.drop_component(folder)
+
+    # Неизменённые компоненты собираются из манифеста и строк текущего CSV, без повторного обхода импортов
+    csv_contents = load_csv_contents(OUTPUT_CSV_PATH)
     components_data = {}
-    for component_folder in os.listdir(components_base_path):
-        folder_path = os.path.join(components_base_path, component_folder)
-        if os.path.isdir(folder_path):
-            component_data = await collect_component_data(folder_path)
-            if component_data:
-                components_data[f"{component_data[0]}"] = component_data[1]
+    for folder in folders:
+        if folder in fresh:
+            title, data = fresh[folder]
+            components_data[title] = data
+            continue
+        entry = manifest.components.get(folder)
+        if not entry or entry.get("skipped"):
+            continue
+        files = {}
+        for path in manifest.component_files(folder):
+            purpose = _document_purpose(path)
+            if purpose in csv_contents:
+                files[path] = csv_contents[purpose]
+            elif purpose:
+                with open(path, 'r', encoding='utf-8') as file:
+                    files[path] = file.read()
+        components_data[entry["title"]] = {"description": entry["description"], "files": files}
 
     save_to_json(components_data, OUTPUT_JSON_PATH)
     save_to_csv(components_data, OUTPUT_CSV_PATH)
+    save_prop_schema(build_design_system_schema(format_component_files(components_data)), PROP_SCHEMA_PATH)
+    manifest.save()
+    return True
 
 
 def parse_recursivly_store_faiss():
-    if not os.path.isfile(OUTPUT_CSV_PATH):
-        print(f"CSV file not found at {OUTPUT_CSV_PATH}. Processing components...")
-        asyncio.run(process_all_components(COMPONENTS_DIR))
+    ensure_components_data()
+    ensure_faiss_index()
+
+
+def ensure_components_data():
+    """RAW_COMPONENTS_, схема пропсов и пакеты документации компонентов — всё, что нужно до построения FAISS."""
+    if os.path.isdir(COMPONENTS_DIR):
+        process_all_components(COMPONENTS_DIR)
+    elif not os.path.isfile(OUTPUT_CSV_PATH):
+        raise FileNotFoundError(f"Neither {COMPONENTS_DIR} nor {OUTPUT_CSV_PATH} exist")
     else:
-        print(f"CSV file found at {OUTPUT_CSV_PATH}")
+        print(f"Components dir {COMPONENTS_DIR} not found, using {OUTPUT_CSV_PATH}")
+
+    if not os.path.isfile(PROP_SCHEMA_PATH):
+        print(f"Prop schema not found at {PROP_SCHEMA_PATH}. Building it from {OUTPUT_CSV_PATH}...")
+        build_prop_schema_from_csv(OUTPUT_CSV_PATH, PROP_SCHEMA_PATH)
+
+    ensure_doc_bundles(OUTPUT_CSV_PATH, OUTPUT_JSON_PATH, DOC_BUNDLES_PATH)
+
+
+def patch_faiss_index(embeddings) -> dict:
+    """
+    Приводит faiss_local к текущему RAW_COMPONENTS_.csv: удаляет документы, которых больше нет,
+    добавляет новые и обновляет метаданные у оставшихся — без пересчёта их векторов.
+    Смена режима разбиения (INDEX_CHUNKING, CHUNK_MAX_CHARS, CHUNK_OVERLAP) проходит тем же путём.
+    """
+    db = FAISS.load_local(FAISS_DB_PATH, embeddings, allow_dangerous_deserialization=True)
+    documents = load_index_documents(OUTPUT_CSV_PATH)
+
+    existing = {}
+    for doc_id in db.index_to_docstore_id.values():
+        existing.setdefault(db.docstore.search(doc_id).page_content, []).append(doc_id)
+    to_add = []
+    for doc in documents:
+        ids = existing.get(doc.page_content)
+        if ids:
+            db.docstore.search(ids.pop()).metadata.update(doc.metadata)
+        else:
+            to_add.append(doc)
+    to_remove = [doc_id for ids in existing.values() for doc_id in ids]
+
+    if to_remove:
+        db.delete(to_remove)
+    if to_add:
+        db.add_documents(to_add)
+    db.save_local(FAISS_DB_PATH)
+    stats = {"added": len(to_add), "removed": len(to_remove), "kept": len(documents) - len(to_add)}
+    print(f"FAISS database patched at {FAISS_DB_PATH}: {stats}")
+    return stats
+
+
+def _csv_stamp_path() -> str:
+    return os.path.join(FAISS_DB_PATH, "csv.sha256")
 
+
+def faiss_index_version() -> str:
+    """Отметка, из какого CSV и с каким разбиением собран индекс; меняется при каждой перестройке."""
+    if not os.path.isfile(_csv_stamp_path()):
+        return ""
+    with open(_csv_stamp_path(), 'r') as f:
+        stamp = f.read().strip()
+    # Отметка без параметров разбиения осталась от индексов, собранных до него, — они из целых файлов
+    return f"{stamp} files" if stamp and " " not in stamp else stamp
+
+
+def _copy_seed_index():
+    """Копирует закоммиченный faiss_extended в faiss_local; каталог появляется целиком через os.replace."""
+    tmp_dir = tempfile.mkdtemp(prefix=".faiss_local-", dir=os.path.dirname(FAISS_DB_PATH))
+    try:
+        shutil.copytree(FAISS_SEED_PATH, tmp_dir, dirs_exist_ok=True)
+        os.replace(tmp_dir, FAISS_DB_PATH)
+    except OSError:
+        # Другой воркер уже скопировал
+        if not os.path.isdir(FAISS_DB_PATH):
+            raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"FAISS database copied from {FAISS_SEED_PATH} to {FAISS_DB_PATH}")
+
+
+def ensure_faiss_index():
+    if not os.path.isdir(FAISS_DB_PATH) and os.path.isdir(FAISS_SEED_PATH):
+        _copy_seed_index()
     if not os.path.isdir(FAISS_DB_PATH):
         print(f"FAISS database not found at {FAISS_DB_PATH}. Creating new database...")
-        loader = CSVLoader(file_path=OUTPUT_CSV_PATH, autodetect_encoding=True)
-        documents = loader.load()
-        embeddings = OpenAIEmbeddings()
+        documents = load_index_documents(OUTPUT_CSV_PATH)
+        embeddings = CachedEmbeddings(OpenAIEmbeddings(), EMBEDDING_CACHE_DIR)
         db = FAISS.from_documents(documents, embeddings)
         db.save_local(FAISS_DB_PATH)
-        print(f"FAISS database created and saved to {FAISS_DB_PATH}")
+        print(f"FAISS database created and saved to {FAISS_DB_PATH}, embeddings: {embeddings.stats()}")
     else:
         print(f"FAISS database found at {FAISS_DB_PATH}")
 
+    # Хэш CSV и параметры разбиения, из которых собран индекс: если они с тех пор изменились, индекс дополняется
+    csv_hash = f"{file_sha256(OUTPUT_CSV_PATH)} {chunking_signature()}"
+    stamp = faiss_index_version() or None
+    if stamp != csv_hash:
+        if stamp is not None:
+            print(f"{OUTPUT_CSV_PATH} or chunking changed since the FAISS database was built. Patching it...")
+            patch_faiss_index(CachedEmbeddings(OpenAIEmbeddings(), EMBEDDING_CACHE_DIR))
+        with open(_csv_stamp_path(), 'w') as f:
+            f.write(csv_hash)
+
+    if not is_mmap_index_fresh(FAISS_DB_PATH, FAISS_MMAP_PATH):
+        convert_faiss_index(FAISS_DB_PATH, FAISS_MMAP_PATH)
+
 
 def get_comps_descs() -> str:
     with open(OUTPUT_JSON_PATH, 'r', encoding="utf=8") as file:
@@ -213,3 +374,20 @@ def get_comps_descs() -> str:
     descs = "\n".join(descs)
 
     return descs
+
+
+def load_component_descriptions() -> dict[str, str]:
+    """{компонент: описание из Header его Stories} из RAW_COMPONENTS_.json."""
+    with open(OUTPUT_JSON_PATH, 'r', encoding="utf-8") as file:
+        return json.load(file)["descriptions"]
+
+
+def format_component_descriptions(descriptions: dict[str, str]) -> str:
+    return "\n".join(f' COMPONENT {title}: {description}' for title, description in descriptions.items())
+
+
+def get_design_system_schema() -> dict:
+    """Схема экспортов и пропсов ds-2.0 (PROP_SCHEMA_.json), при отсутствии строится из RAW_COMPONENTS_.csv."""
+    if not os.path.isfile(PROP_SCHEMA_PATH):
+        return build_prop_schema_from_csv(OUTPUT_CSV_PATH, PROP_SCHEMA_PATH)
+    return load_prop_schema(PROP_SCHEMA_PATH)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модули импортируются как backend.*, как при запуске сервера из корня репозитория
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -0,0 +1,78 @@
+from typing import TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from backend.models import checkpoints
+from backend.models.checkpoints import BoundedMemorySaver
+
+
+class State(TypedDict):
+    code: str
+    runs: int
+
+
+def build(memory: BoundedMemorySaver):
+    builder = StateGraph(State)
+    builder.add_node("coder", lambda state: {"code": state["code"] + "x", "runs": state["runs"] + 1})
+    builder.set_entry_point("coder")
+    builder.add_edge("coder", END)
+    return builder.compile(checkpointer=memory)
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def run(graph, thread_id: str, times: int = 1):
+    for _ in range(times):
+        snapshot = graph.get_state(config(thread_id))
+        graph.invoke(snapshot.values or {"code": "", "runs": 0}, config(thread_id))
+
+
+def test_thread_keeps_only_latest_checkpoints_and_live_blobs():
+    memory = BoundedMemorySaver(max_checkpoints=3)
+    graph = build(memory)
+    run(graph, "s1", times=10)
+
+    assert memory.thread_memory()["s1"]["checkpoints"] == 3
+    live = set().union(*memory._channel_versions[("s1", "")].values())
+    blobs = {(k[2], k[3]) for k in memory.blobs if k[0] == "s1"}
+    assert blobs <= live
+    assert all(k[2] in memory.storage["s1"][""] for k in memory.writes if k[0] == "s1")
+    # История после обрезки продолжается с последнего состояния
+    assert graph.get_state(config("s1")).values == {"code": "x" * 10, "runs": 10}
+
+
+def test_least_recently_used_thread_is_evicted():
+    memory = BoundedMemorySaver(max_threads=2)
+    graph = build(memory)
+    run(graph, "a")
+    run(graph, "b")
+    memory.get_tuple(config("a"))
+    run(graph, "c")
+
+    assert set(memory.thread_memory()) == {"a", "c"}
+    assert memory.evicted_threads == 1
+    assert not any(k[0] == "b" for k in memory.blobs)
+    assert graph.get_state(config("b")).values == {}
+
+
+def test_idle_threads_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(checkpoints.time, "monotonic", lambda: now[0])
+    memory = BoundedMemorySaver(thread_ttl=60)
+    graph = build(memory)
+    run(graph, "old")
+    now[0] += 30
+    run(graph, "recent")
+    now[0] += 45
+    run(graph, "new")
+
+    assert set(memory.thread_memory()) == {"recent", "new"}
+    assert memory.stats()["evicted_threads"] == 1
+
+
+@pytest.mark.parametrize("value, size", [(b"abc", 3), (("json", b"ab"), 6), ({"k": [b"a", "bc"]}, 3), (None, 0)])
+def test_payload_size(value, size):
+    assert checkpoints._payload_size(value) == size
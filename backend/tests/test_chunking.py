@@ -0,0 +1,152 @@
+import csv
+
+import pytest
+
+from backend.parsers.chunking import _split_oversized, chunk_file, component_of, load_index_documents
+
+TYPES = """import { ReactNode } from 'react';
+
+/** Размер кнопки */
+export enum ButtonSize {
+  s = 's',
+  m = 'm',
+}
+
+export interface IButtonProps {
+  label: string;
+  size?: ButtonSize;
+  icon?: ReactNode;
+}
+
+export type ButtonVariant = 'primary' | 'secondary';
+"""
+
+COMPONENT = """import React from 'react';
+import { IButtonProps } from './types';
+
+export const Button = ({ label }: IButtonProps) => {
+  const text = "}{ not a brace";
+  return <button>{label}</button>;
+};
+
+export default Button;
+"""
+
+STORIES = """import { Editor } from '../../../storybook';
+
+export const Page = () => (
+  <div>
+    <Editor description="Primary" code={`<Button label="a" />`} />
+    <Editor description="With icon" code={`<Button label="b" icon={<IconPlus />} />`} />
+  </div>
+);
+"""
+
+
+def lines_of(count: int, width: int = 20) -> str:
+    return "".join(f"{i:0{width - 1}d}\n" for i in range(count))
+
+
+@pytest.mark.parametrize("max_chars, overlap", [(100, 0), (100, 20), (100, 40), (60, 59)])
+def test_windows_respect_size_and_overlap(max_chars, overlap):
+    text = lines_of(30)
+    windows = _split_oversized(text, max_chars, overlap)
+    assert len(windows) > 1
+    assert all(len(w) <= max_chars for w in windows)
+    lines = text.splitlines(keepends=True)
+    covered = []
+    for previous, window in zip([None] + windows, windows):
+        window_lines = window.splitlines(keepends=True)
+        if previous is not None:
+            carried = [line for line in window_lines if line in previous.splitlines(keepends=True)]
+            # Повторяются только целые хвостовые строки предыдущего окна, не больше overlap символов
+            assert previous.endswith("".join(carried))
+            assert len("".join(carried)) <= overlap
+            window_lines = window_lines[len(carried):]
+        covered += window_lines
+    assert covered == lines
+
+
+def test_overlap_exactly_on_line_boundary_is_carried():
+    windows = _split_oversized(lines_of(10), 100, 40)
+    assert windows[1].startswith(windows[0][-40:])
+
+
+def test_text_within_limit_is_not_split():
+    assert _split_oversized("short\n", 100, 20) == ["short\n"]
+
+
+def test_line_longer_than_window_is_cut_by_characters():
+    windows = _split_oversized("x" * 250, 100, 0)
+    assert [len(w) for w in windows] == [100, 100, 50]
+
+
+def test_declarations_become_separate_chunks():
+    chunks = chunk_file("types.ts", TYPES, max_chars=120, overlap=10)
+    kinds = [(kind, names) for kind, names, _, _ in chunks]
+    assert kinds == [("enum", ["ButtonSize"]), ("interface", ["IButtonProps"]), ("type", ["ButtonVariant"])]
+    # Импорт и комментарий над объявлением идут вместе с ним
+    assert chunks[0][2].startswith("import { ReactNode }")
+    assert "/** Размер кнопки */" in chunks[0][2]
+
+
+def test_small_declarations_of_one_kind_are_merged_within_limit():
+    code = "".join(f"export type T{i} = 'v{i}';\n" for i in range(6))
+    merged = chunk_file("types.ts", code, max_chars=1000, overlap=10)
+    assert len(merged) == 1 and merged[0][1] == [f"T{i}" for i in range(6)]
+    split = chunk_file("types.ts", code, max_chars=60, overlap=10)
+    assert len(split) == 3
+    assert all(len(text) <= 60 for _, _, text, _ in split)
+
+
+def test_component_keeps_default_export_and_ignores_braces_in_strings():
+    chunks = chunk_file("index.tsx", COMPONENT, max_chars=300, overlap=30)
+    assert len(chunks) == 1
+    kind, names, text, part = chunks[0]
+    assert (kind, names, part) == ("component", ["Button"], "")
+    assert text.rstrip().endswith("export default Button;")
+
+
+def test_oversized_declaration_is_split_into_numbered_parts():
+    body = "".join(f"  prop{i}: string;\n" for i in range(40))
+    chunks = chunk_file("types.ts", f"export interface IBig {{\n{body}}}\n", max_chars=200, overlap=40)
+    assert len(chunks) > 1
+    assert [part for *_, part in chunks] == [f"{i + 1}/{len(chunks)}" for i in range(len(chunks))]
+    assert all(names == ["IBig"] for _, names, _, _ in chunks)
+
+
+def test_each_story_example_is_its_own_chunk():
+    chunks = chunk_file("Button.Stories.tsx", STORIES, max_chars=1500, overlap=150)
+    stories = [text for kind, _, text, _ in chunks if kind == "story"]
+    assert len(stories) == 2
+    assert stories[1].startswith('<Editor description="With icon"') and stories[1].endswith("/>")
+    assert {kind for kind, *_ in chunks} == {"story", "story_page"}
+
+
+def test_scss_is_split_by_top_level_rules():
+    code = ".button {\n  color: red;\n}\n\n// Иконка\n.icon {\n  size: 1px;\n}\n"
+    chunks = chunk_file("styles.scss", code, max_chars=40, overlap=0)
+    assert [text for *_, text, _ in chunks] == [".button {\n  color: red;\n}", "// Иконка\n.icon {\n  size: 1px;\n}"]
+
+
+def test_component_of():
+    assert component_of("Codes for component Button _stories Stories.tsx") == "Button"
+    assert component_of("Codes for component index.ts") == ""
+
+
+def test_load_index_documents(tmp_path):
+    csv_path = tmp_path / "RAW_COMPONENTS_.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Document Purpose", "Content"])
+        writer.writeheader()
+        writer.writerow({"Document Purpose": "Types for component Button types.ts", "Content": TYPES})
+
+    whole = load_index_documents(str(csv_path), chunking=False)
+    assert len(whole) == 1 and whole[0].page_content.startswith("Document Purpose: Types for component Button")
+
+    documents = load_index_documents(str(csv_path), chunking=True)
+    assert [d.metadata["kind"] for d in documents] == ["enum", "interface", "type"]
+    assert documents[1].metadata == {"source": str(csv_path), "row": 0, "component": "Button",
+                                     "kind": "interface", "names": ["IButtonProps"], "chunk": 1}
+    assert documents[1].page_content.startswith(
+        "Document Purpose: Types for component Button types.ts (interface IButtonProps)\nContent: export interface")
@@ -0,0 +1,34 @@
+from langchain_core.documents import Document
+
+from backend.models.context_packing import SEPARATOR, ContextPacker, interleave
+from backend.models.tokens import count_tokens
+
+
+def doc(text, kind, row):
+    return Document(page_content=text, metadata={"source": "csv", "row": row, "kind": kind})
+
+
+def test_repeats_are_pasted_once_and_cheap_kinds_dropped_first():
+    interface = doc("interface IButtonProps { label: string }", "interface", 1)
+    styles = doc(".button { color: red; }" * 20, "styles", 2)
+    story = doc("<Button label='ok' />", "story", 3)
+    budget = sum(count_tokens(d.page_content) + 2 for d in (interface, story))
+    packer = ContextPacker("test", budget)
+
+    packed = packer.pack([interface, styles, interface, story])
+
+    assert packed == SEPARATOR.join([interface.page_content, story.page_content])
+    stats = packer.stats()
+    assert (stats["duplicates"], stats["dropped"]) == (1, 1)
+
+
+def test_before_is_the_unpacked_texts():
+    items = [doc("a" * 40, "interface", 1), doc("a" * 40, "interface", 1), "hint about TS2322"]
+    packer = ContextPacker("test", 10_000)
+    packer.pack(items)
+    assert packer.stats()["tokens_before"] == count_tokens(SEPARATOR.join(["a" * 40, "a" * 40, "hint about TS2322"]))
+    assert packer.stats()["tokens_after"] == count_tokens(SEPARATOR.join(["a" * 40, "hint about TS2322"]))
+
+
+def test_interleave_alternates_queries():
+    assert interleave([[1, 2, 3], [4], [5, 6]]) == [1, 4, 5, 2, 6, 3]
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from backend.parsers import recursive
+from backend.parsers.manifest import file_sha256
+
+
+@pytest.fixture
+def index_paths(tmp_path, monkeypatch):
+    csv_path = tmp_path / "RAW_COMPONENTS_.csv"
+    csv_path.write_text("Document Purpose,Content\nButton,export const Button = () => null;\n", encoding="utf-8")
+    seed = tmp_path / "faiss_extended"
+    FAISS.from_documents([Document(page_content="Button")], DeterministicFakeEmbedding(size=8)).save_local(str(seed))
+
+    monkeypatch.setattr(recursive, "OUTPUT_CSV_PATH", str(csv_path))
+    monkeypatch.setattr(recursive, "FAISS_SEED_PATH", str(seed))
+    monkeypatch.setattr(recursive, "FAISS_DB_PATH", str(tmp_path / "faiss_local"))
+    monkeypatch.setattr(recursive, "FAISS_MMAP_PATH", str(tmp_path / "faiss_mmap"))
+    monkeypatch.setattr(recursive, "chunking_signature", lambda: "files")
+    return csv_path, seed, tmp_path / "faiss_local"
+
+
+def test_legacy_bare_hash_means_whole_files(index_paths):
+    csv_path, seed, local = index_paths
+    local.mkdir()
+    (local / "csv.sha256").write_text(file_sha256(str(csv_path)))
+    assert recursive.faiss_index_version() == f"{file_sha256(str(csv_path))} files"
+
+
+def test_warmup_copies_seed_and_leaves_it_untouched(index_paths, monkeypatch):
+    csv_path, seed, local = index_paths
+    (seed / "csv.sha256").write_text(f"{file_sha256(str(csv_path))} files")
+    seed_files = {name: (seed / name).read_bytes() for name in os.listdir(seed)}
+    # Отметка совпадает — перестраивать нечего, эмбеддер не нужен
+    monkeypatch.setattr(recursive, "patch_faiss_index", lambda embeddings: pytest.fail("index patched"))
+
+    recursive.ensure_faiss_index()
+
+    assert {name: (seed / name).read_bytes() for name in os.listdir(seed)} == seed_files
+    assert sorted(os.listdir(local)) == sorted(seed_files)
+    assert recursive.faiss_index_version() == f"{file_sha256(str(csv_path))} files"
+    assert os.path.isfile(os.path.join(recursive.FAISS_MMAP_PATH, "CURRENT"))
+
+
+def test_changed_chunking_patches_the_local_copy_only(index_paths, monkeypatch):
+    csv_path, seed, local = index_paths
+    (seed / "csv.sha256").write_text(file_sha256(str(csv_path)))
+    monkeypatch.setattr(recursive, "chunking_signature", lambda: "chunks:1500:150")
+    monkeypatch.setattr(recursive, "CachedEmbeddings", lambda *args: None)
+    monkeypatch.setattr(recursive, "OpenAIEmbeddings", lambda: None)
+    patched = []
+    monkeypatch.setattr(recursive, "patch_faiss_index", lambda embeddings: patched.append(recursive.FAISS_DB_PATH))
+
+    recursive.ensure_faiss_index()
+
+    assert patched == [str(local)]
+    assert (seed / "csv.sha256").read_text() == file_sha256(str(csv_path))
+    assert (local / "csv.sha256").read_text() == f"{file_sha256(str(csv_path))} chunks:1500:150"
@@ -0,0 +1,99 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.prompts import ChatPromptTemplate
+
+from backend.models.llm_cache import LLMResponseCache
+
+PROMPT = ChatPromptTemplate.from_template("Fix this code: {code}")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LLMResponseCache(str(tmp_path / "llm.sqlite"), max_size=3)
+
+
+def model(store, responses, chain="coder"):
+    return FakeListChatModel(responses=responses, cache=store.for_chain(chain))
+
+
+def test_repeated_prompt_is_served_from_cache(store):
+    chain = PROMPT | model(store, ["first", "second"])
+    assert chain.invoke({"code": "<A />"}).content == "first"
+    assert chain.invoke({"code": "<A />"}).content == "first"
+    assert chain.invoke({"code": "<B />"}).content == "second"
+    assert store.stats()["chains"]["coder"] == {"hits": 1, "misses": 2, "stored": 2, "hit_rate": pytest.approx(1 / 3)}
+
+
+def test_key_includes_model_parameters(store):
+    cache = store.for_chain("coder")
+    generation = [ChatGeneration(message=AIMessage(content="ok"))]
+    cache.update("prompt", "model=a temperature=0", generation)
+    assert cache.lookup("prompt", "model=a temperature=0")[0].text == "ok"
+    assert cache.lookup("prompt", "model=b temperature=0") is None
+    assert cache.lookup("other prompt", "model=a temperature=0") is None
+
+
+def test_empty_responses_are_not_stored(store):
+    chain = PROMPT | model(store, ["", "answer"])
+    assert chain.invoke({"code": "<A />"}).content == ""
+    assert chain.invoke({"code": "<A />"}).content == "answer"
+    assert store.stats()["chains"]["coder"]["stored"] == 1
+    assert store.stats()["size"] == 1
+
+
+def test_chains_share_storage_but_count_separately(store):
+    (PROMPT | model(store, ["x"], chain="coder")).invoke({"code": "1"})
+    (PROMPT | model(store, ["y"], chain="debugger")).invoke({"code": "2"})
+    assert set(store.stats()["chains"]) == {"coder", "debugger"}
+    assert store.for_chain("coder") is store.for_chain("coder")
+
+    store.for_chain("coder").clear()
+    assert store.stats()["size"] == 1
+
+
+def test_least_recently_used_responses_are_evicted(store, monkeypatch):
+    from backend.models import llm_cache
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = store.for_chain("coder")
+    for prompt in ("a", "b", "c"):
+        now[0] += 1
+        cache.update(prompt, "llm", [ChatGeneration(message=AIMessage(content=prompt))])
+    now[0] += 1
+    assert cache.lookup("a", "llm") is not None
+    now[0] += 1
+    cache.update("d", "llm", [ChatGeneration(message=AIMessage(content="d"))])
+
+    assert cache.lookup("b", "llm") is None
+    assert [cache.lookup(p, "llm")[0].text for p in ("a", "c", "d")] == ["a", "c", "d"]
+
+
+def test_responses_survive_restart(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    (PROMPT | model(LLMResponseCache(path), ["cached"])).invoke({"code": "<A />"})
+    # Список ответов входит в параметры фейковой модели, поэтому он тот же, что при записи
+    restarted = LLMResponseCache(path)
+    assert (PROMPT | model(restarted, ["cached"])).invoke({"code": "<A />"}).content == "cached"
+    assert restarted.stats()["chains"]["coder"]["hits"] == 1
+
+
+def test_unreadable_cache_file_falls_back_to_model(tmp_path):
+    path = tmp_path / "llm.sqlite"
+    path.write_bytes(b"not a database" * 100)
+    chain = PROMPT | model(LLMResponseCache(str(path)), ["a", "b"])
+    assert chain.invoke({"code": "<A />"}).content == "a"
+    assert chain.invoke({"code": "<A />"}).content == "b"
+
+
+def test_failed_response_can_be_forgotten(store):
+    chain = PROMPT | model(store, ["broken fix", "better fix"], chain="debugger")
+    assert chain.invoke({"code": "<A />"}).content == "broken fix"
+    assert store.for_chain("debugger").forget("broken fix")
+    assert chain.invoke({"code": "<A />"}).content == "better fix"
+    # Ответ, выданный из кэша, тоже можно удалить
+    assert chain.invoke({"code": "<A />"}).content == "better fix"
+    assert store.for_chain("debugger").forget("better fix")
+    assert store.stats()["size"] == 0
+    assert not store.for_chain("debugger").forget("never returned")
@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from backend.parsers import manifest as manifest_module
+from backend.parsers.manifest import MANIFEST_VERSION, IngestManifest
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "components"
+    for rel_path, content in {
+        "Button/index.tsx": "export const Button = () => null;",
+        "Button/Button.stories.tsx": "<Editor />",
+        "Card/index.tsx": "import { cn } from '../utils';",
+        "utils.ts": "export const cn = () => '';",
+    }.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return root
+
+
+def recorded(tree, tmp_path) -> IngestManifest:
+    manifest = IngestManifest(str(tmp_path / "data" / "manifest.json"), str(tree))
+    manifest.record_component(str(tree / "Button"), "Button", "A button",
+                              [tree / "Button/index.tsx", tree / "Button/Button.stories.tsx", tree / "utils.ts"])
+    manifest.record_component(str(tree / "Card"), "Card", "A card", [tree / "Card/index.tsx", tree / "utils.ts"])
+    return manifest
+
+
+def touch(path, content=None):
+    if content is not None:
+        path.write_text(content, encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_unchanged_tree_has_no_changed_components(tree, tmp_path):
+    assert recorded(tree, tmp_path).changed_components() == set()
+
+
+def test_own_file_change_marks_only_its_component(tree, tmp_path):
+    manifest = recorded(tree, tmp_path)
+    touch(tree / "Button/index.tsx", "export const Button = () => <b />;")
+    assert manifest.changed_components() == {str(tree / "Button")}
+
+
+def test_shared_file_change_marks_every_user(tree, tmp_path):
+    manifest = recorded(tree, tmp_path)
+    touch(tree / "utils.ts", "export const cn = (...a) => a.join(' ');")
+    assert manifest.changed_components() == {str(tree / "Button"), str(tree / "Card")}
+
+
+def test_deleted_file_marks_its_users(tree, tmp_path):
+    manifest = recorded(tree, tmp_path)
+    os.remove(tree / "Card/index.tsx")
+    assert manifest.changed_components() == {str(tree / "Card")}
+
+
+def test_touched_file_with_same_content_is_not_rehashed_twice(tree, tmp_path, monkeypatch):
+    manifest = recorded(tree, tmp_path)
+    touch(tree / "utils.ts")
+    assert manifest.changed_components() == set()
+    assert manifest.dirty
+
+    hashed = []
+    monkeypatch.setattr(manifest_module, "file_sha256", lambda path: hashed.append(path))
+    assert manifest.changed_components() == set()
+    assert hashed == []
+
+
+def test_drop_component_keeps_shared_files_of_others(tree, tmp_path):
+    manifest = recorded(tree, tmp_path)
+    manifest.drop_component(str(tree / "Button"))
+    assert set(manifest.files) == {"Card/index.tsx", "utils.ts"}
+    assert manifest.files["utils.ts"]["used_by"] == [str(tree / "Card")]
+
+
+def test_rerecording_does_not_duplicate_users(tree, tmp_path):
+    manifest = recorded(tree, tmp_path)
+    manifest.record_component(str(tree / "Card"), "Card", "A card", [tree / "Card/index.tsx", tree / "utils.ts"])
+    assert manifest.files["utils.ts"]["used_by"] == [str(tree / "Button"), str(tree / "Card")]
+
+
+def test_save_and_load_round_trip(tree, tmp_path):
+    manifest = recorded(tree, tmp_path)
+    manifest.record_skipped(str(tree / "Draft"), [])
+    manifest.save()
+
+    loaded = IngestManifest.load(manifest.path, str(tree))
+    assert loaded.files == manifest.files
+    assert loaded.components == manifest.components
+    assert loaded.components[str(tree / "Draft")]["skipped"]
+    assert loaded.component_files(str(tree / "Card")) == [str(tree / "Card/index.tsx"), str(tree / "utils.ts")]
+
+
+@pytest.mark.parametrize("data", ["{broken", json.dumps({"version": MANIFEST_VERSION + 1, "root": "x"})])
+def test_unusable_manifest_means_full_rebuild(tree, tmp_path, data):
+    path = tmp_path / "manifest.json"
+    path.write_text(data, encoding="utf-8")
+    loaded = IngestManifest.load(str(path), str(tree))
+    assert loaded.files == {} and loaded.components == {}
+
+
+def test_manifest_of_another_tree_is_ignored(tree, tmp_path):
+    manifest = recorded(tree, tmp_path)
+    manifest.save()
+    assert IngestManifest.load(manifest.path, str(tmp_path / "other")).components == {}
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from backend.parsers import mmap_index
+from backend.parsers.mmap_index import (
+    CURRENT_FILE, convert_faiss_index, current_generation, is_mmap_index_fresh, load_mmap_index
+)
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+
+
+def build_source(path, texts):
+    db = FAISS.from_documents([Document(page_content=text, metadata={"n": i}) for i, text in enumerate(texts)],
+                              EMBEDDINGS)
+    db.save_local(str(path))
+
+
+def texts_of(db):
+    return sorted(db.docstore.text(i) for i in range(len(db.docstore)))
+
+
+def generations(path):
+    return sorted(name for name in os.listdir(path) if name.startswith("gen-"))
+
+
+def test_convert_and_load(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "mmap"
+    build_source(src, ["Button", "Input"])
+    convert_faiss_index(str(src), str(dst))
+
+    assert is_mmap_index_fresh(str(src), str(dst))
+    db = load_mmap_index(str(dst), EMBEDDINGS)
+    assert texts_of(db) == ["Button", "Input"]
+    assert db.similarity_search("Button", k=1)[0].metadata == {"n": 0}
+
+
+def test_regeneration_swaps_generations_and_keeps_open_index_readable(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "mmap"
+    build_source(src, ["Button", "Input"])
+    convert_faiss_index(str(src), str(dst))
+    old = load_mmap_index(str(dst), EMBEDDINGS)
+
+    for texts in (["Button", "Input", "Select"], ["Box"]):
+        build_source(src, texts)
+        os.utime(src / "index.faiss", (os.path.getmtime(current_generation(str(dst))) + 10,) * 2)
+        convert_faiss_index(str(src), str(dst))
+
+    assert texts_of(load_mmap_index(str(dst), EMBEDDINGS)) == ["Box"]
+    # Уже открытый индекс читается дальше, хотя его поколение удалено
+    assert texts_of(old) == ["Button", "Input"]
+    assert len(generations(dst)) == 2
+    assert not [name for name in os.listdir(dst) if name.startswith((".tmp-", ".current-"))]
+
+
+def test_failed_write_leaves_current_index(tmp_path, monkeypatch):
+    src, dst = tmp_path / "src", tmp_path / "mmap"
+    build_source(src, ["Button"])
+    convert_faiss_index(str(src), str(dst))
+    current = (dst / CURRENT_FILE).read_text()
+
+    build_source(src, ["Button", "Input"])
+    os.utime(src / "index.faiss", (os.path.getmtime(current_generation(str(dst))) + 10,) * 2)
+
+    def broken_write(index, path):
+        open(path, "wb").write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(mmap_index.faiss, "write_index", broken_write)
+    with pytest.raises(OSError):
+        convert_faiss_index(str(src), str(dst))
+
+    assert (dst / CURRENT_FILE).read_text() == current
+    assert texts_of(load_mmap_index(str(dst), EMBEDDINGS)) == ["Button"]
+    assert generations(dst) == [current]
+    assert not [name for name in os.listdir(dst) if name.startswith(".tmp-")]
+
+
+def test_directory_without_current_is_read_in_place(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "mmap"
+    build_source(src, ["Button"])
+    dst.mkdir()
+    mmap_index._write_layout(FAISS.load_local(str(src), None, allow_dangerous_deserialization=True), str(dst))
+    assert current_generation(str(dst)) == str(dst)
+    assert texts_of(load_mmap_index(str(dst), EMBEDDINGS)) == ["Button"]
@@ -0,0 +1,98 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.models.result_cache import RETURN, SEED, SemanticResultCache
+
+
+class FixedEmbeddings:
+    """Векторы заданы для каждого запроса заранее."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    async def aembed_query(self, text):
+        return self.vectors[text]
+
+
+def unit(angle_deg: float) -> np.ndarray:
+    """Единичный вектор с косинусом cos(angle) к оси x."""
+    angle = np.radians(angle_deg)
+    return np.array([np.cos(angle), np.sin(angle)], dtype=np.float32)
+
+
+@pytest.fixture
+def cache():
+    return SemanticResultCache(FixedEmbeddings({}), return_threshold=0.97, seed_threshold=0.9)
+
+
+def test_embed_normalizes():
+    cache = SemanticResultCache(FixedEmbeddings({"q": [3.0, 4.0]}))
+    assert np.allclose(asyncio.run(cache.embed("q")), [0.6, 0.8])
+
+
+@pytest.mark.parametrize("angle, mode", [(0, RETURN), (10, RETURN), (20, SEED), (30, None)])
+def test_threshold_chooses_return_seed_or_miss(cache, angle, mode):
+    # cos 10° ≈ 0.985, cos 20° ≈ 0.94, cos 30° ≈ 0.87
+    cache.put("stored", unit(0), "<App />", errors="")
+    hit = cache.lookup(unit(angle))
+    assert (hit["mode"] if hit else None) == mode
+    if hit:
+        assert hit["code"] == "<App />" and hit["query"] == "stored"
+
+
+def test_failed_result_is_only_a_seed(cache):
+    cache.put("broken", unit(0), "<App", errors=[{"code": "TS1005"}])
+    assert cache.lookup(unit(0))["mode"] == SEED
+
+
+def test_valid_result_is_returned_over_closer_failed_one(cache):
+    cache.put("broken", unit(0), "<Broken", errors="TS1005")
+    cache.put("valid", unit(5), "<Valid />", errors="")
+    hit = cache.lookup(unit(0))
+    assert (hit["mode"], hit["query"]) == (RETURN, "valid")
+
+
+def test_closest_seed_wins_when_nothing_can_be_returned(cache):
+    cache.put("far", unit(25), "<Far />", errors="")
+    cache.put("near", unit(15), "<Near />", errors="")
+    hit = cache.lookup(unit(0))
+    assert (hit["mode"], hit["query"]) == (SEED, "near")
+
+
+def test_repeated_query_replaces_entry_and_size_is_bounded():
+    cache = SemanticResultCache(FixedEmbeddings({}), max_size=2)
+    cache.put("a", unit(0), "v1", errors="")
+    cache.put("a", unit(0), "v2", errors="")
+    assert cache.stats()["size"] == 1
+    assert cache.lookup(unit(0))["code"] == "v2"
+
+    cache.put("b", unit(90), "b", errors="")
+    cache.lookup(unit(0))
+    cache.put("c", unit(180), "c", errors="")
+    assert cache.lookup(unit(90)) is None
+    assert cache.lookup(unit(0))["code"] == "v2"
+
+
+def test_stats_count_hits_by_mode(cache):
+    cache.lookup(unit(0))
+    cache.put("a", unit(0), "<A />", errors="")
+    cache.lookup(unit(0))
+    cache.lookup(unit(20))
+    assert cache.stats() == {"size": 1, "max_size": 256, "hits": {RETURN: 1, SEED: 1}, "misses": 1,
+                             "hit_rate": pytest.approx(2 / 3)}
+
+
+def test_new_index_version_drops_results(tmp_path):
+    path = str(tmp_path / "results.json")
+    cache = SemanticResultCache(FixedEmbeddings({}), persist_path=path)
+    cache.invalidate("v1")
+    cache.put("a", unit(0), "<A />", errors="")
+
+    restored = SemanticResultCache(FixedEmbeddings({}), persist_path=path)
+    restored.invalidate("v1")
+    assert restored.lookup(unit(0))["code"] == "<A />"
+    restored.invalidate("v2")
+    assert restored.lookup(unit(0)) is None
+    assert SemanticResultCache(FixedEmbeddings({}), persist_path=path).stats()["size"] == 0
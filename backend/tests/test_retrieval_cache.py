@@ -0,0 +1,99 @@
+import pytest
+from langchain_core.documents import Document
+
+from backend.models import retrieval_cache as retrieval_cache_module
+from backend.models.retrieval_cache import RetrievalCache, normalize_query
+
+DOCS = [Document(page_content="interface IButtonProps", metadata={"row": 1, "kind": "interface"})]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(retrieval_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_normalize_query_keeps_case():
+    assert normalize_query("  Button props?\n") == "Button props"
+    assert normalize_query("IBox") != normalize_query("ibox")
+
+
+def test_namespaces_and_index_versions_do_not_collide():
+    cache = RetrievalCache()
+    cache.put("def", "Button", DOCS)
+    assert cache.get("dbg", "Button") is None
+    assert cache.get("def", " Button. ") == DOCS
+    cache.invalidate("v2")
+    assert cache.get("def", "Button") is None
+
+
+def test_lru_eviction():
+    cache = RetrievalCache(max_size=2)
+    cache.put("def", "a", DOCS)
+    cache.put("def", "b", DOCS)
+    cache.get("def", "a")
+    cache.put("def", "c", DOCS)
+    assert cache.get("def", "b") is None
+    assert cache.get("def", "a") == DOCS
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = RetrievalCache(ttl=60)
+    cache.put("def", "a", DOCS)
+    clock[0] += 61
+    assert cache.get("def", "a") is None
+    assert cache.stats()["namespaces"]["def"]["expired"] == 1
+
+
+def test_memory_miss_falls_back_to_sqlite(tmp_path):
+    path = str(tmp_path / "retrieval.sqlite")
+    writer = RetrievalCache(persist_path=path)
+    writer.invalidate("v1")
+    writer.put("def", "Button", DOCS)
+
+    reader = RetrievalCache(persist_path=path)
+    reader.invalidate("v1")
+    assert reader.get("def", "Button") == DOCS
+    assert reader.get("def", "Button") == DOCS
+    assert reader.stats()["namespaces"]["def"] == {"hits": 1, "disk_hits": 1, "misses": 0, "expired": 0,
+                                                   "hit_rate": 1.0}
+
+
+def test_sqlite_entries_expire_and_other_versions_are_dropped(tmp_path, clock):
+    path = str(tmp_path / "retrieval.sqlite")
+    writer = RetrievalCache(ttl=60, persist_path=path)
+    writer.invalidate("v1")
+    writer.put("def", "old", DOCS)
+    clock[0] += 30
+    writer.put("def", "new", DOCS)
+    clock[0] += 45
+
+    reader = RetrievalCache(ttl=60, persist_path=path)
+    reader.invalidate("v1")
+    assert reader.get("def", "old") is None
+    assert reader.get("def", "new") == DOCS
+
+    reader.invalidate("v2")
+    rows = reader._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    assert rows == 0
+
+
+def test_sqlite_size_is_bounded(tmp_path, clock):
+    cache = RetrievalCache(max_size=2, persist_path=str(tmp_path / "retrieval.sqlite"))
+    for query in ("a", "b", "c"):
+        clock[0] += 1
+        cache.put("def", query, DOCS)
+    rows = cache._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    assert rows == 2
+
+
+def test_unreadable_sqlite_file_counts_as_miss(tmp_path):
+    path = tmp_path / "retrieval.sqlite"
+    path.write_bytes(b"not a database" * 100)
+    cache = RetrievalCache(persist_path=str(path))
+    cache.put("def", "a", DOCS)
+    assert cache.get("def", "a") == DOCS
+    assert cache.get("def", "b") is None
+    assert cache.stats()["namespaces"]["def"]["misses"] == 1
@@ -0,0 +1,175 @@
+import pytest
+
+from backend.models.tsxvalidator.static_checker import StaticChecker
+from backend.parsers.declarations import build_design_system_schema, parse_interfaces, resolve_props
+
+BUTTON_TYPES = """
+export interface IBaseProps {
+  label: string;
+  size?: 's' | 'm';
+  disabled?: boolean;
+}
+export interface IButtonProps extends Omit<IBaseProps, 'disabled'> {
+  onClick?(e: MouseEvent): void;
+}
+"""
+BUTTON_INDEX = "export const Button: FC<IButtonProps> = ({ label }) => <button>{label}</button>;"
+
+CARD_TYPES = """
+export interface ICardProps extends PropsWithChildren<{ title: string }> {
+  elevated?: boolean;
+}
+"""
+CARD_INDEX = "export const Card = ({ title, children }: ICardProps) => <div>{children}</div>;"
+
+INPUT_TYPES = """
+export interface IInputProps extends InputHTMLAttributes<HTMLInputElement> {
+  value: string;
+}
+"""
+INPUT_INDEX = "export const Input = forwardRef<HTMLInputElement, IInputProps>((props, ref) => null);"
+
+BOX_TYPES = """
+export interface IBoxProps {
+  [key: string]: unknown;
+  children: ReactNode;
+}
+"""
+BOX_INDEX = "export const Box = (props: IBoxProps) => null;"
+
+
+@pytest.fixture(scope="module")
+def checker():
+    schema = build_design_system_schema({
+        "Button": {"types.ts": BUTTON_TYPES, "index.tsx": BUTTON_INDEX},
+        "Card": {"types.ts": CARD_TYPES, "index.tsx": CARD_INDEX},
+        "Input": {"types.ts": INPUT_TYPES, "index.tsx": INPUT_INDEX},
+        "Box": {"types.ts": BOX_TYPES, "index.tsx": BOX_INDEX},
+    })
+    return StaticChecker(schema)
+
+
+def codes(errors):
+    return [e["code"] for e in errors]
+
+
+def wrap(jsx: str, imports: str = "Button, Card, Input, Box") -> str:
+    return f"import {{ {imports} }} from '@nlmk/ds-2.0';\n\nexport default () => (\n  {jsx}\n);\n"
+
+
+def test_omit_removes_base_prop_and_keeps_interface_closed():
+    interfaces = parse_interfaces(BUTTON_TYPES)
+    props, closed = resolve_props("IButtonProps", interfaces)
+    assert set(props) == {"label", "size", "onClick"}
+    assert props["label"]["required"] and not props["onClick"]["required"]
+    assert closed
+
+
+def test_props_with_children_inline_generic():
+    props, closed = resolve_props("ICardProps", parse_interfaces(CARD_TYPES))
+    assert props["title"]["required"]
+    assert props["children"] == {"type": "ReactNode", "required": False}
+    assert closed
+
+
+def test_unknown_base_and_index_signature_open_interface():
+    assert resolve_props("IInputProps", parse_interfaces(INPUT_TYPES))[1] is False
+    assert resolve_props("IBoxProps", parse_interfaces(BOX_TYPES))[1] is False
+
+
+def test_valid_code_has_no_errors(checker):
+    code = wrap('<Card title="t"><Button label="ok" size="m" onClick={() => {}} /></Card>')
+    assert checker.check(code) == []
+
+
+def test_unknown_prop_on_closed_interface(checker):
+    errors = checker.check(wrap('<Button label="ok" disabled />'))
+    assert codes(errors) == ["TS2322"]
+    assert "'disabled'" in errors[0]["message"]
+
+
+def test_missing_required_prop(checker):
+    errors = checker.check(wrap("<Button size=\"s\" />"))
+    assert codes(errors) == ["TS2741"]
+    assert "'label'" in errors[0]["message"]
+
+
+def test_key_ref_and_data_attributes_are_always_allowed(checker):
+    code = wrap('<Button label="ok" key="1" ref={null} data-testid="b" aria-label="b" />')
+    assert checker.check(code) == []
+
+
+def test_spread_skips_required_check_but_not_unknown_props(checker):
+    assert checker.check(wrap("<Button {...rest} />")) == []
+    assert codes(checker.check(wrap("<Button {...rest} color=\"red\" />"))) == ["TS2322"]
+
+
+def test_open_interfaces_accept_any_prop(checker):
+    assert checker.check(wrap('<Input value="" placeholder="x" onChange={f} />')) == []
+    assert checker.check(wrap("<Box anything={1}>x</Box>")) == []
+
+
+def test_children_satisfy_required_children_prop(checker):
+    assert codes(checker.check(wrap("<Box />"))) == ["TS2741"]
+    assert checker.check(wrap("<Box><span /></Box>")) == []
+
+
+def test_aliased_import_is_checked_by_exported_name(checker):
+    code = wrap("<Btn size=\"s\" />", imports="Button as Btn")
+    assert codes(checker.check(code)) == ["TS2741"]
+
+
+def test_unknown_import_suggests_close_export(checker):
+    errors = checker.check(wrap('<Button label="ok" />', imports="Button, Buton"))
+    assert codes(errors) == ["TS2724"]
+    assert "Did you mean 'Button'" in errors[0]["message"]
+
+
+def test_truncated_code_reports_once_and_skips_prop_checks(checker):
+    code = "import { Button } from '@nlmk/ds-2.0';\nexport default () => (\n  <div>\n    <Button size=\"s\""
+    errors = checker.check(code)
+    assert len(errors) == 1
+    assert "truncated" in errors[0]["message"]
+
+
+def test_mismatched_closing_tag(checker):
+    errors = checker.check(wrap("<div><span></div>"))
+    assert codes(errors) == ["TS17002"]
+
+
+def test_comparison_and_generics_are_not_jsx(checker):
+    code = (
+        "import { Button } from '@nlmk/ds-2.0';\n"
+        "const max = <T,>(a: T[]): T => a[0];\n"
+        "const small = (a: number, b: number) => a < b && b > 0;\n"
+        "export default () => <Button label={`${small(1, 2)}`} />;\n"
+    )
+    assert checker.check(code) == []
+
+
+def test_regex_literals_are_skipped(checker):
+    code = (
+        "import { Button } from '@nlmk/ds-2.0';\n"
+        "const re = /[)}]/g;\n"
+        "const half = (a: number, b: number) => a / 2 + b / 2;\n"
+        "const strip = (s: string) => s.replace(/\\/(\\[\\]/, '');\n"
+        "export default () => <Button label={'x'} onClick={() => /<[a-z]+>/.test(strip('a'))} />;\n"
+    )
+    assert checker.check(code) == []
+
+
+def test_structure_errors_after_regex_are_still_found(checker):
+    code = "import { Button } from '@nlmk/ds-2.0';\nconst re = /[(]/;\nexport default () => (<Button label=\"a\" />;\n"
+    assert codes(checker.check(code)) == ["TS1005"]
+
+
+def test_ambiguous_slash_is_left_to_tsc(checker):
+    # После '}' '/' может быть и делением, и регулярным выражением — сканер не сообщает об ошибках
+    code = "import { Button } from '@nlmk/ds-2.0';\nif (true) {}\n/)/.test('a');\nexport default () => <Button />;\n"
+    assert codes(checker.check(code)) == []
+
+
+def test_error_location_matches_tsc_format(checker):
+    errors = checker.check(wrap('<Button label="ok" />', imports="Button, Nope"))
+    assert errors[0]["code"] == "TS2305"
+    assert errors[0]["location"] == "Номер строки c ошибкой 1 и индекс символа 18"
@@ -0,0 +1,46 @@
+from backend.models.tsxvalidator.cache import ValidationCache
+
+VALID = {"valid": True, "errors": []}
+INVALID = {"valid": False, "errors": [{"location": "1:1", "code": "TS2322", "message": "bad prop"}]}
+
+
+def test_key_depends_on_code_and_environment():
+    key = ValidationCache.key("<A />", "env1")
+    assert key == ValidationCache.key("<A />", "env1")
+    assert key != ValidationCache.key("<A />", "env2")
+    assert key != ValidationCache.key("<B />", "env1")
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = ValidationCache(max_size=2)
+    cache.put("a", VALID)
+    cache.put("b", INVALID)
+    assert cache.get("a") == VALID
+    cache.put("c", VALID)
+    assert cache.get("b") is None
+    assert cache.get("a") == VALID and cache.get("c") == VALID
+    assert cache.stats()["size"] == 2
+
+
+def test_validator_exceptions_are_not_cached():
+    cache = ValidationCache()
+    cache.put("a", {"valid": False, "errors": ["Error validating TSX: tsc not found"]})
+    assert cache.get("a") is None
+    assert cache.stats() == {"size": 0, "max_size": 512, "hits": 0, "misses": 1, "hit_rate": 0.0}
+
+
+def test_persisted_entries_survive_restart(tmp_path):
+    path = tmp_path / "validation.json"
+    cache = ValidationCache(max_size=2, persist_path=str(path))
+    for key in ("a", "b", "c"):
+        cache.put(key, INVALID)
+
+    restored = ValidationCache(max_size=2, persist_path=str(path))
+    assert restored.get("a") is None
+    assert restored.get("c") == INVALID
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "validation.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert ValidationCache(persist_path=str(path)).stats()["size"] == 0
@@ -0,0 +1,119 @@
+import sys
+import textwrap
+
+import pytest
+
+from backend.models.tsxvalidator import daemon as daemon_module
+from backend.models.tsxvalidator.daemon import DaemonError, LanguageServiceDaemon
+from backend.models.tsxvalidator.validator import TSXValidator
+
+# Воркер с тем же протоколом, что ls_worker.js: падает на "crash", зависает на "hang", сообщает об ошибке на "error"
+FAKE_WORKER = textwrap.dedent("""
+    import json, os, sys, time
+    print(json.dumps({"ready": True}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        code = request["code"]
+        if code == "crash":
+            sys.exit(1)
+        if code == "hang":
+            time.sleep(60)
+        if code == "error":
+            print(json.dumps({"id": request["id"], "error": "worker exception"}), flush=True)
+            continue
+        print(json.dumps({"id": request["id"], "output": f"{os.getpid()}:{code}"}), flush=True)
+""")
+
+
+@pytest.fixture
+def fake_worker(tmp_path, monkeypatch):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    monkeypatch.setattr(daemon_module, "WORKER_SCRIPT", script)
+    return script
+
+
+@pytest.fixture
+def daemon(fake_worker, tmp_path):
+    instance = LanguageServiceDaemon(tmp_path, [], node_path=sys.executable, startup_timeout=10,
+                                     request_timeout=1, max_restarts=2)
+    yield instance
+    instance.stop()
+
+
+def pid_of(output: str) -> str:
+    return output.split(":")[0]
+
+
+def test_process_is_reused_between_checks(daemon):
+    first = daemon.check("a")
+    assert first.endswith(":a")
+    assert pid_of(daemon.check("b")) == pid_of(first)
+
+
+def test_crash_fails_only_the_current_check_and_restarts(daemon):
+    pid = pid_of(daemon.check("a"))
+    with pytest.raises(DaemonError):
+        daemon.check("crash")
+    assert daemon.restarts == 1 and not daemon.exhausted()
+
+    output = daemon.check("b")
+    assert output.endswith(":b") and pid_of(output) != pid
+    assert daemon.restarts == 0
+
+
+def test_timeout_kills_the_worker_and_recovers(daemon):
+    with pytest.raises(DaemonError, match="timed out"):
+        daemon.check("hang")
+    assert not daemon.is_running()
+    assert daemon.check("b").endswith(":b")
+
+
+def test_worker_error_keeps_the_process(daemon):
+    pid = pid_of(daemon.check("a"))
+    with pytest.raises(DaemonError, match="worker exception"):
+        daemon.check("error")
+    assert pid_of(daemon.check("b")) == pid
+
+
+def test_exhausted_only_after_consecutive_failures(daemon):
+    for _ in range(daemon.max_restarts):
+        with pytest.raises(DaemonError):
+            daemon.check("crash")
+        daemon.check("ok")
+    assert not daemon.exhausted()
+
+    for _ in range(daemon.max_restarts + 1):
+        with pytest.raises(DaemonError):
+            daemon.check("crash")
+    assert daemon.exhausted()
+
+
+def test_missing_node_is_exhausted_at_once(fake_worker, tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon_module.shutil, "which", lambda name: None)
+    instance = LanguageServiceDaemon(tmp_path, [])
+    with pytest.raises(DaemonError):
+        instance.check("a")
+    assert instance.exhausted()
+
+
+@pytest.fixture
+def validator(daemon, tmp_path, monkeypatch):
+    instance = TSXValidator(str(tmp_path), mode="daemon")
+    instance.daemon = daemon
+    monkeypatch.setattr(instance, "_result_from_output", lambda output: {"valid": True, "errors": [], "via": output})
+    monkeypatch.setattr(instance, "_validate_oneshot", lambda code: {"valid": True, "errors": [], "via": "oneshot"})
+    return instance
+
+
+def test_validator_falls_back_to_oneshot_for_one_call(validator, daemon):
+    assert validator.validate_tsx("crash")["via"] == "oneshot"
+    assert validator.daemon is daemon
+    assert validator.validate_tsx("b")["via"].endswith(":b")
+
+
+def test_validator_drops_daemon_when_exhausted(validator):
+    for _ in range(validator.daemon.max_restarts + 1):
+        assert validator.validate_tsx("crash")["via"] == "oneshot"
+    assert validator.daemon is None
+    assert validator.validate_tsx("b")["via"] == "oneshot"
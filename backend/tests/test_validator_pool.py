@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.models.tsxvalidator.pool import ValidatorPool, ValidatorPoolSaturated
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    pools = []
+
+    def make(size=1, max_queue=1, timeout=5.0):
+        pool = ValidatorPool(size=size, max_queue=max_queue, timeout=timeout, base_dir=str(tmp_path), mode="oneshot")
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def validate_tsx(code):
+            started.release()
+            if code == "slow":
+                release.wait(10)
+            return {"valid": True, "errors": [], "code": code}
+
+        for validator in pool.validators:
+            validator.validate_tsx = validate_tsx
+        pools.append((pool, release))
+        return pool, release, started
+
+    yield make
+    for pool, release in pools:
+        release.set()
+        pool.close()
+
+
+def test_checks_run_on_workers_and_are_measured(make_pool):
+    pool, _, _ = make_pool(size=2)
+    assert pool.validate("a")["code"] == "a"
+    assert asyncio.run(pool.avalidate("b"))["code"] == "b"
+    stats = pool.stats()
+    assert stats["pending"] == 0
+    assert sum(w["checks"] for w in stats["workers"].values()) == 2
+
+
+def test_saturated_pool_rejects_new_checks(make_pool):
+    pool, release, started = make_pool(size=1, max_queue=1)
+    running = pool._submit("slow")
+    assert started.acquire(timeout=5)
+    queued = pool._submit("queued")
+
+    with pytest.raises(ValidatorPoolSaturated):
+        pool.validate("rejected")
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    assert running.result(5)["code"] == "slow" and queued.result(5)["code"] == "queued"
+    # Места освобождаются после завершения проверок
+    assert pool.validate("again")["code"] == "again"
+    assert pool.stats()["pending"] == 0
+
+
+def test_timeout_raises_and_cancels_queued_check(make_pool):
+    pool, release, started = make_pool(size=1, max_queue=1, timeout=0.2)
+    running = pool._submit("slow")
+    assert started.acquire(timeout=5)
+
+    with pytest.raises(TimeoutError):
+        pool.validate("waits in queue")
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["pending"] == 1
+
+    release.set()
+    running.result(5)
+    assert pool.stats()["pending"] == 0
+
+
+def test_async_timeout(make_pool):
+    pool, _, _ = make_pool(size=1, timeout=0.2)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(pool.avalidate("slow"))
+    assert pool.stats()["timeouts"] == 1
@@ -60,6 +60,8 @@ const UiGenerator = () => {
   const [currentVersion, setCurrentVersion] = useState(1)
   const [isCopied, setIsCopied] = useState(false);
   const [showSettings, setShowSettings] = useState(false);
+  // Сессия генерации: запросы с одним session_id дорабатывают один и тот же дизайн
+  const [sessionId, setSessionId] = useState(() => crypto.randomUUID())
 
   useEffect(() => {
     setMessages([{ id: '1', text: "Здравствуйте! Как я могу помочь вам сгенерировать дизайн интерфейса сегодня?", sender: 'ai' }])
@@ -128,12 +130,15 @@ export default DummyComponent;
     } else {
       try {
         console.log('Sending request to backend...');
-        const response = await axios.post('http://localhost:5000/generate', { question: input }, {
+        const response = await axios.post('http://localhost:5000/generate', { question: input, session_id: sessionId }, {
           headers: {
             'Content-Type': 'application/json',
           },
         });
         console.log('Received response from backend:', response.data);
+        if (response.data.session_id) {
+          setSessionId(response.data.session_id);
+        }
         const generatedCode = response.data.result;
         console.log('Generated code:', generatedCode);
 
@@ -173,6 +178,7 @@ export default DummyComponent;
     setShowDesign(false)
     setVersions([])
     setSelectedVersion(null)
+    setSessionId(crypto.randomUUID())
   }
 
   const handleOpenDesignHistory = () => {